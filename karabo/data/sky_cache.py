@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import dask.array as da
+import numpy as np
+from numpy.typing import NDArray
+
+from karabo.data.external_data import KaraboCache
+
+
+class SkyCache:
+    """
+    Persistent cache of preprocessed sky catalogues under `KaraboCache`.
+
+    Converting a survey (e.g. GLEAM) into `SkyModel.sources` is expensive. The
+    converted source array and the (dictionary-encoded) source ids are therefore
+    stored as `.npy` files, which later calls (also from other processes) open as
+    read-only memory map. The OS then shares the pages between all processes on a node.
+
+    Entries are keyed by the checksum of the survey file and the parameters of
+    the conversion. A changed survey file therefore never hits a stale entry.
+    Computing the checksum of a large file is itself expensive, so it's memoised
+    next to the cache entries and only recomputed if size or mtime of the file
+    change.
+    """
+
+    VERSION = 3
+    CHECKSUM_CHUNK_SIZE = 1 << 24
+
+    @staticmethod
+    def get_cache_directory() -> str:
+        cache_path = os.path.join(KaraboCache.get_cache_directory(), "sky_cache")
+        os.makedirs(cache_path, exist_ok=True)
+        return cache_path
+
+    @staticmethod
+    def file_checksum(path: str) -> str:
+        """
+        Returns the sha256 checksum of the file at `path`, memoised by the
+        size and mtime of the file.
+
+        :param path: file to get the checksum of
+        :return: hex digest of the checksum
+        """
+        stat = os.stat(path)
+        path_hash = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+        memo_path = os.path.join(
+            SkyCache.get_cache_directory(),
+            f"{os.path.basename(path)}.{path_hash}.checksum.json",
+        )
+        if os.path.exists(memo_path):
+            with open(memo_path, "r") as f:
+                memo = json.load(f)
+            if memo["size"] == stat.st_size and memo["mtime_ns"] == stat.st_mtime_ns:
+                return str(memo["sha256"])
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(SkyCache.CHECKSUM_CHUNK_SIZE), b""):
+                sha256.update(block)
+        checksum = sha256.hexdigest()
+        SkyCache.__write_atomic(
+            memo_path,
+            lambda tmp_path: _write_json(
+                tmp_path,
+                {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": checksum,
+                },
+            ),
+        )
+        return checksum
+
+    @staticmethod
+    def get_key(path: str, params: Dict[str, Any]) -> str:
+        """
+        Creates the cache key of the conversion of `path` with `params`.
+
+        :param path: source file of the conversion
+        :param params: everything else the conversion result depends on,
+                       has to have a deterministic `repr`
+        :return: cache key
+        """
+        key = repr(
+            (SkyCache.VERSION, SkyCache.file_checksum(path), sorted(params.items()))
+        )
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def __paths(key: str) -> Tuple[str, str, str]:
+        directory = SkyCache.get_cache_directory()
+        return (
+            os.path.join(directory, f"{key}.sources.npy"),
+            os.path.join(directory, f"{key}.ids.npy"),
+            os.path.join(directory, f"{key}.id_categories.npy"),
+        )
+
+    @staticmethod
+    def __write_atomic(path: str, write: Callable[[str], None]) -> None:
+        # Concurrent writers (e.g. dask workers) must not see half-written files.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def load(
+        key: str,
+    ) -> Optional[
+        Tuple[NDArray[np.float_], Optional[NDArray[Any]], Optional[NDArray[Any]]]
+    ]:
+        """
+        Opens a cache entry as read-only memory maps.
+
+        :param key: cache key, see `get_key`
+        :return: sources, source ids and the dictionary of the source ids (None if
+                 the entry has none), or None if there's no entry for `key`.
+        """
+        sources_path, ids_path, categories_path = SkyCache.__paths(key)
+        if not os.path.exists(sources_path):
+            return None
+        sources = np.load(sources_path, mmap_mode="r")
+        source_ids = None
+        if os.path.exists(ids_path):
+            source_ids = np.load(ids_path, mmap_mode="r")
+        source_id_categories = None
+        if os.path.exists(categories_path):
+            source_id_categories = np.load(categories_path)
+        return sources, source_ids, source_id_categories
+
+    @staticmethod
+    def store(
+        key: str,
+        sources: NDArray[np.float_],
+        source_ids: Optional[NDArray[Any]] = None,
+        source_id_categories: Optional[NDArray[Any]] = None,
+    ) -> None:
+        """
+        Stores a cache entry. Dask-backed `sources` are written chunk by chunk.
+
+        :param key: cache key, see `get_key`
+        :param sources: converted sources
+        :param source_ids: optional source ids, or their integer codes
+        :param source_id_categories: optional dictionary of the source ids,
+                                     if `source_ids` are integer codes into it
+        """
+        sources_path, ids_path, categories_path = SkyCache.__paths(key)
+        for path, values in (
+            (ids_path, source_ids),
+            (categories_path, source_id_categories),
+        ):
+            if values is None:
+                continue
+            array = np.asarray(values)
+            if array.dtype.kind == "O":  # not memory-mappable
+                array = array.astype(str)
+            SkyCache.__write_atomic(
+                path,
+                lambda tmp_path: _save_npy(tmp_path, array),
+            )
+
+        def write_sources(tmp_path: str) -> None:
+            out = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=sources.dtype, shape=sources.shape
+            )
+            if isinstance(sources, da.Array):  # type: ignore [attr-defined]
+                da.store(sources, out, lock=False)  # type: ignore [attr-defined]
+            else:
+                out[:] = sources
+            out.flush()
+            del out
+
+        # written last, because its existence marks a complete entry
+        SkyCache.__write_atomic(sources_path, write_sources)
+
+
+def _write_json(path: str, content: Dict[str, Any]) -> None:
+    with open(path, "w") as f:
+        json.dump(content, f)
+
+
+def _save_npy(path: str, array: NDArray[Any]) -> None:
+    with open(path, "wb") as f:
+        np.save(f, array)
@@ -353,8 +353,24 @@ class Imager:
         w.wcs.crval = phase_center
         w.wcs.ctype = ["RA---AIR", "DEC--AIR"]  # coordinate axis type
 
+        # pre-select the sources with the spatial index if there is one. The
+        # AIR projection never maps a source closer to the reference pixel than
+        # its angular distance, so a circle around the image corners contains
+        # all sources which end up inside the image.
+        candidates: Optional[NDArray[np.int_]] = None
+        if filter_outlier and sky.spatial_index is not None:
+            max_offset_px = max(crpix, imaging_npixel - crpix)
+            candidates = sky.spatial_index.query_disc_candidates(
+                ra0_deg=phase_center[0],
+                dec0_deg=phase_center[1],
+                radius_deg=np.sqrt(2) * max_offset_px * cdelt,
+            )
+
         # convert coordinates
-        px, py = w.wcs_world2pix(sky[:, 0], sky[:, 1], 1)
+        if candidates is not None:
+            px, py = w.wcs_world2pix(sky[candidates, 0], sky[candidates, 1], 1)
+        else:
+            px, py = w.wcs_world2pix(sky[:, 0], sky[:, 1], 1)
 
         # check length to cover single source pre-filtering
         if len(px.shape) == 0 and len(py.shape) == 0:
@@ -362,12 +378,14 @@ class Imager:
             idxs = np.arange(sky.num_sources)
         # post processing, pre filtering before calling wcs.wcs_world2pix would be
         # more efficient, however this has to be done in the ra-dec space.
-        # Maybe for future work!?
+        # `SkyModel.build_spatial_index` does this if the sky is queried repeatedly.
         elif filter_outlier:
             px_idxs = np.where(np.logical_and(px <= imaging_npixel, px >= 0))[0]
             py_idxs = np.where(np.logical_and(py <= imaging_npixel, py >= 0))[0]
             idxs = np.intersect1d(px_idxs, py_idxs)
             px, py = px[idxs], py[idxs]
+            if candidates is not None:
+                idxs = candidates[idxs]
         else:
             idxs = np.arange(sky.num_sources)
         img_coords = np.array([px, py])
@@ -1,5 +1,5 @@
 import time
-from typing import Optional, cast
+from typing import Optional, Union, cast
 
 import numpy as np
 
@@ -11,7 +11,12 @@ from karabo.util.dask import DaskHandler
 from karabo.util.file_handle import FileHandle
 
 
-def main(n_channels: int, gb_ram_per_worker: Optional[int] = None) -> None:
+def main(
+    n_channels: int,
+    split_observation_by_channels: bool = True,
+    n_split_channels: Union[int, str] = "each",
+    gb_ram_per_worker: Optional[int] = None,
+) -> float:
     DaskHandler.min_gb_ram_per_worker = gb_ram_per_worker
     print("Setting up sky model...")
     sky = SkyModel.get_GLEAM_Sky([76])
@@ -41,6 +46,7 @@ def main(n_channels: int, gb_ram_per_worker: Optional[int] = None) -> None:
         phase_centre_ra_deg=phase_center[0],
         phase_centre_dec_deg=phase_center[1],
         number_of_channels=n_channels,
+        frequency_increment_hz=1e6,
         number_of_time_steps=24,
     )
 
@@ -56,8 +62,8 @@ def main(n_channels: int, gb_ram_per_worker: Optional[int] = None) -> None:
         folder_for_multiple_observation=dir_intermediate_files,
         use_gpus=False,
         use_dask=True,
-        split_observation_by_channels=False,
-        n_split_channels="each",
+        split_observation_by_channels=split_observation_by_channels,
+        n_split_channels=n_split_channels,
     )
 
     print(f"Dashboard available here: {interferometer_sim.client.dashboard_link}")  # type: ignore [union-attr] # noqa: E501
@@ -73,9 +79,10 @@ def main(n_channels: int, gb_ram_per_worker: Optional[int] = None) -> None:
         observation_settings,
     )
 
+    time_taken_sec = time.time() - start
     print(f"MS Vis is {vis.ms_file.path}")
 
-    time_taken = round((time.time() - start) / 60, 2)
+    time_taken = round(time_taken_sec / 60, 2)
     print("Time taken: (minutes)", time_taken)
 
     # Check that the created visiblities are corresponding to the number of channels
@@ -85,13 +92,21 @@ def main(n_channels: int, gb_ram_per_worker: Optional[int] = None) -> None:
         "a",
     ) as file:
         file.write(
-            f"Number of channels: {n_channels}. " f"Time taken: {time_taken} min.\n"
+            f"Number of channels: {n_channels}. "
+            f"Split by channels: {split_observation_by_channels} "
+            f"({n_split_channels=}). "
+            f"Time taken: {time_taken} min.\n"
         )
         file.flush()
 
     # Clean up
     # fh.remove_dir(dir_intermediate_files)
 
+    return time_taken_sec
+
 
 if __name__ == "__main__":
-    main(n_channels=10, gb_ram_per_worker=None)
+    n_channels = 10
+    time_not_split = main(n_channels=n_channels, split_observation_by_channels=False)
+    time_split = main(n_channels=n_channels, split_observation_by_channels=True)
+    print(f"Speed-up of splitting by channels: {time_not_split / time_split:.2f}x")
@@ -1,28 +1,31 @@
 import enum
-from copy import deepcopy
-from typing import Any, Dict, List, Literal, Optional, Tuple, Union, cast
+from copy import copy, deepcopy
+from dataclasses import replace
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple, Union, cast
 
 import numpy as np
 import oskar
-import pandas as pd
 import xarray as xr
 from dask import compute, delayed  # type: ignore[attr-defined]
 from dask.array import Array as da  # type: ignore[attr-defined]
 from dask.array import from_array  # type: ignore[attr-defined]
 from dask.delayed import Delayed
-from dask.distributed import Client
+from dask.distributed import Client, as_completed
 from numpy.typing import NDArray
 
 from karabo.error import KaraboInterferometerSimulationError
 from karabo.simulation.beam import BeamPattern
 from karabo.simulation.observation import Observation, ObservationLong
+from karabo.simulation.sky_cube import SkyCube
 from karabo.simulation.sky_model import SkyModel
 from karabo.simulation.telescope import Telescope
-from karabo.simulation.visibility import Visibility
+from karabo.simulation.visibility import Visibility, VisibilityData
 from karabo.util._types import IntFloat, OskarSettingsTreeType, PrecisionType
 from karabo.util.dask import DaskHandler
 from karabo.util.file_handle import FileHandle
 from karabo.util.gpu_util import is_cuda_available
+from karabo.util.math_util import angular_separation_deg, stokes_at_frequencies
 from karabo.warning import KaraboWarning
 
 
@@ -45,6 +48,9 @@ class FilterUnits(enum.Enum):
     Metres = "Metres"
 
 
+SOLAR_DAY_SEC = 86400.0
+SIDEREAL_DAY_SEC = 86164.0905
+
 NoiseRmsType = Literal["Range", "Data file", "Telescope model"]
 NoiseFreqType = Literal["Range", "Data file", "Observation settings", "Telescope model"]
 StationTypeType = Literal[
@@ -52,11 +58,108 @@ StationTypeType = Literal[
 ]
 
 
+def _gaussian_beam_keep_mask(
+    sources: NDArray[np.float_],
+    frequencies: NDArray[np.float_],
+    fwhm_deg: NDArray[np.float_],
+    ra0_deg: IntFloat,
+    dec0_deg: IntFloat,
+    threshold_jy: IntFloat,
+) -> NDArray[np.bool_]:
+    """Mask of the `sources` whose beam-attenuated stokes I reaches `threshold_jy`
+    in any channel, for a Gaussian station beam with field pattern FWHM
+    `fwhm_deg` per channel pointing at (ra0, dec0)."""
+    n_channels = frequencies.shape[0]
+    keep = np.zeros(sources.shape[0], dtype=np.bool_)
+    # bound the (sources, channels) temporaries
+    block_size = max(SkyModel.FLUX_BLOCK_ELEMENTS // max(n_channels, 1), 1)
+    for start in range(0, sources.shape[0], block_size):
+        block = np.asarray(sources[start : start + block_size], dtype=np.float64)
+        stokes = stokes_at_frequencies(
+            block, frequencies, out=np.empty((block.shape[0], n_channels, 4))
+        )
+        separation_deg = np.asarray(
+            angular_separation_deg(block[:, 0], block[:, 1], ra0_deg, dec0_deg)
+        )
+        # the field pattern enters the visibilities twice, hence the power pattern
+        power = np.exp(-8 * np.log(2) * (separation_deg[:, np.newaxis] / fwhm_deg) ** 2)
+        keep[start : start + block_size] = np.any(
+            np.abs(stokes[:, :, 0]) * power >= threshold_jy, axis=1
+        )
+    return keep
+
+
 # TODO: Add noise for the interferometer simulation
 # Investigate the Noise file specification by oskar
 # class InterferometerNoise()
 
 
+def _read_simulated_visibility(params_total: OskarSettingsTreeType) -> VisibilityData:
+    """Reads the .vis file written by a simulation with `params_total`."""
+    return VisibilityData.read(params_total["interferometer"]["oskar_vis_filename"])
+
+
+def _lst_buckets_of_days(
+    number_of_days: int, lst_tolerance_sec: IntFloat
+) -> NDArray[np.int_]:
+    """
+    Bucket of each day of a long observation, by the LST offset of the day to
+    the first day, which grows by a solar minus a sidereal day per day. Bucket b
+    contains the days whose offset is closest to `b * lst_tolerance_sec`.
+    """
+    if lst_tolerance_sec <= 0:
+        raise KaraboInterferometerSimulationError(
+            f"`lst_tolerance_sec` must be positive but is {lst_tolerance_sec}."
+        )
+    lst_offsets_sec = np.arange(number_of_days) * (SOLAR_DAY_SEC - SIDEREAL_DAY_SEC)
+    return cast(
+        NDArray[np.int_], np.round(lst_offsets_sec / lst_tolerance_sec).astype(np.int_)
+    )
+
+
+def _add_visibility_noise(
+    vis: VisibilityData,
+    rms_per_channel_jy: NDArray[np.float_],
+    rng: np.random.Generator,
+) -> VisibilityData:
+    """
+    Adds gaussian noise with the rms of each channel to the real and imaginary
+    parts of all visibilities.
+    """
+    scale = rms_per_channel_jy[np.newaxis, :, np.newaxis, np.newaxis]
+    noise = rng.standard_normal(vis.vis.shape) + 1j * rng.standard_normal(vis.vis.shape)
+    return replace(vis, vis=vis.vis + (scale * noise).astype(vis.vis.dtype))
+
+
+def _tree_sum_visibilities(visibilities: List[Delayed], fan_in: int = 4) -> Delayed:
+    """
+    Sums delayed `VisibilityData` level by level in groups of `fan_in`, so the
+    sums run in parallel on the workers and none of them has to hold more than
+    `fan_in` visibilities at once.
+    """
+    while len(visibilities) > 1:
+        visibilities = [
+            delayed(VisibilityData.sum)(visibilities[i : i + fan_in])
+            for i in range(0, len(visibilities), fan_in)
+        ]
+    return visibilities[0]
+
+
+def _as_completed_visibilities(
+    client: Client, visibilities: List[Delayed]
+) -> Iterator[Tuple[int, VisibilityData]]:
+    """
+    Computes the delayed `VisibilityData` on `client` and yields (index,
+    visibilities) as soon as one is done, so the driver only holds one of them
+    at a time.
+    """
+    futures = client.compute(visibilities)
+    idx_of_future = {future.key: idx for idx, future in enumerate(futures)}
+    for future, vis in as_completed(futures, with_results=True):
+        yield idx_of_future[future.key], vis
+        future.release()
+
+
 class InterferometerSimulation:
     """
     Class containing all configuration for the Interferometer Simulation.
@@ -130,6 +233,13 @@ class InterferometerSimulation:
     :ivar beam_polX: currently only considered for `ObservationLong`
     :ivar use_gpus: Set to true if you want to use gpus for the simulation
     :ivar client: The dask client to use for the simulation
+    :ivar split_observation_by_time: If true and a dask client is used, the
+                                     observation is split into contiguous time
+                                     windows (see `Observation.split_by_time`),
+                                     which are simulated in parallel and
+                                     concatenated in time order into one MS.
+    :ivar n_split_time_windows: Number of time windows, or "each" for one window
+                                per time step.
     :ivar split_idxs_per_group: The indices of the sky model to split for each group
                                 of workers. If None, the sky model will not be split.
                                 Useful if the sky model is too large to fit into the
@@ -155,6 +265,23 @@ class InterferometerSimulation:
                                 generated with ARatmospy. The file parameters
                                 (times/frequencies) should coincide with the planned
                                 observation.
+    :ivar beam_pruning_threshold_jy: Opt-in. If set and `station_type` is
+                                     "Gaussian beam", sources whose beam-attenuated
+                                     stokes I stays below this value in all
+                                     channels are dropped before the simulation,
+                                     see `prune_sky_by_beam`. Typically a small
+                                     fraction of the expected image noise.
+    :ivar reuse_days_lst_tolerance_sec: Opt-in, only considered for
+                                        `ObservationLong`. If set, the days are not
+                                        all simulated. A day observes the sky a
+                                        sidereal day after an earlier simulated
+                                        day at the same LST, so its visibilities
+                                        are the ones of that day, re-timestamped.
+                                        Days whose LST offset to the first day (about
+                                        236s per day) is within this tolerance share
+                                        one noiseless simulation, so they start up to
+                                        half the tolerance off their nominal start.
+                                        Independent noise is added to every day.
     """
 
     def __init__(
@@ -190,6 +317,8 @@ class InterferometerSimulation:
         use_dask: Optional[bool] = None,
         split_observation_by_channels: bool = False,
         n_split_channels: Union[int, str] = "each",
+        split_observation_by_time: bool = False,
+        n_split_time_windows: Union[int, str] = "each",
         client: Optional[Client] = None,
         precision: PrecisionType = "single",
         station_type: StationTypeType = "Isotropic beam",
@@ -201,6 +330,8 @@ class InterferometerSimulation:
         ionosphere_screen_height_km: Optional[float] = 300,
         ionosphere_screen_pixel_size_m: Optional[float] = 0,
         ionosphere_isoplanatic_screen: Optional[bool] = False,
+        beam_pruning_threshold_jy: Optional[IntFloat] = None,
+        reuse_days_lst_tolerance_sec: Optional[IntFloat] = None,
     ) -> None:
         self.ms_file_path = ms_file_path
         self.vis_path = vis_path
@@ -259,6 +390,8 @@ class InterferometerSimulation:
 
         self.split_observation_by_channels = split_observation_by_channels
         self.n_split_channels = n_split_channels
+        self.split_observation_by_time = split_observation_by_time
+        self.n_split_time_windows = n_split_time_windows
 
         self.precision = precision
         self.station_type = station_type
@@ -274,17 +407,31 @@ class InterferometerSimulation:
         self.ionosphere_screen_height_km = ionosphere_screen_height_km
         self.ionosphere_screen_pixel_size_m = ionosphere_screen_pixel_size_m
         self.ionosphere_isoplanatic_screen = ionosphere_isoplanatic_screen
+        self.beam_pruning_threshold_jy = beam_pruning_threshold_jy
+        self.reuse_days_lst_tolerance_sec = reuse_days_lst_tolerance_sec
 
     def run_simulation(
-        self, telescope: Telescope, sky: SkyModel, observation: Observation
+        self,
+        telescope: Telescope,
+        sky: Union[SkyModel, SkyCube],
+        observation: Observation,
     ) -> Visibility:
         """
         Run a single interferometer simulation with the given sky, telescope.png and
         observation settings.
         :param telescope: telescope.png model defining the telescope.png configuration
-        :param sky: sky model defining the sky sources
+        :param sky: sky model defining the sky sources. A `SkyCube` is converted
+            lazily, so its flat sources are only created per simulated chunk.
         :param observation: observation settings
         """
+        if isinstance(sky, SkyCube):
+            sky = sky.to_sky_model()
+        if self.beam_pruning_threshold_jy is not None:
+            sky = self.prune_sky_by_beam(
+                sky=sky,
+                observation=observation,
+                threshold_jy=self.beam_pruning_threshold_jy,
+            )
         if isinstance(observation, ObservationLong):
             return self.__run_simulation_long(
                 telescope=telescope, sky=sky, observation=observation
@@ -294,6 +441,90 @@ class InterferometerSimulation:
                 telescope=telescope, sky=sky, observation=observation
             )
 
+    def prune_sky_by_beam(
+        self,
+        sky: SkyModel,
+        observation: Observation,
+        threshold_jy: IntFloat,
+    ) -> SkyModel:
+        """
+        Drops the sources which contribute less than `threshold_jy` to the
+        visibilities in every channel of `observation`, because the station beam
+        attenuates them. The sources are evaluated at the channel frequencies (see
+        `SkyModel.flux_at`) and attenuated by the analytic Gaussian power pattern
+        pointing at the phase centre, chunk by chunk for dask-backed skies.
+
+        Only the "Gaussian beam" `station_type` has an analytic beam, other
+        station types leave the sky unchanged.
+
+        :param sky: Sky to prune.
+        :param observation: Observation defining channels and phase centre.
+        :param threshold_jy: Minimum apparent stokes I flux in Jy to keep a source.
+
+        :return: Sky with the remaining sources.
+        """
+        if sky.sources is None:
+            raise KaraboInterferometerSimulationError(
+                "Sky model has not been loaded. Please load the sky model first."
+            )
+        if self.station_type != "Gaussian beam":
+            print(
+                KaraboWarning(
+                    "Beam pruning requires `station_type` 'Gaussian beam' but is "
+                    + f"'{self.station_type}', the sky isn't pruned."
+                )
+            )
+            return sky
+        if self.gauss_beam_fwhm_deg <= 0:
+            raise KaraboInterferometerSimulationError(
+                "`gauss_beam_fwhm_deg` must be positive for beam pruning."
+            )
+        frequencies = observation.start_frequency_hz + np.arange(
+            observation.number_of_channels
+        ) * float(observation.frequency_increment_hz)
+        fwhm_deg = np.full(frequencies.shape, float(self.gauss_beam_fwhm_deg))
+        if self.gauss_ref_freq_hz > 0:
+            # the beam width scales with the wavelength
+            fwhm_deg *= self.gauss_ref_freq_hz / frequencies
+        ra0_deg = observation.phase_centre_ra_deg
+        dec0_deg = observation.phase_centre_dec_deg
+        data = sky.sources.data
+        if isinstance(data, da):
+            rows = data[:, : SkyModel.SOURCES_COLS].rechunk({1: -1})
+            keep = rows.map_blocks(
+                _gaussian_beam_keep_mask,
+                drop_axis=1,
+                dtype=np.bool_,
+                frequencies=frequencies,
+                fwhm_deg=fwhm_deg,
+                ra0_deg=ra0_deg,
+                dec0_deg=dec0_deg,
+                threshold_jy=threshold_jy,
+            ).compute()
+        else:
+            keep = _gaussian_beam_keep_mask(
+                np.asarray(data),
+                frequencies=frequencies,
+                fwhm_deg=fwhm_deg,
+                ra0_deg=ra0_deg,
+                dec0_deg=dec0_deg,
+                threshold_jy=threshold_jy,
+            )
+        idxs = np.flatnonzero(keep)
+        n_pruned = sky.num_sources - idxs.shape[0]
+        print(
+            f"Beam pruning skipped {n_pruned} of {sky.num_sources} sources "
+            + f"({100 * n_pruned / max(sky.num_sources, 1):.3g}%) below "
+            + f"{threshold_jy} Jy apparent flux."
+        )
+        if n_pruned == 0:
+            return sky
+        return SkyModel(
+            sources=sky.rechunk_array_based_on_self(sky.sources[idxs]),
+            wcs=sky.wcs,
+            precision=sky.precision,
+        )
+
     def set_ionosphere(self, file_path: str) -> None:
         """
         Set the path to an ionosphere screen file generated with ARatmospy. The file
@@ -337,90 +568,153 @@ class InterferometerSimulation:
             if not isinstance(array_sky.data, da):
                 array_sky.data = from_array(array_sky.data, chunks="auto")
             dask_array = array_sky.data
-            oskar_settings_tree = observation.get_OSKAR_settings_tree()
-            if self.split_observation_by_channels:
-                raise NotImplementedError(
-                    "Split by channels is probably implemented wrong "
-                )
-                if verbose:
-                    print(
-                        "Splitting simulation by channels with the following parameter:"
-                    )
-                    print(f"{self.n_split_channels=}")
-                # Calculate the number of splits
-                n_splits = int(
-                    oskar_settings_tree["observation"]["num_channels"]
-                    if self.n_split_channels == "each"
-                    else self.n_split_channels
+            if self.split_observation_by_time:
+                n_windows = int(
+                    observation.number_of_time_steps
+                    if self.n_split_time_windows == "each"
+                    else self.n_split_time_windows
                 )
                 if verbose:
                     print(
-                        f"Splitting into {n_splits} "
-                        f"observations because {self.n_split_channels=}"
+                        f"Splitting into {n_windows} time windows because "
+                        f"{self.n_split_time_windows=}"
                     )
-                observations = Observation.extract_multiple_observations_from_settings(
-                    oskar_settings_tree,
-                    n_splits,
-                    self.channel_bandwidth_hz,
-                )
+                time_windows = observation.split_by_time(n_windows)
             else:
-                observations = [oskar_settings_tree]
-
-            # Define delayed objects
-            delayed_results = []
-            array_sky_delayed = [x[0] for x in dask_array.to_delayed()]
+                time_windows = [observation]
+
+            # settings of each sub-band of each time window
+            observations: List[List[OskarSettingsTreeType]] = []
+            for time_window in time_windows:
+                oskar_settings_tree = time_window.get_OSKAR_settings_tree()
+                if self.split_observation_by_channels:
+                    if verbose:
+                        print(
+                            "Splitting simulation by channels with the following "
+                            "parameter:"
+                        )
+                        print(f"{self.n_split_channels=}")
+                    # Calculate the number of splits
+                    n_splits = int(
+                        oskar_settings_tree["observation"]["num_channels"]
+                        if self.n_split_channels == "each"
+                        else self.n_split_channels
+                    )
+                    if verbose:
+                        print(
+                            f"Splitting into {n_splits} "
+                            f"observations because {self.n_split_channels=}"
+                        )
+                    observations.append(
+                        Observation.extract_multiple_observations_from_settings(
+                            oskar_settings_tree,
+                            n_splits,
+                            self.channel_bandwidth_hz,
+                        )
+                    )
+                else:
+                    observations.append([oskar_settings_tree])
 
-            if len(array_sky_delayed) > 1:
-                raise NotImplementedError(
-                    "No solution currently exist to recombine the .vis files "
-                    " when splitting the sky model into chunks."
-                )
-                print(
-                    f"WARNING: Sky model is split into {len(array_sky_delayed)} "
-                    "chunks. Recombining the measurement sets but not the .vis files."
-                )
+            # Define delayed objects, per time window, sub-band and sky chunk
+            delayed_results: List[List[List[Delayed]]] = []
+            # every chunk has to contain all columns of its sources
+            array_sky_delayed = [x[0] for x in dask_array.rechunk({1: -1}).to_delayed()]
+            n_sky_chunks = len(array_sky_delayed)
 
             # Define the function as delayed
             run_simu_delayed = delayed(self.__run_simulation_oskar)
 
             # Calculate the number of jobs
-            n_jobs = len(observations) * len(array_sky_delayed)
+            n_jobs = sum(len(sub_bands) for sub_bands in observations) * n_sky_chunks
 
             print(f"Submitting {n_jobs} jobs to the cluster.")
 
-            for sky_ in array_sky_delayed:
-                for observation_params in observations:
-                    # Create params
-                    interferometer_params = (
-                        self.__create_interferometer_params_with_random_paths(
-                            input_telpath
+            for window_idx, sub_bands in enumerate(observations):
+                window_results = []
+                for band_idx, observation_params in enumerate(sub_bands):
+                    observation_results = []
+                    for chunk_idx, sky_ in enumerate(array_sky_delayed):
+                        # Create params
+                        interferometer_params = (
+                            self.__create_interferometer_params_with_random_paths(
+                                input_telpath
+                            )
                         )
-                    )
 
-                    params_total = {**interferometer_params, **observation_params}
-
-                    # Submit the jobs
-                    delayed_ = run_simu_delayed(
-                        os_sky=sky_,
-                        params_total=params_total,
-                        precision=self.precision,
-                    )
-                    delayed_results.append(delayed_)
+                        params_total = {**interferometer_params, **observation_params}
+                        if n_jobs > 1:
+                            # the jobs are only combined as .vis, and the noise
+                            # must only be added once to the summed visibilities
+                            # of the sky chunks
+                            params_total["interferometer"] = {
+                                **params_total["interferometer"],
+                                "ms_filename": "",
+                            }
+                            if chunk_idx > 0:
+                                params_total["interferometer"]["noise/enable"] = "False"
+                            elif isinstance(self.noise_seed, int):
+                                # time windows and sub-bands must not repeat the
+                                # same noise, every window has the same sub-bands
+                                params_total["interferometer"]["noise/seed"] = str(
+                                    self.noise_seed
+                                    + window_idx * len(sub_bands)
+                                    + band_idx
+                                )
+
+                        # Submit the jobs
+                        delayed_ = run_simu_delayed(
+                            os_sky=sky_,
+                            params_total=params_total,
+                            precision=self.precision,
+                        )
+                        observation_results.append(delayed_)
+                    window_results.append(observation_results)
+                delayed_results.append(window_results)
+
+            if n_jobs == 1:
+                results = cast(
+                    List[OskarSettingsTreeType],
+                    compute(delayed_results[0][0][0], scheduler="distributed"),
+                )
+                self.ms_file_path = results[0]["interferometer"]["ms_filename"]
+                return Visibility(
+                    results[0]["interferometer"]["oskar_vis_filename"],
+                    self.ms_file_path,
+                )
 
-            results = cast(
-                List[OskarSettingsTreeType],
-                compute(*delayed_results, scheduler="distributed"),
-            )
-            # Extract visibilities
-            visibilities = [x["interferometer"]["oskar_vis_filename"] for x in results]
-            ms_file_paths = [x["interferometer"]["ms_filename"] for x in results]
-            if len(visibilities) > 1:
-                self.ms_file_path = Visibility.combine_vis_sky_chunks(
-                    visibilities, self.ms_file_path, return_path=True
+            # Visibilities are linear in the sky, so the visibilities of the sky
+            # chunks are summed by a tree reduction on the workers, and the
+            # channel splits are appended to each other. The time windows are
+            # written to the measurement set as soon as they arrive.
+            windows_vis = [
+                delayed(VisibilityData.concatenate)(
+                    [
+                        _tree_sum_visibilities(
+                            [
+                                delayed(_read_simulated_visibility)(result)
+                                for result in observation_results
+                            ]
+                        )
+                        for observation_results in window_results
+                    ],
+                    axis="channel",
                 )
-            else:
-                self.ms_file_path = ms_file_paths[0]
-            return Visibility(visibilities[0], self.ms_file_path)
+                for window_results in delayed_results
+            ]
+            # the windows may differ by one time step
+            first_time_steps = np.cumsum(
+                [0] + [window.number_of_time_steps for window in time_windows[:-1]]
+            ).tolist()
+            if self.ms_file_path is None:
+                self.ms_file_path = FileHandle(suffix=".MS").path
+            self.__warn_vis_path_ignored()
+            print(f"Writing combined visibilities to {self.ms_file_path}")
+            VisibilityData.write_ms_stream(
+                self.ms_file_path,
+                _as_completed_visibilities(self.client, windows_vis),
+                first_time_steps=first_time_steps,
+            )
+            return Visibility(ms_file_path=self.ms_file_path)
 
         # Run the simulation on the local machine
         else:
@@ -505,10 +799,7 @@ class InterferometerSimulation:
         sky: SkyModel,
         observation: ObservationLong,
     ) -> Visibility:
-        # Initialise the telescope and observation settings
-        observation_params = observation.get_OSKAR_settings_tree()
         input_telpath = telescope.path
-        runs = []
 
         if self.beam_polX is None or self.beam_polY is None:
             raise KaraboInterferometerSimulationError(
@@ -521,52 +812,186 @@ class InterferometerSimulation:
                 "`telescope.path` must be set but is None."
             )
 
-        # Loop over days
-        for i, current_date in enumerate(
-            pd.date_range(
-                observation.start_date_and_time, periods=observation.number_of_days
-            ),
-            1,
-        ):
-            # Convert to date
-            current_date = current_date.date()
-            print(f"Observing Day: {i}. Date: {current_date}")
-
-            if self.enable_array_beam:
-                # ------------ X-coordinate
-                pb = deepcopy(self.beam_polX)
-                beam = pb.sim_beam()
-                pb.save_cst_file(beam[3], telescope=telescope)
-                pb.fit_elements(telescope)
-
-                # ------------ Y-coordinate
-                pb = deepcopy(self.beam_polY)
-                pb.save_cst_file(beam[4], telescope=telescope)
-                pb.fit_elements(telescope)
-
-            # Create params
+        # The beams are the same for every day, so they're only fitted once
+        if self.enable_array_beam:
+            # ------------ X-coordinate
+            pb = deepcopy(self.beam_polX)
+            beam = pb.sim_beam()
+            pb.save_cst_file(beam[3], telescope=telescope)
+            pb.fit_elements(telescope)
+
+            # ------------ Y-coordinate
+            pb = deepcopy(self.beam_polY)
+            pb.save_cst_file(beam[4], telescope=telescope)
+            pb.fit_elements(telescope)
+
+        n_days = observation.number_of_days
+        lst_tolerance_sec = self.reuse_days_lst_tolerance_sec
+        reuse_days = lst_tolerance_sec is not None
+        reference_of_day = np.arange(n_days)
+        noise_rms_per_channel: Optional[NDArray[np.float_]] = None
+        if lst_tolerance_sec is not None:
+            # the days are derived from one simulation per LST bucket
+            buckets, reference_of_day = np.unique(
+                _lst_buckets_of_days(n_days, lst_tolerance_sec),
+                return_inverse=True,
+            )
+            starts = [
+                observation.start_date_and_time
+                + timedelta(seconds=float(bucket * lst_tolerance_sec))
+                for bucket in buckets
+            ]
+            if self.noise_enable:
+                noise_rms_per_channel = self.__get_noise_rms_per_channel(observation)
+            print(f"Simulating {len(starts)} reference days for {n_days} days.")
+        else:
+            starts = [
+                observation.start_date_and_time + timedelta(days=day_idx)
+                for day_idx in range(n_days)
+            ]
+
+        # Create the params of every simulation
+        sims_params: List[OskarSettingsTreeType] = []
+        for sim_idx, start in enumerate(starts):
+            day = copy(observation)
+            day.start_date_and_time = start
+            print(f"Observing Day: {sim_idx + 1}. Date: {day.start_date_and_time}")
             interferometer_params = (
                 self.__create_interferometer_params_with_random_paths(input_telpath)
             )
-
-            params_total = {**interferometer_params, **observation_params}
-
-            # Submit the simulation to the workers
-            params_total = InterferometerSimulation.__run_simulation_oskar(
-                sky.sources,
-                params_total,
-                self.precision,
+            params_total = {
+                **interferometer_params,
+                **day.get_OSKAR_settings_tree(),
+            }
+            # the simulations are only combined as .vis
+            params_total["interferometer"]["ms_filename"] = ""
+            if reuse_days:
+                # independent noise is added to every derived day
+                params_total["interferometer"]["noise/enable"] = "False"
+            elif isinstance(self.noise_seed, int):
+                # days must not repeat the same noise
+                params_total["interferometer"]["noise/seed"] = str(
+                    self.noise_seed + sim_idx
+                )
+            sims_params.append(params_total)
+
+        if self.ms_file_path is None:
+            self.ms_file_path = FileHandle(suffix=".MS").path
+        print("### Writing combined visibilities in ", self.ms_file_path)
+        if not reuse_days:
+            VisibilityData.write_ms_stream(
+                self.ms_file_path, self.__iter_simulations(sky, sims_params)
+            )
+            print("Done with simulation.")
+            # Returns currently just one of the visiblities, of the first day.
+            return Visibility(
+                sims_params[0]["interferometer"]["oskar_vis_filename"],
+                self.ms_file_path,
             )
-            runs.append(params_total)
 
-        # Combine the visibilities
-        visibility_paths = [x["interferometer"]["oskar_vis_filename"] for x in runs]
+        references = dict(self.__iter_simulations(sky, sims_params))
 
-        Visibility.combine_vis(visibility_paths, self.ms_file_path)
+        def derive_days() -> Iterator[Tuple[int, VisibilityData]]:
+            for day_idx in range(n_days):
+                # a sidereal day later, the sky is observed at the same LST
+                reference = references[int(reference_of_day[day_idx])]
+                vis = replace(
+                    reference,
+                    time_stamps_mjd_sec=reference.time_stamps_mjd_sec
+                    + day_idx * SIDEREAL_DAY_SEC,
+                )
+                if noise_rms_per_channel is not None:
+                    rng = np.random.default_rng(
+                        [self.noise_seed, day_idx]
+                        if isinstance(self.noise_seed, int)
+                        else None
+                    )
+                    vis = _add_visibility_noise(vis, noise_rms_per_channel, rng)
+                yield day_idx, vis
 
+        self.__warn_vis_path_ignored()
+        VisibilityData.write_ms_stream(self.ms_file_path, derive_days())
         print("Done with simulation.")
-        # Returns currently just one of the visiblities, of the first day.
-        return Visibility(visibility_paths[0], self.ms_file_path)
+        return Visibility(ms_file_path=self.ms_file_path)
+
+    def __warn_vis_path_ignored(self) -> None:
+        """Combined visibilities are only written as measurement set."""
+        if self.vis_path is not None:
+            print(
+                KaraboWarning(
+                    "Combined visibilities are only written as measurement set "
+                    + f"{self.ms_file_path}, no .vis file is written to "
+                    + f"`vis_path` {self.vis_path}."
+                )
+            )
+
+    def __get_noise_rms_per_channel(
+        self, observation: Observation
+    ) -> NDArray[np.float_]:
+        """
+        Noise rms in Jy of each channel of `observation`, expanded linearly from
+        `noise_rms_start` to `noise_rms_end` over the noise frequencies.
+        """
+        if self.noise_rms != "Range" or self.noise_freq not in (
+            "Range",
+            "Observation settings",
+        ):
+            raise KaraboInterferometerSimulationError(
+                "Deriving the noise of the days of a long observation requires "
+                + "`noise_rms` 'Range' and `noise_freq` 'Range' or 'Observation "
+                + f"settings', but they're {self.noise_rms} and {self.noise_freq}."
+            )
+        channel_freqs_hz = (
+            observation.start_frequency_hz
+            + np.arange(observation.number_of_channels)
+            * observation.frequency_increment_hz
+        )
+        if self.noise_freq == "Observation settings":
+            noise_freqs_hz = channel_freqs_hz
+        else:
+            noise_freqs_hz = (
+                self.noise_start_freq
+                + np.arange(self.noise_number_freq) * self.noise_inc_freq
+            )
+        noise_rms_jy = np.linspace(
+            self.noise_rms_start, self.noise_rms_end, noise_freqs_hz.shape[0]
+        )
+        return np.interp(channel_freqs_hz, noise_freqs_hz, noise_rms_jy)
+
+    def __iter_simulations(
+        self,
+        sky: SkyModel,
+        sims_params: List[OskarSettingsTreeType],
+    ) -> Iterator[Tuple[int, VisibilityData]]:
+        """
+        Simulates `sky` with each of `sims_params` (e.g. the days of a long
+        observation) and yields (index, visibilities) as soon as a simulation is
+        done. On a dask client, the simulations are independent tasks, otherwise
+        they're run one after another.
+        """
+        if self.client is None:
+            for sim_idx, params_total in enumerate(sims_params):
+                InterferometerSimulation.__run_simulation_oskar(
+                    sky.sources, params_total, self.precision
+                )
+                yield sim_idx, _read_simulated_visibility(params_total)
+            return
+
+        # the sky is shared by all simulations, so it's only sent to the workers once
+        sky_delayed = delayed(sky.sources)
+        run_simu_delayed = delayed(InterferometerSimulation.__run_simulation_oskar)
+        sims_vis: List[Delayed] = [
+            delayed(_read_simulated_visibility)(
+                run_simu_delayed(
+                    os_sky=sky_delayed,
+                    params_total=params_total,
+                    precision=self.precision,
+                )
+            )
+            for params_total in sims_params
+        ]
+        print(f"Submitting {len(sims_vis)} jobs to the cluster.")
+        yield from _as_completed_visibilities(self.client, sims_vis)
 
     def simulate_foreground_vis(
         self,
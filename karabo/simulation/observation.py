@@ -2,8 +2,6 @@ import copy
 from datetime import datetime, timedelta
 from typing import List, Union
 
-import numpy as np
-
 from karabo.error import KaraboError
 from karabo.util._types import IntFloat, OskarSettingsTreeType
 
@@ -122,38 +120,88 @@ class Observation:
         This function returns a list of dictionaries containing the settings
         of each observation. The start_frequency and number_of_channels
         need to be updated for each observation.
+
+        The channels are split into at most `number_of_observations` contiguous
+        sub-bands of balanced size (they differ by at most one channel), whose
+        start frequencies lie on the channel grid given by `frequency_inc_hz`.
+
+        :param settings: OSKAR settings tree of the whole observation
+        :param number_of_observations: number of sub-bands, there are at most as
+            many sub-bands as channels
+        :param channel_bandwidth_hz: Kept for compatibility, the channel grid is
+            defined by `frequency_inc_hz` of `settings`.
+        :return: settings of each sub-band, ordered by frequency
         """
+        if number_of_observations < 1:
+            raise KaraboError(
+                "`number_of_observations` must be positive but is "
+                + f"{number_of_observations}."
+            )
         settings_list: List[OskarSettingsTreeType] = []
 
         # Extract some settings from the dictionary
         n_channels = int(settings["observation"]["num_channels"])
         start_frequency_hz = float(settings["observation"]["start_frequency_hz"])
+        frequency_inc_hz = float(settings["observation"]["frequency_inc_hz"])
 
-        # Calculate n_channels per split
-        n_channels_per_split = int(
-            np.ceil(n_channels / number_of_observations)
-        )  # round up
+        # Balanced split, the first `n_larger` sub-bands get one more channel
+        n_splits = min(number_of_observations, n_channels)
+        n_channels_per_split, n_larger = divmod(n_channels, n_splits)
 
-        # Calculate the observed frequency
-        observed_frequency_hz = n_channels * channel_bandwidth_hz
-
-        # Create a list of settings for each observation
-        current_start_frequency_hz = start_frequency_hz
-
-        while observed_frequency_hz > 0:
+        start_channel = 0
+        for split_idx in range(n_splits):
+            n_split_channels = n_channels_per_split + int(split_idx < n_larger)
             current_settings = copy.deepcopy(settings)
             current_settings["observation"]["start_frequency_hz"] = str(
-                current_start_frequency_hz
+                start_frequency_hz + start_channel * frequency_inc_hz
             )
-            current_settings["observation"]["num_channels"] = str(n_channels_per_split)
+            current_settings["observation"]["num_channels"] = str(n_split_channels)
             settings_list.append(current_settings)
-            current_start_frequency_hz += (
-                n_channels_per_split * channel_bandwidth_hz + 1
-            )
-            observed_frequency_hz -= n_channels_per_split * channel_bandwidth_hz
+            start_channel += n_split_channels
 
         return settings_list
 
+    def split_by_time(self, number_of_windows: int) -> List["Observation"]:
+        """
+        Splits this observation into contiguous time windows, e.g. to simulate
+        them in parallel and concatenate their visibilities in time order.
+
+        The time steps are split into at most `number_of_windows` windows of
+        balanced size (they differ by at most one time step). Each window is a
+        copy of this observation with `start_date_and_time`, `length` and
+        `number_of_time_steps` adjusted, so its time steps coincide with the ones
+        of this observation (up to the millisecond precision of OSKAR).
+
+        :param number_of_windows: number of time windows, there are at most as
+            many windows as time steps
+        :return: observation of each time window, ordered by time
+        """
+        if number_of_windows < 1:
+            raise KaraboError(
+                f"`number_of_windows` must be positive but is {number_of_windows}."
+            )
+        n_time_steps = self.number_of_time_steps
+        time_inc = self.length / n_time_steps
+
+        # Balanced split, the first `n_larger` windows get one more time step
+        n_windows = min(number_of_windows, n_time_steps)
+        n_steps_per_window, n_larger = divmod(n_time_steps, n_windows)
+
+        windows: List[Observation] = []
+        start_step = 0
+        for window_idx in range(n_windows):
+            n_window_steps = n_steps_per_window + int(window_idx < n_larger)
+            window = copy.copy(self)
+            window.start_date_and_time = self.start_date_and_time + (
+                start_step * time_inc
+            )
+            window.length = n_window_steps * time_inc
+            window.number_of_time_steps = n_window_steps
+            windows.append(window)
+            start_step += n_window_steps
+
+        return windows
+
     def __strfdelta(
         self,
         tdelta: timedelta,
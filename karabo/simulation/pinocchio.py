@@ -2,13 +2,23 @@ import os
 import shutil
 import subprocess
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Literal, Optional, Union
 
+import dask
+import dask.array as da
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
+import xarray as xr
+from dask.utils import parse_bytes
+from numpy.typing import NDArray
 
 from karabo.error import KaraboPinocchioError
-from karabo.simulation.sky_model import SkyModel
+from karabo.simulation.sky_model import (
+    XARRAY_DIM_0_DEFAULT,
+    XARRAY_DIM_1_DEFAULT,
+    SkyModel,
+)
 from karabo.util._types import IntFloat
 from karabo.util.file_handle import FileHandle
 
@@ -60,9 +70,41 @@ class Pinocchio:
     PIN_U_FLUS_IDX = 4
     PIN_V_FLUS_IDX = 5
     PIN_REF_F_IDX = 6
+    # halo properties, appended after the `SkyModel.SOURCES_COLS` columns
+    PIN_TRUE_REDSHIFT_IDX = 12
+    PIN_OBS_REDSHIFT_IDX = 13
+    PIN_MASS_IDX = 14
+    PIN_COLS = 15
 
     RAD_TO_DEG = 180 / np.pi
 
+    # columns of the past light cone: id, true redshift, comoving position
+    # (Mpc/h), velocity (km/s), mass (M_sun/h), theta & phi (deg), line of sight
+    # velocity (km/s) and observed redshift
+    PLC_COLS = 13
+    PLC_ID_IDX = 0
+    PLC_TRUE_REDSHIFT_IDX = 1
+    PLC_X_IDX = 2
+    PLC_Y_IDX = 3
+    PLC_Z_IDX = 4
+    PLC_MASS_IDX = 8
+    PLC_OBS_REDSHIFT_IDX = 12
+    PLC_BINARY_DTYPE = np.dtype(
+        [
+            ("recordStart", np.int32),
+            ("id", np.uint64),
+            ("truez", np.float64),
+            ("pos", np.float64, 3),
+            ("vel", np.float64, 3),
+            ("mass", np.float64),
+            ("theta", np.float64),
+            ("phi", np.float64),
+            ("vlos", np.float64),
+            ("obsz", np.float64),
+            ("recordEnd", np.int32),
+        ]
+    )
+
     def __init__(self) -> None:
         """
         Creates temp directory (wd) for the pinocchio run.
@@ -693,13 +735,17 @@ class Pinocchio:
 
     @staticmethod
     def getSkyModelFromFiles(
-        path: str, near: IntFloat = 0, far: IntFloat = 100
+        path: str,
+        near: IntFloat = 0,
+        far: IntFloat = 100,
+        chunksize: Union[int, Literal["auto"]] = "auto",
+        binary: Optional[bool] = None,
     ) -> SkyModel:
         """
         Create a sky model from the pinocchio simulation cone. All halos from the near
         to far plane (euclid distance) will be translated into the
         RA (right ascension - [0,360] in deg)
-        and DEC (declination - [0, 90] in deg) format.
+        and DEC (declination - [-90, 90] in deg) format.
 
         example in 1D - this function will do the same on pinocchios 3D cone:
 
@@ -708,6 +754,15 @@ class Pinocchio:
 
         and translated into RA DEC
 
+        The true redshift, observed redshift and mass (M_sun/h) of the halos are
+        kept as extra source columns `Pinocchio.PIN_TRUE_REDSHIFT_IDX`,
+        `Pinocchio.PIN_OBS_REDSHIFT_IDX` and `Pinocchio.PIN_MASS_IDX` after the
+        `SkyModel.SOURCES_COLS` columns.
+
+        The light cone is read in blocks of `chunksize` halos, each block is
+        filtered by the radial shell [near, far] and converted with numpy, so
+        only the halos within the shell are kept in memory.
+
         :param path: path to the past light cone file, if there is no file,
         use the a pinocchio run to create such a file.
         :type path: str
@@ -715,43 +770,117 @@ class Pinocchio:
         :type near: float, optional
         :param far: ending distance from the (0,0,0) point in [Mpc/h], default to 100
         :type far: float, optional
+        :param chunksize: number of halos read at once and number of sources per
+        chunk of the dask-backed sky, 'auto' derives it from the dask config
+        `array.chunk-size`, defaults to "auto"
+        :type chunksize: int or str, optional
+        :param binary: whether the file is a binary or a text light cone,
+        detected from the file if None, defaults to None
+        :type binary: bool, optional
         :return: SkyModel with the point sources in radial distance from near to far
         :rtype: SkyModel
         """
 
-        assert near < far, "near is further or equal to far"
-
-        # load pinocchio data
-        (x, y, z) = np.loadtxt(path, unpack=True, usecols=(2, 3, 4))
-
-        assert x.shape == y.shape == z.shape, "x, y, z do not have the same dimensions"
-
-        length: int = len(x)
-        skyModArr = np.empty((length, 7))
-
-        i: int
-        for i in range(length):
-            xPin = x[i]
-            yPin = y[i]
-            zPin = z[i]
-
-            radDist = np.sqrt(xPin**2 + yPin**2 + zPin**2)  # radial distance
+        if near >= far:
+            raise KaraboPinocchioError(f"near {near} is further or equal to far {far}")
+        if chunksize == "auto":
+            chunk_bytes = parse_bytes(dask.config.get("array.chunk-size"))
+            chunksize = max(chunk_bytes // (Pinocchio.PIN_COLS * 8), 1)
+        if binary is None:
+            binary = Pinocchio.__isBinaryLightCone(path)
+        blocks = (
+            Pinocchio.__readBinaryLightCone(path, chunksize)
+            if binary
+            else Pinocchio.__readTextLightCone(path, chunksize)
+        )
 
-            # skip if not between near and far "plane"
-            if radDist < near and radDist > far:
-                continue
+        skyBlocks: List[NDArray[np.float64]] = []
+        for block in blocks:
+            x = block[:, Pinocchio.PLC_X_IDX]
+            y = block[:, Pinocchio.PLC_Y_IDX]
+            z = block[:, Pinocchio.PLC_Z_IDX]
+            radDist = np.sqrt(x**2 + y**2 + z**2)
+            inShell = (radDist >= near) & (radDist <= far)
+            x, y, z = x[inShell], y[inShell], z[inShell]
+
+            skyBlock = np.zeros((x.shape[0], Pinocchio.PIN_COLS))
+            skyBlock[:, Pinocchio.PIN_RIGHT_ASCENSION_IDX] = np.mod(
+                np.degrees(np.arctan2(y, x)), 360
+            )
+            skyBlock[:, Pinocchio.PIN_DECLINATION_IDX] = np.degrees(
+                np.arctan2(z, np.hypot(x, y))
+            )
+            skyBlock[:, Pinocchio.PIN_I_FLUS_IDX] = 1
+            skyBlock[:, Pinocchio.PIN_REF_F_IDX] = 1.0e8
+            halos = block[inShell]
+            skyBlock[:, Pinocchio.PIN_TRUE_REDSHIFT_IDX] = halos[
+                :, Pinocchio.PLC_TRUE_REDSHIFT_IDX
+            ]
+            skyBlock[:, Pinocchio.PIN_OBS_REDSHIFT_IDX] = halos[
+                :, Pinocchio.PLC_OBS_REDSHIFT_IDX
+            ]
+            skyBlock[:, Pinocchio.PIN_MASS_IDX] = halos[:, Pinocchio.PLC_MASS_IDX]
+            skyBlocks.append(skyBlock)
+
+        skyArr = np.concatenate(skyBlocks + [np.empty((0, Pinocchio.PIN_COLS))], axis=0)
+        chunks = (min(chunksize, max(skyArr.shape[0], 1)), -1)
+        return SkyModel(
+            xr.DataArray(
+                da.from_array(skyArr, chunks=chunks),  # type: ignore [attr-defined]
+                dims=[XARRAY_DIM_0_DEFAULT, XARRAY_DIM_1_DEFAULT],
+            )
+        )
 
-            # calculate RA DEC
-            theta = np.arccos(zPin / radDist)  # theta
-            ra = np.arctan2(yPin, xPin) * Pinocchio.RAD_TO_DEG  # RA
-            dec = (np.pi / 2.0 - theta) * Pinocchio.RAD_TO_DEG  # DEC
+    @staticmethod
+    def __isBinaryLightCone(path: str) -> bool:
+        """
+        A binary light cone consists of records of `Pinocchio.PLC_BINARY_DTYPE`,
+        each of them starts with the fortran record length.
+        """
+        itemsize = Pinocchio.PLC_BINARY_DTYPE.itemsize
+        if os.path.getsize(path) % itemsize != 0:
+            return False
+        with open(path, "rb") as plc:
+            recordLength = np.fromfile(plc, dtype=np.int32, count=1)
+        return recordLength.shape[0] == 1 and recordLength[0] == itemsize - 8
 
-            skyModArr[i, Pinocchio.PIN_RIGHT_ASCENSION_IDX] = ra
-            skyModArr[i, Pinocchio.PIN_DECLINATION_IDX] = dec
-            skyModArr[i, Pinocchio.PIN_I_FLUS_IDX] = 1
-            skyModArr[i, Pinocchio.PIN_Q_FLUS_IDX] = 0
-            skyModArr[i, Pinocchio.PIN_U_FLUS_IDX] = 0
-            skyModArr[i, Pinocchio.PIN_V_FLUS_IDX] = 0
-            skyModArr[i, Pinocchio.PIN_REF_F_IDX] = 1.0e8
+    @staticmethod
+    def __readTextLightCone(path: str, blockSize: int) -> Iterator[NDArray[np.float64]]:
+        """
+        Reads the text light cone in blocks of `blockSize` halos.
+        """
+        reader = pd.read_csv(
+            path,
+            sep=r"\s+",
+            comment=Pinocchio.PRMS_CMNT,
+            header=None,
+            usecols=range(Pinocchio.PLC_COLS),
+            dtype=np.float64,
+            chunksize=blockSize,
+        )
+        with reader:
+            for block in reader:
+                yield block.to_numpy()
 
-        return SkyModel(skyModArr)
+    @staticmethod
+    def __readBinaryLightCone(
+        path: str, blockSize: int
+    ) -> Iterator[NDArray[np.float64]]:
+        """
+        Reads the binary light cone in blocks of `blockSize` halos, as the
+        columns of the text light cone.
+        """
+        records = np.memmap(path, dtype=Pinocchio.PLC_BINARY_DTYPE, mode="r")
+        for start in range(0, records.shape[0], blockSize):
+            rec = records[start : start + blockSize]
+            block = np.empty((rec.shape[0], Pinocchio.PLC_COLS), dtype=np.float64)
+            block[:, Pinocchio.PLC_ID_IDX] = rec["id"]
+            block[:, Pinocchio.PLC_TRUE_REDSHIFT_IDX] = rec["truez"]
+            block[:, Pinocchio.PLC_X_IDX : Pinocchio.PLC_Z_IDX + 1] = rec["pos"]
+            block[:, Pinocchio.PLC_Z_IDX + 1 : Pinocchio.PLC_MASS_IDX] = rec["vel"]
+            block[:, Pinocchio.PLC_MASS_IDX] = rec["mass"]
+            block[:, Pinocchio.PLC_MASS_IDX + 1] = rec["theta"]
+            block[:, Pinocchio.PLC_MASS_IDX + 2] = rec["phi"]
+            block[:, Pinocchio.PLC_MASS_IDX + 3] = rec["vlos"]
+            block[:, Pinocchio.PLC_OBS_REDSHIFT_IDX] = rec["obsz"]
+            yield block
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Type
+
+import numpy as np
+import xarray as xr
+from astropy.wcs import WCS
+from numpy.typing import NDArray
+
+from karabo.error import KaraboSkyModelError
+from karabo.simulation.sky_model import (
+    XARRAY_DIM_0_DEFAULT,
+    XARRAY_DIM_1_DEFAULT,
+    SkyModel,
+    SkySourcesType,
+)
+
+
+class SkyModelBuilder:
+    """
+    Collects point sources batch by batch and creates a `SkyModel` at the end.
+
+    `SkyModel.add_point_sources` concatenates the existing sources with every new
+    batch, so building a sky from many small batches (e.g. per tile or per
+    simulation output) copies the already added sources over and over again.
+    The builder instead appends into a preallocated buffer whose capacity is
+    doubled whenever it's full, so adding sources costs amortised O(1) per source
+    and `build` concatenates everything once.
+
+    Example:
+
+        builder = SkyModelBuilder()
+        for tile in tiles:
+            builder.add_point_sources(tile)
+        sky = builder.build()
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 1024,
+        precision: Type[np.float_] = np.float64,
+    ) -> None:
+        """
+        :param initial_capacity: Number of sources the buffer can hold initially.
+        :param precision: Float dtype of the created `SkyModel.sources`.
+        """
+        if initial_capacity < 1:
+            raise KaraboSkyModelError(
+                f"`initial_capacity` must be positive but is {initial_capacity}."
+            )
+        self.precision = precision
+        self._buffer: NDArray[np.float_] = np.empty(
+            (initial_capacity, SkyModel.SOURCES_COLS), dtype=precision
+        )
+        self._n_sources = 0
+        self._source_ids: List[NDArray[np.object_]] = []
+        # whether the batches come with source ids, unknown until the first batch
+        self._has_source_ids: Optional[bool] = None
+
+    @property
+    def num_sources(self) -> int:
+        return self._n_sources
+
+    @property
+    def capacity(self) -> int:
+        return self._buffer.shape[0]
+
+    def __reserve(self, n_sources: int) -> None:
+        if n_sources <= self.capacity:
+            return
+        new_capacity = max(2 * self.capacity, n_sources)
+        buffer = np.empty((new_capacity, SkyModel.SOURCES_COLS), dtype=self.precision)
+        buffer[: self._n_sources] = self._buffer[: self._n_sources]
+        self._buffer = buffer
+
+    def add_point_sources(self, sources: SkySourcesType) -> None:
+        """
+        Appends sources, see `SkyModel.add_point_sources` for the accepted
+        formats. Either all or none of the batches must provide source ids.
+
+        :param sources: `np.ndarray` with shape (number of sources, 3 to 13), where
+            the "source_id" can be placed at index 12, OR an `xarray.DataArray`
+            with shape (number of sources, 3 to 12) with optional source ids as
+            coords of its first dimension.
+        """
+        if len(sources.shape) != 2:
+            raise KaraboSkyModelError(
+                "`sources` must be 2-dimensional but "
+                + f"is {len(sources.shape)}-dimensional."
+            )
+        n_cols = sources.shape[1]
+        if n_cols < 3:
+            raise KaraboSkyModelError(
+                "`sources` requires min 3 cols: `right_ascension`, "
+                + "`declination` and `stokes I flux`."
+            )
+        source_ids: Optional[NDArray[Any]] = None
+        if isinstance(sources, xr.DataArray):
+            dim_sources = sources.dims[0]
+            if dim_sources in sources.coords:
+                source_ids = sources.coords[dim_sources].to_numpy()
+            values = sources.to_numpy()
+        elif isinstance(sources, np.ndarray):
+            values = sources
+            if n_cols == SkyModel.SOURCES_COLS + 1:
+                source_ids = values[:, SkyModel.SOURCES_COLS]
+                values = values[:, : SkyModel.SOURCES_COLS]
+        else:
+            raise KaraboSkyModelError(
+                f"{type(sources)} is not a valid `SkySourcesType`."
+            )
+        n_cols = values.shape[1]
+        if n_cols > SkyModel.SOURCES_COLS:
+            raise KaraboSkyModelError(
+                f"`sources` has {sources.shape[1]} columns, which is more than "
+                + "the supported number of columns."
+            )
+
+        has_source_ids = source_ids is not None
+        if self._has_source_ids is None:
+            self._has_source_ids = has_source_ids
+        elif self._has_source_ids != has_source_ids:
+            raise KaraboSkyModelError(
+                "Either all or none of the added sources need to provide source ids."
+            )
+
+        n_new = values.shape[0]
+        start, stop = self._n_sources, self._n_sources + n_new
+        self.__reserve(stop)
+        self._buffer[start:stop, :n_cols] = values
+        self._buffer[start:stop, n_cols:] = 0
+        if source_ids is not None:
+            self._source_ids.append(np.asarray(source_ids, dtype=np.object_))
+        self._n_sources = stop
+
+    def build(self, wcs: Optional[WCS] = None) -> SkyModel:
+        """
+        Creates a `SkyModel` of all added sources. The builder stays usable
+        and isn't affected by modifications of the created sky.
+
+        :param wcs: Optional WCS of the created sky.
+
+        :return: `SkyModel` containing all added sources in the order they were added.
+        """
+        values = self._buffer[: self._n_sources].copy()
+        coords = None
+        if self._has_source_ids:
+            coords = {XARRAY_DIM_0_DEFAULT: np.concatenate(self._source_ids)}
+        sources = xr.DataArray(
+            values,
+            dims=[XARRAY_DIM_0_DEFAULT, XARRAY_DIM_1_DEFAULT],
+            coords=coords,
+        )
+        return SkyModel(sources=sources, wcs=wcs, precision=self.precision)
@@ -0,0 +1,267 @@
+"""
+Chunked, columnar HDF5 format for sky catalogues with per row-group statistics.
+
+Layout of a catalogue file:
+
+- `columns/<name>`: one 1-dimensional dataset per `SkyModel.sources` column
+  (see `CATALOG_COLUMNS`), chunked by row group
+- `source_id` (optional): the source ids
+- `row_group_stats`: (n_row_groups, 4, 2) min/max of ra, dec, stokes I and
+  reference frequency (see `STATS_COLUMNS`) of each row group
+- `row_group_pixels`: (n_row_groups, 2) first and last NESTED HEALPix pixel
+  (at resolution `CATALOG_NSIDE`) of each row group
+
+The rows are sorted by their HEALPix pixel, so that the row groups are compact
+on the sky. Readers use the statistics to skip whole row groups which can't
+contain sources matching the requested filters, and only read the others.
+"""
+from __future__ import annotations
+
+import math
+from typing import List, Optional, Tuple
+
+import h5py
+import healpy as hp
+import numpy as np
+import xarray as xr
+from numpy.typing import NDArray
+
+from karabo.error import KaraboSkyModelError
+from karabo.util._types import IntFloat
+
+CATALOG_FORMAT = "karabo-sky-catalog"
+CATALOG_FORMAT_VERSION = 1
+CATALOG_NSIDE = 1024
+CATALOG_COLUMNS = (
+    "ra",
+    "dec",
+    "stokes_i",
+    "stokes_q",
+    "stokes_u",
+    "stokes_v",
+    "ref_freq",
+    "spectral_index",
+    "rm",
+    "major",
+    "minor",
+    "pa",
+)
+STATS_COLUMNS = ("ra", "dec", "stokes_i", "ref_freq")
+HDF5_EXTENSIONS = (".h5", ".hdf5")
+
+
+def is_hdf5_path(path: str) -> bool:
+    return path.lower().endswith(HDF5_EXTENSIONS)
+
+
+def write_sky_catalog(
+    path: str,
+    sources: xr.DataArray,
+    source_ids: Optional[NDArray[np.object_]] = None,
+    row_group_size: int = 65536,
+    compression: Optional[str] = None,
+) -> None:
+    """
+    Writes `sources` as a columnar sky catalogue.
+
+    The sources are processed column by column, so at most ra, dec and one other
+    column are loaded into memory at once.
+
+    :param path: Path of the HDF5 file to create (overwritten if it exists).
+    :param sources: `SkyModel.sources` compatible array with 12 columns.
+    :param source_ids: Optional source ids, one per source.
+    :param row_group_size: Number of rows per row group, which is the smallest
+                           unit a reader can skip.
+    :param compression: Optional h5py compression filter, e.g. "gzip" or "lzf".
+    """
+    if row_group_size < 1:
+        raise KaraboSkyModelError(
+            f"`row_group_size` must be positive but is {row_group_size}."
+        )
+    if len(sources.shape) != 2 or sources.shape[1] != len(CATALOG_COLUMNS):
+        raise KaraboSkyModelError(
+            f"`sources` must be of shape (n, {len(CATALOG_COLUMNS)}) "
+            + f"but is {sources.shape}."
+        )
+    n_sources = sources.shape[0]
+    ra = np.asarray(sources[:, 0], dtype=np.float64)
+    dec = np.asarray(sources[:, 1], dtype=np.float64)
+    pixels = hp.ang2pix(CATALOG_NSIDE, ra, dec, nest=True, lonlat=True)
+    order = np.argsort(pixels, kind="stable")
+    group_starts = np.arange(0, n_sources, row_group_size)
+    # h5py can't chunk empty datasets
+    chunks = (min(row_group_size, n_sources),) if n_sources > 0 else None
+    if chunks is None:
+        compression = None
+
+    stats = np.empty((group_starts.shape[0], len(STATS_COLUMNS), 2))
+    with h5py.File(path, "w") as f:
+        f.attrs["format"] = CATALOG_FORMAT
+        f.attrs["version"] = CATALOG_FORMAT_VERSION
+        f.attrs["nside"] = CATALOG_NSIDE
+        f.attrs["row_group_size"] = row_group_size
+        columns = f.create_group("columns")
+        for col_idx, name in enumerate(CATALOG_COLUMNS):
+            if col_idx == 0:
+                values = ra[order]
+            elif col_idx == 1:
+                values = dec[order]
+            else:
+                values = np.asarray(sources[:, col_idx])[order]
+            columns.create_dataset(
+                name, data=values, chunks=chunks, compression=compression
+            )
+            if name in STATS_COLUMNS and n_sources > 0:
+                stats_idx = STATS_COLUMNS.index(name)
+                # fmin/fmax ignore NaNs unless a whole row group is NaN
+                stats[:, stats_idx, 0] = np.fmin.reduceat(values, group_starts)
+                stats[:, stats_idx, 1] = np.fmax.reduceat(values, group_starts)
+        if source_ids is not None:
+            ids = np.asarray(source_ids)[order]
+            if ids.dtype.kind not in "iuf":
+                ids = ids.astype(str).astype(h5py.string_dtype())
+            f.create_dataset("source_id", data=ids, chunks=chunks)
+        stats_dataset = f.create_dataset("row_group_stats", data=stats)
+        stats_dataset.attrs["columns"] = list(STATS_COLUMNS)
+        sorted_pixels = pixels[order]
+        group_pixels = np.empty((group_starts.shape[0], 2), dtype=np.int64)
+        if n_sources > 0:
+            group_pixels[:, 0] = sorted_pixels[group_starts]
+            group_pixels[:, 1] = sorted_pixels[
+                np.append(group_starts[1:], n_sources) - 1
+            ]
+        f.create_dataset("row_group_pixels", data=group_pixels)
+
+
+def _cone_row_groups(
+    group_pixels: NDArray[np.int64],
+    ra0_deg: IntFloat,
+    dec0_deg: IntFloat,
+    radius_deg: IntFloat,
+) -> NDArray[np.bool_]:
+    """Row groups whose pixel range may overlap the given cone."""
+    if radius_deg >= 180:
+        return np.ones(group_pixels.shape[0], dtype=np.bool_)
+    # A coarser resolution which still resolves the cone keeps `query_disc` cheap.
+    # Coarse NESTED pixels are obtained by dropping 2 bits per level.
+    nside = 2 ** int(
+        np.clip(math.floor(math.log2(58.6 / max(radius_deg, 1e-6))), 0, 10)
+    )
+    shift = 2 * int(math.log2(CATALOG_NSIDE // nside))
+    pixels = hp.query_disc(
+        nside,
+        hp.ang2vec(ra0_deg, dec0_deg, lonlat=True),
+        np.radians(radius_deg),
+        inclusive=True,
+        nest=True,
+    )
+    pixels = np.sort(pixels)
+    first, last = group_pixels[:, 0] >> shift, group_pixels[:, 1] >> shift
+    idx = np.searchsorted(pixels, first, side="left")
+    is_within = idx < pixels.shape[0]
+    overlaps = np.zeros(group_pixels.shape[0], dtype=np.bool_)
+    overlaps[is_within] = pixels[idx[is_within]] <= last[is_within]
+    return overlaps
+
+
+def _ranges_overlap(
+    stats: NDArray[np.float_],
+    min_value: Optional[IntFloat],
+    max_value: Optional[IntFloat],
+) -> NDArray[np.bool_]:
+    """Row groups whose [min, max] overlaps [min_value, max_value]."""
+    overlaps = np.ones(stats.shape[0], dtype=np.bool_)
+    if min_value is not None:
+        overlaps &= stats[:, 1] >= min_value
+    if max_value is not None:
+        overlaps &= stats[:, 0] <= max_value
+    return overlaps
+
+
+def _row_group_ranges(selected: NDArray[np.bool_]) -> List[Tuple[int, int]]:
+    """Converts selected row groups to runs of consecutive groups [start, stop)."""
+    padded = np.pad(selected, 1).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return [(int(start), int(stop)) for start, stop in edges.reshape(-1, 2)]
+
+
+def read_sky_catalog(
+    path: str,
+    ra0_deg: Optional[IntFloat] = None,
+    dec0_deg: Optional[IntFloat] = None,
+    outer_radius_deg: Optional[IntFloat] = None,
+    min_flux_jy: Optional[IntFloat] = None,
+    max_flux_jy: Optional[IntFloat] = None,
+    min_freq: Optional[IntFloat] = None,
+    max_freq: Optional[IntFloat] = None,
+) -> Tuple[NDArray[np.float_], Optional[NDArray[np.object_]]]:
+    """
+    Reads the row groups of a sky catalogue which may contain sources inside
+    the cone of `outer_radius_deg` around (ra0_deg, dec0_deg), with stokes I
+    within [min_flux_jy, max_flux_jy] and reference frequency within
+    [min_freq, max_freq]. Filters set to None aren't applied.
+
+    Row groups are only skipped based on their statistics, so the returned
+    sources are a superset of the matching sources and still have to be filtered.
+
+    :return: (n, 12) array of the sources of the read row groups and their
+             source ids (None if the catalogue has none).
+    """
+    with h5py.File(path, "r") as f:
+        if f.attrs.get("format") != CATALOG_FORMAT:
+            raise KaraboSkyModelError(f"{path} is not a Karabo sky catalogue.")
+        if f.attrs["version"] > CATALOG_FORMAT_VERSION:
+            raise KaraboSkyModelError(
+                f"Sky catalogue version {f.attrs['version']} of {path} is newer "
+                + f"than the supported version {CATALOG_FORMAT_VERSION}."
+            )
+        row_group_size = int(f.attrs["row_group_size"])
+        n_sources = f["columns"][CATALOG_COLUMNS[0]].shape[0]
+        stats = f["row_group_stats"][()]
+        selected = np.ones(stats.shape[0], dtype=np.bool_)
+        if outer_radius_deg is not None:
+            if ra0_deg is None or dec0_deg is None:
+                raise KaraboSkyModelError(
+                    "`ra0_deg` and `dec0_deg` are required for `outer_radius_deg`."
+                )
+            dec_idx = STATS_COLUMNS.index("dec")
+            selected &= _ranges_overlap(
+                stats[:, dec_idx],
+                dec0_deg - outer_radius_deg,
+                dec0_deg + outer_radius_deg,
+            )
+            selected &= _cone_row_groups(
+                f["row_group_pixels"][()], ra0_deg, dec0_deg, outer_radius_deg
+            )
+        selected &= _ranges_overlap(
+            stats[:, STATS_COLUMNS.index("stokes_i")], min_flux_jy, max_flux_jy
+        )
+        selected &= _ranges_overlap(
+            stats[:, STATS_COLUMNS.index("ref_freq")], min_freq, max_freq
+        )
+
+        row_ranges = [
+            (start * row_group_size, min(stop * row_group_size, n_sources))
+            for start, stop in _row_group_ranges(selected)
+        ]
+        n_read = sum(stop - start for start, stop in row_ranges)
+        columns = f["columns"]
+        sources = np.empty((n_read, len(CATALOG_COLUMNS)))
+        for col_idx, name in enumerate(CATALOG_COLUMNS):
+            offset = 0
+            for start, stop in row_ranges:
+                sources[offset : offset + stop - start, col_idx] = columns[name][
+                    start:stop
+                ]
+                offset += stop - start
+        source_ids: Optional[NDArray[np.object_]] = None
+        if "source_id" in f:
+            dataset = f["source_id"]
+            is_str = h5py.check_string_dtype(dataset.dtype) is not None
+            source_ids = np.empty(n_read, dtype=np.object_)
+            offset = 0
+            for start, stop in row_ranges:
+                ids = dataset.asstr()[start:stop] if is_str else dataset[start:stop]
+                source_ids[offset : offset + stop - start] = ids
+                offset += stop - start
+    return sources, source_ids
@@ -0,0 +1,203 @@
+"""
+Error-bounded compression of sky models by merging faint point sources.
+
+The cost of an interferometer simulation scales linearly with the number of
+sources, although most sources of large catalogues are far below the image
+noise. `compress_sources` therefore keeps the bright sources as they are and
+replaces groups of faint point sources which are closer to each other than a
+fraction of the PSF by one flux-weighted centroid component each.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import healpy as hp
+import numpy as np
+from numpy.typing import NDArray
+
+from karabo.error import KaraboSkyModelError
+from karabo.util._types import IntFloat
+from karabo.util.math_util import angular_separation_deg
+
+# `SkyModel.sources` columns
+_RA, _DEC, _STOKES_I = 0, 1, 2
+_REF_FREQ, _SPECTRAL_INDEX, _RM = 6, 7, 8
+_MAJOR, _MINOR = 9, 10
+_MAX_NSIDE = 2**29
+
+
+@dataclass
+class SkyCompressionReport:
+    """
+    Summary of a sky compression.
+
+    :ivar num_sources_before: number of sources of the original sky
+    :ivar num_sources_after: number of sources of the compressed sky
+    :ivar num_merged_sources: number of faint sources merged into components
+    :ivar num_components: number of components the merged sources were replaced by
+    :ivar nside: HEALPix resolution of the grouping
+    :ivar flux_threshold_jy: highest absolute stokes I flux of a merged source
+    :ivar merged_flux_fraction: fraction of the total absolute stokes I flux which
+        was merged (and thus potentially moved)
+    :ivar max_position_error_deg: largest distance of a merged source to the
+        component it was merged into
+    """
+
+    num_sources_before: int
+    num_sources_after: int
+    num_merged_sources: int
+    num_components: int
+    nside: int
+    flux_threshold_jy: float
+    merged_flux_fraction: float
+    max_position_error_deg: float
+
+    @property
+    def num_removed_sources(self) -> int:
+        return self.num_sources_before - self.num_sources_after
+
+
+def get_compression_nside(max_position_error_deg: IntFloat) -> int:
+    """
+    Coarsest HEALPix resolution whose pixels are small enough that any two
+    positions within a pixel are at most `max_position_error_deg` apart.
+
+    :param max_position_error_deg: maximum position error in degrees
+
+    :return: nside (power of 2)
+    """
+    if max_position_error_deg <= 0:
+        raise KaraboSkyModelError(
+            "`max_position_error_deg` must be positive but is "
+            + f"{max_position_error_deg}."
+        )
+    nside = 1
+    # the pixel diameter is at most twice the maximum pixel radius
+    while 2 * np.degrees(hp.max_pixrad(nside)) > max_position_error_deg:
+        if nside >= _MAX_NSIDE:
+            raise KaraboSkyModelError(
+                f"`max_position_error_deg` {max_position_error_deg} is smaller "
+                + "than the finest supported HEALPix resolution."
+            )
+        nside *= 2
+    return nside
+
+
+def compress_sources(
+    sources: NDArray[np.float_],
+    max_position_error_deg: IntFloat,
+    max_flux_fraction: IntFloat = 0.01,
+) -> Tuple[NDArray[np.int_], NDArray[np.float_], SkyCompressionReport]:
+    """
+    Merges faint point sources into flux-weighted centroid components.
+
+    The faintest point sources are merged, as long as their cumulative absolute
+    stokes I flux stays within `max_flux_fraction` of the total absolute flux.
+    They're grouped by HEALPix pixel (see `get_compression_nside`), reference
+    frequency, spectral index and rotation measure, so the spectra of the
+    components are exact. Each group of at least two sources is replaced by one
+    component at the flux-weighted centroid with the summed stokes parameters.
+    Extended sources (non-zero major or minor axis) are never merged.
+
+    :param sources: (N,12) `SkyModel.sources` array
+    :param max_position_error_deg: maximum distance of a merged source to its
+        component in degrees
+    :param max_flux_fraction: maximum fraction of the total absolute stokes I
+        flux which may be merged
+
+    :return: sorted indices of the sources to keep unchanged, (M,12) array of the
+        components and the report of the compression
+    """
+    if not 0 <= max_flux_fraction <= 1:
+        raise KaraboSkyModelError(
+            f"`max_flux_fraction` must be within [0, 1] but is {max_flux_fraction}."
+        )
+    nside = get_compression_nside(max_position_error_deg)
+    n_sources = sources.shape[0]
+    abs_flux = np.abs(np.nan_to_num(sources[:, _STOKES_I]))
+    total_flux = abs_flux.sum()
+
+    is_mergeable = (
+        (sources[:, _MAJOR] == 0)
+        & (sources[:, _MINOR] == 0)
+        & np.isfinite(sources[:, _STOKES_I])
+    )
+    candidates = np.flatnonzero(is_mergeable)
+    candidates = candidates[np.argsort(abs_flux[candidates], kind="stable")]
+    cumulative_flux = np.cumsum(abs_flux[candidates])
+    n_faint = int(
+        np.searchsorted(cumulative_flux, max_flux_fraction * total_flux, side="right")
+    )
+    faint = np.sort(candidates[:n_faint])
+
+    pixels = hp.ang2pix(
+        nside, sources[faint, _RA], sources[faint, _DEC], nest=True, lonlat=True
+    )
+    keys = np.column_stack(
+        (
+            pixels.astype(np.float64),
+            sources[faint, _REF_FREQ],
+            sources[faint, _SPECTRAL_INDEX],
+            sources[faint, _RM],
+        )
+    )
+    _, group_of, group_sizes = np.unique(
+        keys, axis=0, return_inverse=True, return_counts=True
+    )
+    group_of = group_of.reshape(-1)
+    is_merged = group_sizes[group_of] > 1
+    merged = faint[is_merged]
+    # renumber the groups with more than one source
+    _, group_of = np.unique(group_of[is_merged], return_inverse=True)
+    n_components = int(group_of.max()) + 1 if group_of.shape[0] > 0 else 0
+
+    weights = abs_flux[merged]
+    group_weights = np.bincount(group_of, weights=weights, minlength=n_components)
+    # groups without flux get an unweighted centroid
+    weights = np.where(group_weights[group_of] > 0, weights, 1.0)
+    vectors = hp.ang2vec(sources[merged, _RA], sources[merged, _DEC], lonlat=True)
+    centroids = np.column_stack(
+        [np.bincount(group_of, weights=weights * vectors[:, axis]) for axis in range(3)]
+    ).reshape(n_components, 3)
+    centroid_ra, centroid_dec = hp.vec2ang(centroids, lonlat=True)
+
+    components = np.zeros((n_components, sources.shape[1]), dtype=np.float64)
+    components[:, _RA] = centroid_ra
+    components[:, _DEC] = centroid_dec
+    for col in range(_STOKES_I, _STOKES_I + 4):
+        components[:, col] = np.bincount(
+            group_of, weights=sources[merged, col], minlength=n_components
+        )
+    first_of_group = np.unique(group_of, return_index=True)[1]
+    for col in (_REF_FREQ, _SPECTRAL_INDEX, _RM):
+        components[:, col] = sources[merged[first_of_group], col]
+
+    keep = np.ones(n_sources, dtype=np.bool_)
+    keep[merged] = False
+    kept = np.flatnonzero(keep)
+    max_position_error = 0.0
+    if merged.shape[0] > 0:
+        max_position_error = float(
+            np.max(
+                angular_separation_deg(
+                    sources[merged, _RA],
+                    sources[merged, _DEC],
+                    centroid_ra[group_of],
+                    centroid_dec[group_of],
+                )
+            )
+        )
+    report = SkyCompressionReport(
+        num_sources_before=n_sources,
+        num_sources_after=kept.shape[0] + n_components,
+        num_merged_sources=merged.shape[0],
+        num_components=n_components,
+        nside=nside,
+        flux_threshold_jy=float(abs_flux[merged].max()) if merged.shape[0] else 0.0,
+        merged_flux_fraction=(
+            float(abs_flux[merged].sum() / total_flux) if total_flux > 0 else 0.0
+        ),
+        max_position_error_deg=max_position_error,
+    )
+    return kept, components, report
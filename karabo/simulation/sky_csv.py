@@ -0,0 +1,157 @@
+"""
+Chunked, typed CSV codec for sky models.
+
+A sky CSV has one header line (see `CSV_HEADER`) followed by one line per
+source, with the 12 `SkyModel.sources` columns and the source id as 13th
+column. Skies are written chunk by chunk, dask-backed sources are computed one
+chunk at a time, so exporting them never requires the whole sky in memory.
+Reading parses the source columns directly as float64, instead of inferring an
+object array for the whole table.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+from numpy.typing import NDArray
+
+from karabo.error import KaraboSkyModelError
+
+CSV_HEADER = (
+    "right ascension (deg)",
+    "declination (deg)",
+    "stokes I Flux (Jy)",
+    "stokes Q Flux (Jy)",
+    "stokes U Flux (Jy)",
+    "stokes V Flux (Jy)",
+    "reference_frequency (Hz)",
+    "spectral index (N/A)",
+    "rotation measure (rad / m^2)",
+    "major axis FWHM (arcsec)",
+    "minor axis FWHM (arcsec)",
+    "position angle (deg)",
+    "source id (object)",
+)
+CSV_SOURCES_COLS = 12
+CSV_MIN_COLS = 3
+CSV_CHUNKSIZE = 1 << 18
+
+
+def _iter_source_blocks(
+    sources: xr.DataArray, chunksize: int
+) -> Iterator[Tuple[int, NDArray[np.float_]]]:
+    """Yields (start row, block) of `sources`, dask chunks are computed one by one."""
+    data = sources.data
+    if isinstance(data, np.ndarray):
+        for start in range(0, data.shape[0], chunksize):
+            yield start, data[start : start + chunksize]
+        return
+    start = 0
+    for block_idx in range(data.numblocks[0]):
+        block = np.asarray(data.blocks[block_idx].compute())
+        yield start, block
+        start += block.shape[0]
+
+
+def write_sky_csv(
+    path: str,
+    sources: xr.DataArray,
+    source_ids: Optional[NDArray[np.generic]] = None,
+    source_id_categories: Optional[NDArray[np.generic]] = None,
+    chunksize: int = CSV_CHUNKSIZE,
+) -> None:
+    """
+    Writes `sources` as sky CSV, chunk by chunk.
+
+    :param path: file to write to
+    :param sources: (N,12) `SkyModel.sources`
+    :param source_ids: optional (N,) source ids. If `source_id_categories` is
+        given, they're integer codes into it and only decoded per chunk. The row
+        index is written as id if not provided.
+    :param source_id_categories: optional distinct source ids
+    :param chunksize: number of rows of numpy-backed `sources` per chunk,
+        dask-backed `sources` are written per dask chunk
+    """
+    if sources.shape[1] != CSV_SOURCES_COLS:
+        raise KaraboSkyModelError(
+            f"`sources` must have {CSV_SOURCES_COLS} columns but has "
+            + f"{sources.shape[1]}."
+        )
+    with open(path, "w", newline="") as file:
+        file.write(",".join(CSV_HEADER) + "\n")
+        for start, block in _iter_source_blocks(sources, chunksize):
+            stop = start + block.shape[0]
+            if source_ids is None:
+                ids: NDArray[np.generic] = np.arange(start, stop)
+            else:
+                ids = source_ids[start:stop]
+                if source_id_categories is not None:
+                    ids = source_id_categories[ids]
+            df = pd.DataFrame(block, copy=False)
+            df[CSV_SOURCES_COLS] = ids
+            df.to_csv(file, index=False, header=False)
+
+
+def read_sky_csv(
+    path: str,
+    chunksize: int = CSV_CHUNKSIZE,
+) -> Tuple[NDArray[np.float64], Optional[NDArray[Any]]]:
+    """
+    Reads a sky CSV (see `write_sky_csv`) in chunks of `chunksize` rows.
+
+    Missing `SkyModel.sources` columns (at least 3 are required) are filled
+    with zeros, columns after the source id are cut off.
+
+    :param path: file to read
+    :param chunksize: number of rows parsed at once
+
+    :return: (N,12) float64 sources and the (N,) str source ids, if the file has a
+        source id column
+    """
+    with open(path, newline="") as file:
+        n_cols = len(file.readline().split(","))
+    if n_cols < CSV_MIN_COLS:
+        raise KaraboSkyModelError(
+            f"CSV does not have the necessary {CSV_MIN_COLS} basic columns (RA, DEC "
+            + f"and STOKES I), but only {n_cols} columns."
+        )
+    if n_cols > CSV_SOURCES_COLS + 1:
+        print(
+            f"CSV has {n_cols - CSV_SOURCES_COLS - 1} too many columns. "
+            + "The extra columns will be cut off."
+        )
+    n_source_cols = min(n_cols, CSV_SOURCES_COLS)
+    has_ids = n_cols > CSV_SOURCES_COLS
+    # the source ids are read as str, inferring their type per chunk could give
+    # a mix of e.g. int and str ids
+    dtypes: Dict[int, Any] = {col: np.float64 for col in range(n_source_cols)}
+    dtypes[CSV_SOURCES_COLS] = str
+
+    source_blocks: List[NDArray[np.float64]] = []
+    id_blocks: List[NDArray[Any]] = []
+    with pd.read_csv(
+        path,
+        header=None,
+        skiprows=1,
+        usecols=range(n_source_cols + int(has_ids)),
+        dtype=dtypes,
+        chunksize=chunksize,
+    ) as reader:
+        for df in reader:
+            block = np.zeros((df.shape[0], CSV_SOURCES_COLS), dtype=np.float64)
+            block[:, :n_source_cols] = df.iloc[:, :n_source_cols].to_numpy()
+            source_blocks.append(block)
+            if has_ids:
+                id_blocks.append(df[CSV_SOURCES_COLS].to_numpy())
+
+    sources = np.concatenate(
+        source_blocks + [np.empty((0, CSV_SOURCES_COLS), dtype=np.float64)]
+    )
+    source_ids = None
+    if has_ids:
+        source_ids = (
+            np.concatenate(id_blocks) if id_blocks else np.empty(0, dtype=object)
+        )
+    return sources, source_ids
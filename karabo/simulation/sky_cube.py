@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+from dataclasses import fields
+from typing import List, Literal, Optional, Sequence, Tuple, Union
+
+import dask
+import dask.array as da
+import numpy as np
+import pandas as pd
+import xarray as xr
+from astropy.io import fits
+from astropy.wcs import WCS
+from dask.utils import parse_bytes
+from numpy.typing import NDArray
+
+from karabo.error import KaraboSkyModelError
+from karabo.simulation.sky_model import (
+    XARRAY_DIM_0_DEFAULT,
+    XARRAY_DIM_1_DEFAULT,
+    SkyModel,
+    SkyPrefixMapping,
+    source_ids_from_codes,
+)
+
+_STOKES_I_COL = 2
+_REF_FREQ_COL = 6
+
+
+def _assemble_sources(
+    static: NDArray[np.float_],
+    spectral: NDArray[np.float_],
+    static_columns: Tuple[int, ...],
+    spectral_columns: Tuple[int, ...],
+    ref_freq: float,
+) -> NDArray[np.float_]:
+    """Creates the `SkyModel.sources` rows of one frequency of a `SkyCube`."""
+    sources = np.zeros((static.shape[0], SkyModel.SOURCES_COLS), dtype=static.dtype)
+    if _REF_FREQ_COL not in static_columns + spectral_columns:
+        sources[:, _REF_FREQ_COL] = ref_freq
+    sources[:, static_columns] = static
+    sources[:, spectral_columns] = spectral
+    return sources
+
+
+class SkyCube:
+    """
+    Multi-frequency sky as source × frequency cube.
+
+    A `SkyModel` holds one row of 12 columns per source and frequency, so a sky
+    of `F` frequencies stores positions, shapes and source ids `F` times. The
+    cube instead stores the frequency-independent (static) columns once per
+    source, and only the frequency-dependent (spectral) columns, e.g. the
+    stokes I flux, per source and frequency.
+
+    The flat `SkyModel` layout is created lazily through `to_sky_model`, so it's
+    only materialised chunk by chunk when the OSKAR sky of a chunk is built.
+
+    :ivar frequencies: (F,) reference frequencies in Hz.
+    :ivar static: (N, len(static_columns)) values of the static columns.
+    :ivar static_columns: `SkyModel.sources` column index of each static column.
+    :ivar spectral: (N, F, len(spectral_columns)) values of the spectral columns.
+    :ivar spectral_columns: `SkyModel.sources` column index of each spectral
+        column. Columns which are neither static nor spectral are 0, except the
+        reference frequency, which is then taken from `frequencies`.
+    :ivar source_ids: Optional (N,) source ids.
+    :ivar drop_nan_stokes_i: If True, sources without stokes I (NaN) at a
+        frequency are left out of that frequency in `to_sky_model`.
+    """
+
+    def __init__(
+        self,
+        frequencies: Union[Sequence[float], NDArray[np.float_]],
+        static: NDArray[np.float_],
+        static_columns: Sequence[int],
+        spectral: NDArray[np.float_],
+        spectral_columns: Sequence[int],
+        source_ids: Optional[NDArray[np.object_]] = None,
+        drop_nan_stokes_i: bool = False,
+    ) -> None:
+        self.frequencies = np.asarray(frequencies, dtype=np.float64)
+        self.static = np.asarray(static)
+        self.static_columns = tuple(int(col) for col in static_columns)
+        self.spectral = np.asarray(spectral)
+        self.spectral_columns = tuple(int(col) for col in spectral_columns)
+        self.source_ids = None if source_ids is None else np.asarray(source_ids)
+        self.drop_nan_stokes_i = drop_nan_stokes_i
+
+        columns = self.static_columns + self.spectral_columns
+        if len(set(columns)) != len(columns) or not all(
+            0 <= col < SkyModel.SOURCES_COLS for col in columns
+        ):
+            raise KaraboSkyModelError(
+                "`static_columns` and `spectral_columns` must be distinct "
+                + f"`SkyModel.sources` column indices, but are {columns}."
+            )
+        n_sources = self.static.shape[0]
+        if self.static.shape != (n_sources, len(self.static_columns)):
+            raise KaraboSkyModelError(
+                f"`static` must be of shape ({n_sources}, "
+                + f"{len(self.static_columns)}) but is {self.static.shape}."
+            )
+        expected_shape = (
+            n_sources,
+            self.frequencies.shape[0],
+            len(self.spectral_columns),
+        )
+        if self.spectral.shape != expected_shape:
+            raise KaraboSkyModelError(
+                f"`spectral` must be of shape {expected_shape} "
+                + f"but is {self.spectral.shape}."
+            )
+        if self.source_ids is not None and self.source_ids.shape != (n_sources,):
+            raise KaraboSkyModelError(
+                f"`source_ids` must be of shape ({n_sources},) "
+                + f"but is {self.source_ids.shape}."
+            )
+
+    @property
+    def num_sources(self) -> int:
+        return int(self.static.shape[0])
+
+    @property
+    def num_frequencies(self) -> int:
+        return int(self.frequencies.shape[0])
+
+    @property
+    def stokes_i(self) -> Optional[NDArray[np.float_]]:
+        """(N, F) stokes I flux per source and frequency, None if it's static."""
+        if _STOKES_I_COL not in self.spectral_columns:
+            return None
+        return self.spectral[:, :, self.spectral_columns.index(_STOKES_I_COL)]
+
+    def __keep_mask(self) -> Optional[NDArray[np.bool_]]:
+        """(N, F) mask of the sources to keep per frequency, None to keep all."""
+        if not self.drop_nan_stokes_i:
+            return None
+        stokes_i = self.stokes_i
+        if stokes_i is not None:
+            return ~np.isnan(stokes_i)
+        if _STOKES_I_COL in self.static_columns:
+            stokes_i = self.static[:, self.static_columns.index(_STOKES_I_COL)]
+            return np.repeat(
+                ~np.isnan(stokes_i)[:, np.newaxis], self.num_frequencies, 1
+            )
+        return None
+
+    @property
+    def num_flat_sources(self) -> int:
+        """Number of sources of the `SkyModel` created by `to_sky_model`."""
+        keep = self.__keep_mask()
+        if keep is None:
+            return self.num_sources * self.num_frequencies
+        return int(np.count_nonzero(keep))
+
+    def to_sky_model(
+        self,
+        chunksize: Union[int, Literal["auto"]] = "auto",
+        wcs: Optional[WCS] = None,
+    ) -> SkyModel:
+        """
+        Creates the equivalent `SkyModel`, whose sources are ordered by frequency
+        first, like `SkyModel.get_sky_model_from_fits` does.
+
+        The `sources` are a lazy dask array built from the cube, nothing is
+        copied before they're computed (e.g. per chunk of an interferometer
+        simulation). Only the encoded source ids are created eagerly.
+
+        :param chunksize: Number of sources per chunk and frequency. 'auto'
+            derives it from the dask config `array.chunk-size`.
+        :param wcs: Optional WCS of the created sky.
+
+        :return: `SkyModel` with the sources of all frequencies.
+        """
+        if chunksize == "auto":
+            chunk_bytes = parse_bytes(dask.config.get("array.chunk-size"))
+            chunksize = max(chunk_bytes // (SkyModel.SOURCES_COLS * 8), 1)
+        keep = self.__keep_mask()
+        static = da.from_array(  # type: ignore [attr-defined]
+            self.static, chunks=(chunksize, -1)
+        )
+        blocks: List[da.Array] = []  # type: ignore [name-defined]
+        for freq_idx, freq in enumerate(self.frequencies):
+            spectral = da.from_array(  # type: ignore [attr-defined]
+                self.spectral[:, freq_idx, :], chunks=(chunksize, -1)
+            )
+            block = da.map_blocks(  # type: ignore [attr-defined]
+                _assemble_sources,
+                static,
+                spectral,
+                static_columns=self.static_columns,
+                spectral_columns=self.spectral_columns,
+                ref_freq=float(freq),
+                chunks=(static.chunks[0], (SkyModel.SOURCES_COLS,)),
+                dtype=np.result_type(self.static.dtype, self.spectral.dtype),
+            )
+            if keep is not None:
+                block = block[keep[:, freq_idx]]
+            blocks.append(block)
+        if len(blocks) == 0:
+            sources = da.zeros((0, SkyModel.SOURCES_COLS))  # type: ignore [attr-defined] # noqa: E501
+        else:
+            sources = da.concatenate(blocks, axis=0)  # type: ignore [attr-defined]
+
+        coords = None
+        if self.source_ids is not None:
+            # the source ids are dictionary-encoded once for all frequencies
+            codes, categories = pd.factorize(self.source_ids)
+            codes = codes.astype(np.int32)
+            coords = {
+                XARRAY_DIM_0_DEFAULT: source_ids_from_codes(
+                    np.concatenate(
+                        [
+                            codes if keep is None else codes[keep[:, freq_idx]]
+                            for freq_idx in range(self.num_frequencies)
+                        ]
+                        + [np.empty(0, dtype=np.int32)]
+                    ),
+                    categories,
+                )
+            }
+        sky_sources = xr.DataArray(
+            sources,
+            dims=[XARRAY_DIM_0_DEFAULT, XARRAY_DIM_1_DEFAULT],
+            coords=coords,
+        )
+        return SkyModel(sky_sources, wcs=wcs)
+
+    @staticmethod
+    def from_fits(
+        path: str,
+        frequencies: List[int],
+        prefix_mapping: SkyPrefixMapping,
+        concat_freq_with_prefix: bool = False,
+        filter_data_by_stokes_i: bool = False,
+        frequency_to_mhz_multiplier: float = 1e6,
+        memmap: bool = True,
+    ) -> SkyCube:
+        """
+        Reads a multi-frequency FITS catalogue as `SkyCube`. The parameters are
+        the same as of `SkyModel.get_sky_model_from_fits`, and
+        `SkyCube.from_fits(...).to_sky_model()` results in the same sky.
+
+        With `concat_freq_with_prefix`, every mapped column except ra and dec is
+        read per frequency (e.g. "Fp076", "Fp084"), all others are read once.
+
+        Example for GLEAM, which stores ra and dec only once instead of 20 times:
+
+            >>> cube = SkyCube.from_fits(
+            ...     path="GLEAM_EGC.fits",
+            ...     frequencies=[76, 84, 92],
+            ...     prefix_mapping=SkyPrefixMapping(
+            ...         ra="RAJ2000", dec="DEJ2000", stokes_i="Fp", id="GLEAM"
+            ...     ),
+            ...     concat_freq_with_prefix=True,
+            ...     filter_data_by_stokes_i=True,
+            ... )
+            >>> sky = cube.to_sky_model()
+
+        :return: `SkyCube` of the catalogue.
+        """
+        static_names: List[str] = []
+        static_columns: List[int] = []
+        spectral_prefixes: List[str] = []
+        spectral_columns: List[int] = []
+        for col_idx, field in enumerate(fields(prefix_mapping)):
+            col = field.name
+            pm_col: Optional[str] = getattr(prefix_mapping, col)
+            if col == "id" or pm_col is None:
+                continue
+            if concat_freq_with_prefix and col not in ["ra", "dec"]:
+                spectral_prefixes.append(pm_col)
+                spectral_columns.append(col_idx)
+            else:
+                static_names.append(pm_col)
+                static_columns.append(col_idx)
+
+        with fits.open(path, memmap=memmap) as hdul:
+            data = hdul[1].data
+            fits_columns = set(hdul[1].columns.names)
+            freq_strs = [str(freq).zfill(3) for freq in frequencies]
+            required_columns = set(static_names) | {
+                prefix + freq_str
+                for prefix in spectral_prefixes
+                for freq_str in freq_strs
+            }
+            if prefix_mapping.id is not None:
+                required_columns.add(prefix_mapping.id)
+            missing_columns = required_columns - fits_columns
+            if len(missing_columns) > 0:
+                raise KaraboSkyModelError(
+                    f"Columns {sorted(missing_columns)} of `prefix_mapping` "
+                    + f"don't exist in {path}."
+                )
+            n_sources = data.shape[0]
+            # read column by column, so only the output is held in memory
+            static = np.empty((n_sources, len(static_names)), dtype=np.float64)
+            for idx, name in enumerate(static_names):
+                static[:, idx] = data.field(name)
+            spectral = np.empty(
+                (n_sources, len(frequencies), len(spectral_prefixes)),
+                dtype=np.float64,
+            )
+            for freq_idx, freq_str in enumerate(freq_strs):
+                for idx, prefix in enumerate(spectral_prefixes):
+                    spectral[:, freq_idx, idx] = data.field(prefix + freq_str)
+            source_ids = None
+            if prefix_mapping.id is not None:
+                source_ids = np.asarray(data.field(prefix_mapping.id))
+
+        return SkyCube(
+            frequencies=np.asarray(frequencies, dtype=np.float64)
+            * frequency_to_mhz_multiplier,
+            static=static,
+            static_columns=static_columns,
+            spectral=spectral,
+            spectral_columns=spectral_columns,
+            source_ids=source_ids,
+            drop_nan_stokes_i=filter_data_by_stokes_i,
+        )
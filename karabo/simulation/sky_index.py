@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import healpy as hp
+import numpy as np
+from numpy.typing import NDArray
+
+from karabo.error import KaraboSkyModelError
+from karabo.util._types import IntFloat
+from karabo.util.math_util import angular_separation_deg
+
+
+def ranges_to_indices(
+    starts: NDArray[np.int_],
+    stops: NDArray[np.int_],
+) -> NDArray[np.int_]:
+    """
+    Concatenates the half-open ranges [starts[i], stops[i]) into one index array
+    without a python loop.
+
+    :param starts: start index of each range
+    :param stops: stop index (exclusive) of each range
+
+    :return: concatenated indices of all ranges
+    """
+    lengths = stops - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int_)
+    offsets: NDArray[np.int_] = np.repeat(
+        starts - (np.cumsum(lengths) - lengths), lengths
+    )
+    indices: NDArray[np.int_] = np.arange(total, dtype=np.int_) + offsets
+    return indices
+
+
+class HealpixSkyIndex:
+    """
+    Persistent spatial index over the source positions of a `SkyModel`.
+
+    The sources are binned into NESTED HEALPix pixels of resolution `nside` and
+    sorted by pixel id. Cone and annulus queries then only look at the sources
+    of the pixels which overlap the outer circle, instead of scanning the whole
+    catalogue. This pays off as soon as the same sky is queried more than once,
+    e.g. for many pointings on a survey catalogue.
+
+    The index stores its own copy of the positions and does not notice in-place
+    modifications of `SkyModel.sources`. `SkyModel` therefore drops it whenever
+    `sources` is reassigned or modified through `SkyModel.__setitem__`.
+
+    :ivar nside: HEALPix resolution parameter (power of 2).
+    :ivar order: Source indices sorted by their HEALPix pixel id.
+    :ivar sorted_pixels: HEALPix pixel id of the sources in `order`.
+    """
+
+    def __init__(
+        self,
+        ra_deg: NDArray[np.float_],
+        dec_deg: NDArray[np.float_],
+        nside: int = 64,
+    ) -> None:
+        """
+        Builds the index.
+
+        :param ra_deg: right ascension of each source in degrees
+        :param dec_deg: declination of each source in degrees
+        :param nside: HEALPix resolution, has to be a power of 2. Pixels should be
+                      of similar size or smaller than typical query radii.
+        """
+        if not hp.isnsideok(nside, nest=True):
+            raise KaraboSkyModelError(f"`nside` must be a power of 2 but is {nside}.")
+        ra_deg = np.asarray(ra_deg, dtype=np.float64)
+        dec_deg = np.asarray(dec_deg, dtype=np.float64)
+        if ra_deg.shape != dec_deg.shape or ra_deg.ndim != 1:
+            raise KaraboSkyModelError(
+                "`ra_deg` and `dec_deg` must be 1-dimensional and of the same shape."
+            )
+        self.nside = nside
+        pixels = hp.ang2pix(nside, ra_deg, dec_deg, nest=True, lonlat=True)
+        self.order: NDArray[np.int_] = np.argsort(pixels, kind="stable")
+        self.sorted_pixels: NDArray[np.int_] = pixels[self.order]
+        self._ra_deg = ra_deg[self.order]
+        self._dec_deg = dec_deg[self.order]
+
+    @property
+    def num_sources(self) -> int:
+        return self.order.shape[0]
+
+    def __candidate_positions(
+        self,
+        ra0_deg: IntFloat,
+        dec0_deg: IntFloat,
+        radius_deg: IntFloat,
+    ) -> NDArray[np.int_]:
+        # positions refer to the pixel-sorted arrays, not to the source indices
+        if radius_deg >= 180:
+            return np.arange(self.num_sources)
+        vec = hp.ang2vec(ra0_deg, dec0_deg, lonlat=True)
+        pixels = hp.query_disc(
+            self.nside,
+            vec,
+            np.radians(radius_deg),
+            inclusive=True,
+            nest=True,
+        )
+        starts = np.searchsorted(self.sorted_pixels, pixels, side="left")
+        stops = np.searchsorted(self.sorted_pixels, pixels, side="right")
+        return ranges_to_indices(starts, stops)
+
+    def query_disc_candidates(
+        self,
+        ra0_deg: IntFloat,
+        dec0_deg: IntFloat,
+        radius_deg: IntFloat,
+    ) -> NDArray[np.int_]:
+        """
+        Returns the indices of all sources in pixels overlapping the given circle.
+        This is a superset of the sources inside the circle and is meant to be
+        refined with an exact (or approximated) distance criterion.
+
+        :param ra0_deg: centre right ascension in degrees
+        :param dec0_deg: centre declination in degrees
+        :param radius_deg: radius of the circle in degrees
+
+        :return: sorted source indices
+        """
+        positions = self.__candidate_positions(ra0_deg, dec0_deg, radius_deg)
+        return np.sort(self.order[positions])
+
+    def query_annulus(
+        self,
+        ra0_deg: IntFloat,
+        dec0_deg: IntFloat,
+        inner_radius_deg: IntFloat,
+        outer_radius_deg: IntFloat,
+    ) -> NDArray[np.int_]:
+        """
+        Returns the indices of the sources whose great-circle distance `d` to
+        (ra0, dec0) satisfies `inner_radius_deg <= d <= outer_radius_deg`.
+
+        :param ra0_deg: centre right ascension in degrees
+        :param dec0_deg: centre declination in degrees
+        :param inner_radius_deg: inner radius in degrees
+        :param outer_radius_deg: outer radius in degrees
+
+        :return: sorted source indices
+        """
+        positions = self.__candidate_positions(ra0_deg, dec0_deg, outer_radius_deg)
+        separation = angular_separation_deg(
+            self._ra_deg[positions],
+            self._dec_deg[positions],
+            ra0_deg,
+            dec0_deg,
+        )
+        inside = (separation >= inner_radius_deg) & (separation <= outer_radius_deg)
+        return np.sort(self.order[positions[inside]])
+
+
+class FluxSkyIndex:
+    """
+    Persistent index over the stokes I flux of the sources of a `SkyModel`.
+
+    The source indices are sorted by flux, so flux-range queries are two binary
+    searches and the brightest `n` sources are the last `n` sorted entries,
+    instead of a scan over the whole catalogue per query. Sources with a NaN
+    flux are sorted to the end and never returned.
+
+    Like `HealpixSkyIndex`, the index is dropped by `SkyModel` whenever
+    `sources` is reassigned or modified through `SkyModel.__setitem__`.
+
+    :ivar order: Source indices sorted by ascending flux.
+    :ivar sorted_flux: Flux of the sources in `order`.
+    """
+
+    def __init__(self, stokes_i: NDArray[np.float_]) -> None:
+        """
+        Builds the index.
+
+        :param stokes_i: stokes I flux of each source in Jy
+        """
+        stokes_i = np.asarray(stokes_i)
+        if stokes_i.ndim != 1:
+            raise KaraboSkyModelError("`stokes_i` must be 1-dimensional.")
+        self.order: NDArray[np.int_] = np.argsort(stokes_i, kind="stable")
+        self.sorted_flux: NDArray[np.float_] = stokes_i[self.order]
+        self._n_valid = int(np.count_nonzero(~np.isnan(stokes_i)))
+
+    @property
+    def num_sources(self) -> int:
+        return self.order.shape[0]
+
+    def query_range(
+        self,
+        min_flux_jy: IntFloat,
+        max_flux_jy: IntFloat,
+    ) -> NDArray[np.int_]:
+        """
+        Returns the indices of the sources with
+        `min_flux_jy <= stokes I <= max_flux_jy`.
+
+        :param min_flux_jy: minimum flux in Jy
+        :param max_flux_jy: maximum flux in Jy
+
+        :return: sorted source indices
+        """
+        valid_flux = self.sorted_flux[: self._n_valid]
+        start = np.searchsorted(valid_flux, min_flux_jy, side="left")
+        stop = np.searchsorted(valid_flux, max_flux_jy, side="right")
+        return np.sort(self.order[start:stop])
+
+    def brightest(self, n: int) -> NDArray[np.int_]:
+        """
+        Returns the indices of the `n` brightest sources.
+
+        :param n: number of sources, all sources are returned if there are fewer
+
+        :return: source indices ordered by descending flux
+        """
+        if n < 0:
+            raise KaraboSkyModelError(f"`n` must not be negative but is {n}.")
+        start = max(self._n_valid - n, 0)
+        return self.order[start : self._n_valid][::-1].copy()
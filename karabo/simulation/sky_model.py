@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import copy
 import enum
-import math
+import hashlib
 from dataclasses import dataclass, fields
 from typing import (
     Any,
@@ -19,18 +19,19 @@ from typing import (
 )
 from warnings import warn
 
+import dask
 import dask.array as da
 import h5py
+import healpy as hp
 import matplotlib.pyplot as plt
 import numpy as np
 import oskar
 import pandas as pd
 import xarray as xr
-from astropy import units as u
 from astropy.io import fits
 from astropy.table import Table
-from astropy.visualization.wcsaxes import SphericalCircle
 from astropy.wcs import WCS
+from dask.utils import parse_bytes
 from numpy.typing import NDArray
 from typing_extensions import assert_never
 from xarray.core.coordinates import DataArrayCoordinates
@@ -40,7 +41,17 @@ from karabo.data.external_data import (
     GLEAMSurveyDownloadObject,
     MIGHTEESurveyDownloadObject,
 )
+from karabo.data.sky_cache import SkyCache
 from karabo.error import KaraboSkyModelError
+from karabo.simulation.sky_catalog import (
+    is_hdf5_path,
+    read_sky_catalog,
+    write_sky_catalog,
+)
+from karabo.simulation.sky_compression import SkyCompressionReport, compress_sources
+from karabo.simulation.sky_csv import read_sky_csv, write_sky_csv
+from karabo.simulation.sky_index import FluxSkyIndex, HealpixSkyIndex
+from karabo.simulation.sky_query import SkyQuery
 from karabo.util._types import (
     IntFloat,
     IntFloatList,
@@ -48,8 +59,13 @@ from karabo.util._types import (
     NPFloatLike,
     PrecisionType,
 )
-from karabo.util.hdf5_util import convert_healpix_2_radec, get_healpix_image
-from karabo.util.math_util import get_poisson_disk_sky
+from karabo.util.hdf5_util import convert_healpix_2_radec, get_healpix_map_slice
+from karabo.util.math_util import (
+    angular_separation_deg,
+    get_poisson_disk_sky,
+    ra_dec_to_cartesian,
+    stokes_at_frequencies,
+)
 from karabo.util.plotting_util import get_slices
 from karabo.warning import KaraboWarning
 
@@ -91,9 +107,9 @@ _SourceIdType = Union[
 
 
 class Polarisation(enum.Enum):
-    STOKES_I = (0,)
-    STOKES_Q = (1,)
-    STOKES_U = (2,)
+    STOKES_I = 0
+    STOKES_Q = 1
+    STOKES_U = 2
     STOKES_V = 3
 
 
@@ -119,6 +135,142 @@ XARRAY_DIM_0_DEFAULT, XARRAY_DIM_1_DEFAULT = cast(
 )
 
 
+def encode_source_ids(source_ids: Any) -> pd.CategoricalIndex:
+    """
+    Dictionary-encodes source ids as index of `SkyModel.sources`: integer codes
+    into the distinct ids (the categories). Unlike plain codes, the index keeps
+    its labels through `xr.concat`, arithmetic and `.sel`.
+
+    :param source_ids: source ids, an already encoded index is returned as is
+
+    :return: the encoded source ids
+    """
+    if isinstance(source_ids, pd.CategoricalIndex):
+        return source_ids
+    codes, categories = pd.factorize(np.asarray(source_ids))
+    return source_ids_from_codes(codes, categories)
+
+
+def source_ids_from_codes(
+    codes: NDArray[np.int_], categories: Any
+) -> pd.CategoricalIndex:
+    """
+    Creates encoded source ids (see `encode_source_ids`) from integer codes into
+    `categories`, e.g. to share one dictionary between many sources.
+
+    :param codes: index into `categories` of each source, -1 for a missing id
+    :param categories: distinct source ids
+
+    :return: the encoded source ids
+    """
+    return pd.CategoricalIndex(
+        pd.Categorical.from_codes(np.asarray(codes), categories=pd.Index(categories))
+    )
+
+
+def _source_id_codes(
+    sources: xr.DataArray, dim: str
+) -> Tuple[Optional[NDArray[Any]], Optional[NDArray[Any]]]:
+    """
+    Source ids of `sources` as integer codes and their categories, or the ids
+    and None if they aren't encoded (or have missing ids), or (None, None) if
+    `sources` has no ids.
+    """
+    if dim not in sources.indexes:
+        return None, None
+    index = sources.indexes[dim]
+    if isinstance(index, pd.CategoricalIndex) and not index.hasnans:
+        return np.asarray(index.codes), np.asarray(index.categories)
+    return np.asarray(index), None
+
+
+def _fits_block_mask(
+    data: fits.FITS_rec,
+    columns: List[Union[str, float]],
+    filter_column_idx: Optional[int],
+    start: int,
+    stop: int,
+) -> Optional[NDArray[np.bool_]]:
+    """Mask of the rows [start, stop) of a FITS table to keep, None to keep all."""
+    if filter_column_idx is None:
+        return None
+    filter_column = columns[filter_column_idx]
+    if not isinstance(filter_column, str):
+        return None
+    return ~np.isnan(np.asarray(data.field(filter_column)[start:stop], np.float64))
+
+
+def _read_fits_block(
+    path: str,
+    columns: List[Union[str, float]],
+    filter_column_idx: Optional[int],
+    start: int,
+    block_size: int,
+    memmap: bool,
+) -> NDArray[np.float64]:
+    """Reads the rows [start, start + block_size) of the FITS table at `path` as
+    `SkyModel.sources` array. `columns` holds the FITS column name or constant
+    value for each column of the array."""
+    with fits.open(path, memmap=memmap) as hdul:
+        data = hdul[1].data
+        stop = min(start + block_size, data.shape[0])
+        keep = _fits_block_mask(data, columns, filter_column_idx, start, stop)
+        n_rows = stop - start if keep is None else np.count_nonzero(keep)
+        block = np.empty((n_rows, len(columns)), dtype=np.float64)
+        for col_idx, col in enumerate(columns):
+            if isinstance(col, str):
+                values = data.field(col)[start:stop]
+                block[:, col_idx] = values if keep is None else values[keep]
+            else:
+                block[:, col_idx] = col
+    return block
+
+
+def _random_power_law_block(
+    n_sources: int,
+    seed: int,
+    block_idx: int,
+    min_size: Tuple[float, float],
+    max_size: Tuple[float, float],
+    flux_min: float,
+    flux_max: float,
+    flux_index: float,
+    ref_freq_hz: float,
+    spectral_index: float,
+) -> NDArray[np.float64]:
+    """Creates block `block_idx` of `SkyModel.get_random_power_law_sky` as
+    `SkyModel.sources` array. The block only depends on `seed` and `block_idx`."""
+    rng = np.random.default_rng([seed, block_idx])
+    block = np.zeros((n_sources, SkyModel.SOURCES_COLS), dtype=np.float64)
+    ra_min, ra_max = sorted((min_size[0], max_size[0]))
+    dec_min, dec_max = sorted((min_size[1], max_size[1]))
+    block[:, 0] = rng.uniform(ra_min, ra_max, n_sources)
+    # uniform in sin(dec) to get a uniform source density on the sphere
+    sin_dec = rng.uniform(
+        np.sin(np.radians(dec_min)), np.sin(np.radians(dec_max)), n_sources
+    )
+    block[:, 1] = np.degrees(np.arcsin(sin_dec))
+    # inverse transform sampling of dN/dS ~ S**flux_index in [flux_min, flux_max]
+    u = rng.uniform(0.0, 1.0, n_sources)
+    exponent = flux_index + 1
+    if exponent == 0:
+        block[:, 2] = flux_min * (flux_max / flux_min) ** u
+    else:
+        low, high = flux_min**exponent, flux_max**exponent
+        block[:, 2] = (low + u * (high - low)) ** (1 / exponent)
+    block[:, 6] = ref_freq_hz
+    block[:, 7] = spectral_index
+    return block
+
+
+def _hash_sources_block(block: NDArray[Any]) -> bytes:
+    """sha256 digest of a row block of `SkyModel.sources`."""
+    block = np.ascontiguousarray(block)
+    digest = hashlib.sha256(f"{block.dtype.str}{block.shape}".encode())
+    digest.update(block.data)
+    return digest.digest()
+
+
 class SkyModel:
     """
     Class containing all information of the to be observed Sky.
@@ -153,6 +305,11 @@ class SkyModel:
                     - [12] object-id: just for `np.ndarray`
                         it is removed in the `xr.DataArray`
                         and exists then in `xr.DataArray.coords` as index.
+
+                    The source ids are dictionary-encoded as `pd.CategoricalIndex`
+                    of the sources dim, so the distinct ids are stored once for
+                    all sources (e.g. all frequency copies of a GLEAM source)
+                    while the index still holds the ids as labels.
     :ivar wcs: World Coordinate System (WCS) object representing the coordinate
         transformation between pixel coordinates and celestial coordinates
         (e.g., right ascension and declination).
@@ -160,9 +317,19 @@ class SkyModel:
         Has to be of type np.float_.
     :ivar h5_file_connection: An open connection to an HDF5 (h5) file
         that can be used to store or retrieve data related to the SkyModel.
+    :ivar spatial_index: Optional `HealpixSkyIndex` created through
+        `SkyModel.build_spatial_index`. If present, it's used by the radius filters
+        and `Imager.project_sky_to_image`. It's dropped as soon as `sources` changes.
+    :ivar fingerprint: Content hash of the sky, e.g. as key of caches of results
+        which only depend on the sky.
     """
 
     SOURCES_COLS = 12
+    # max number of (source, channel) pairs `flux_at` evaluates at once
+    FLUX_BLOCK_ELEMENTS = 1 << 20
+    # number of sources per block hashed by `fingerprint`, independent of the
+    # chunks of `sources`, so that the fingerprint doesn't depend on them
+    FINGERPRINT_BLOCK_ROWS = 1 << 16
     _STOKES_IDX: Dict[StokesType, int] = {
         "Stokes I": 2,
         "Stokes Q": 3,
@@ -200,6 +367,10 @@ class SkyModel:
         self.__sources_dim_sources = XARRAY_DIM_0_DEFAULT
         self.__sources_dim_data = XARRAY_DIM_1_DEFAULT
         self._sources: Optional[xr.DataArray] = None
+        self._spatial_index: Optional[HealpixSkyIndex] = None
+        self._flux_index: Optional[FluxSkyIndex] = None
+        self._flux_cache: Dict[Tuple[bytes, str], NDArray[np.floating[Any]]] = {}
+        self._fingerprint: Optional[bytes] = None
         self.precision = precision
         self.wcs = wcs
         self.sources = sources  # type: ignore [assignment]
@@ -221,6 +392,13 @@ class SkyModel:
         else:
             assert_never(f"{type(sources)} is not a valid `SkySourcesType`.")
 
+    def __invalidate_caches(self) -> None:
+        """Drops all indices and cached values derived from `sources`."""
+        self._spatial_index = None
+        self._flux_index = None
+        self._flux_cache = {}
+        self._fingerprint = None
+
     def close(self) -> None:
         """
         Closes the connection to the HDF5 file.
@@ -257,8 +435,10 @@ class SkyModel:
         """
         if self.sources is not None:
             computed_sources = self.sources.compute()
+        spatial_index = self._spatial_index  # same data, so the index stays valid
         self.sources = None
         self.sources = computed_sources
+        self._spatial_index = spatial_index
         self.close()
 
     def _check_sources(self, sources: SkySourcesType) -> None:
@@ -363,6 +543,8 @@ class SkyModel:
             - [11] position angle (deg): defaults to 0
             - source id (object): is in `SkyModel.source_ids` if provided
 
+        Each call copies all existing sources. To create a sky from many batches,
+        use `karabo.simulation.sky_builder.SkyModelBuilder` instead.
         """
         try:
             sds, sdd = self._sources_dim_sources, self._sources_dim_data
@@ -372,9 +554,15 @@ class SkyModel:
                 sky_sources[:, : SkyModel.SOURCES_COLS] = sky_sources[
                     :, : SkyModel.SOURCES_COLS
                 ].astype(self.precision)
+            sky_sources = SkyModel.__encode_source_ids(
+                sky_sources, self._sources_dim_sources
+            )
             if self.sources is not None:
+                existing_sources, sky_sources = SkyModel.__merge_source_id_categories(
+                    self.sources, sky_sources, self._sources_dim_sources
+                )
                 self.sources = xr.concat(
-                    (self.sources, sky_sources), dim=self._sources_dim_sources
+                    (existing_sources, sky_sources), dim=self._sources_dim_sources
                 )
             else:
                 self._sources = sky_sources
@@ -382,13 +570,92 @@ class SkyModel:
             self._sources_dim_sources, self._sources_dim_data = sds, sdd
             raise e
 
-    def write_to_file(self, path: str) -> None:
-        self.save_sky_model_as_csv(path)
+    @staticmethod
+    def __encode_source_ids(sources: xr.DataArray, dim: str) -> xr.DataArray:
+        """Replaces the source ids in the index of `sources` by their
+        dictionary-encoded `pd.CategoricalIndex`, see `encode_source_ids`."""
+        if dim not in sources.indexes or isinstance(
+            sources.indexes[dim], pd.CategoricalIndex
+        ):
+            return sources
+        return sources.assign_coords(
+            {dim: encode_source_ids(sources.coords[dim].to_numpy())}
+        )
+
+    @staticmethod
+    def __merge_source_id_categories(
+        sources: xr.DataArray,
+        other: xr.DataArray,
+        dim: str,
+    ) -> Tuple[xr.DataArray, xr.DataArray]:
+        """Extends the categories of the encoded source ids of `sources` by the
+        ones of `other` which aren't in there yet, and uses them for both. Then
+        `xr.concat` keeps the concatenated source ids encoded."""
+        if dim not in sources.indexes or dim not in other.indexes:
+            return sources, other
+        index, other_index = sources.indexes[dim], other.indexes[dim]
+        if not isinstance(index, pd.CategoricalIndex) or not isinstance(
+            other_index, pd.CategoricalIndex
+        ):
+            return sources, other
+        if index.categories.equals(other_index.categories):
+            return sources, other
+        categories = index.categories.append(
+            other_index.categories[~other_index.categories.isin(index.categories)]
+        )
+        sources = sources.assign_coords({dim: index.set_categories(categories)})
+        other = other.assign_coords({dim: other_index.set_categories(categories)})
+        return sources, other
+
+    def write_to_file(
+        self,
+        path: str,
+        row_group_size: int = 65536,
+        compression: Optional[str] = None,
+    ) -> None:
+        """
+        Writes the sky to `path`. Paths ending with `.h5` or `.hdf5` are written
+        as chunked, columnar sky catalogue (see `karabo.simulation.sky_catalog`),
+        from which `read_from_file` can load only the parts of the sky which
+        match the given filters. Any other path is written as CSV.
+
+        :param path: file to write to
+        :param row_group_size: HDF5 only, number of sources per row group,
+                               which is the smallest unit a reader can skip.
+        :param compression: HDF5 only, optional h5py compression filter,
+                            e.g. "gzip" or "lzf".
+        """
+        if not is_hdf5_path(path):
+            self.save_sky_model_as_csv(path)
+            return
+        if self.sources is None:
+            raise KaraboSkyModelError("Can't save `sources` because they're None.")
+        source_ids = None
+        if self.source_ids is not None:
+            source_ids = self.source_ids[self._sources_dim_sources].to_numpy()
+        write_sky_catalog(
+            path=path,
+            sources=self.sources,
+            source_ids=source_ids,
+            row_group_size=row_group_size,
+            compression=compression,
+        )
 
     @staticmethod
-    def read_from_file(path: str) -> SkyModel:
+    def read_from_file(
+        path: str,
+        ra0_deg: Optional[IntFloat] = None,
+        dec0_deg: Optional[IntFloat] = None,
+        inner_radius_deg: IntFloat = 0,
+        outer_radius_deg: Optional[IntFloat] = None,
+        min_flux_jy: Optional[IntFloat] = None,
+        max_flux_jy: Optional[IntFloat] = None,
+        min_freq: Optional[IntFloat] = None,
+        max_freq: Optional[IntFloat] = None,
+    ) -> SkyModel:
         """
-        Read a CSV file in to create a SkyModel.
+        Read a CSV file or a sky catalogue written by `write_to_file` (`.h5` or
+        `.hdf5` extension) in to create a SkyModel.
         The CSV should have the following columns
 
         - right ascension (deg)
@@ -405,25 +672,67 @@ class SkyModel:
         - position angle (deg): if no information available, set to 0
         - source id (object): is in `SkyModel.source_ids` if provided
 
+        The optional filters correspond to `filter_by_radius`, `filter_by_flux`
+        and `filter_by_frequency`, filters which are None aren't applied.
+        For sky catalogues, whole row groups which can't contain matching sources
+        are skipped without reading them.
+
         :param path: file to read in
+        :param ra0_deg: right ascension of the radius filter center
+        :param dec0_deg: declination of the radius filter center
+        :param inner_radius_deg: inner radius of the radius filter
+        :param outer_radius_deg: outer radius of the radius filter
+        :param min_flux_jy: minimum stokes I flux in Jy
+        :param max_flux_jy: maximum stokes I flux in Jy
+        :param min_freq: minimum reference frequency in Hz
+        :param max_freq: maximum reference frequency in Hz
         :return: SkyModel
         """
-        dataframe = pd.read_csv(path).to_numpy()
-
-        if dataframe.shape[1] < 3:
-            raise KaraboSkyModelError(
-                f"CSV does not have the necessary 3 basic columns (RA, DEC and "
-                f"STOKES I), but only {dataframe.shape[1]} columns."
+        if is_hdf5_path(path):
+            sources, source_ids = read_sky_catalog(
+                path=path,
+                ra0_deg=ra0_deg,
+                dec0_deg=dec0_deg,
+                outer_radius_deg=outer_radius_deg,
+                min_flux_jy=min_flux_jy,
+                max_flux_jy=max_flux_jy,
+                min_freq=min_freq,
+                max_freq=max_freq,
             )
+            sky = SkyModel(sources)
+            if source_ids is not None:
+                sky.source_ids = source_ids  # type: ignore [assignment]
+        else:
+            sources, source_ids = read_sky_csv(path)
+            sky = SkyModel(sources)
+            if source_ids is not None:
+                sky.source_ids = source_ids  # type: ignore [assignment]
 
-        if dataframe.shape[1] >= 13:
-            print(
-                f"CSV has {dataframe.shape[1] - 13} too many rows. "
-                + "The extra rows will be cut off."
+        query = sky.query()
+        if outer_radius_deg is not None:
+            if ra0_deg is None or dec0_deg is None:
+                raise KaraboSkyModelError(
+                    "`ra0_deg` and `dec0_deg` are required for `outer_radius_deg`."
+                )
+            query = query.radius(
+                inner_radius_deg=inner_radius_deg,
+                outer_radius_deg=outer_radius_deg,
+                ra0_deg=ra0_deg,
+                dec0_deg=dec0_deg,
             )
-
-        sky = SkyModel(dataframe)
-        return sky
+        if min_flux_jy is not None or max_flux_jy is not None:
+            query = query.flux(
+                min_flux_jy=-np.inf if min_flux_jy is None else min_flux_jy,
+                max_flux_jy=np.inf if max_flux_jy is None else max_flux_jy,
+            )
+        if min_freq is not None or max_freq is not None:
+            query = query.frequency(
+                min_freq=-np.inf if min_freq is None else min_freq,
+                max_freq=np.inf if max_freq is None else max_freq,
+            )
+        if query.is_empty:
+            return sky
+        return query.collect()
 
     def to_np_array(self, with_obj_ids: bool = False) -> NPSkyType:
         """
@@ -463,6 +772,156 @@ class SkyModel:
             pass
         return array
 
+    @property
+    def fingerprint(self) -> str:
+        """
+        sha256 hex digest of the content of the sky: the values and dtype of
+        `sources`, the source ids and `precision`. Equal skies have equal
+        fingerprints across processes, so it can be used as key of caches of
+        results which only depend on the sky (e.g. simulated visibilities).
+
+        `sources` are hashed in parallel blocks of `FINGERPRINT_BLOCK_ROWS`
+        sources, dask-backed `sources` are computed block by block. The content part
+        is memoised until `sources` or `source_ids` are reassigned (or changed
+        through `__setitem__`), changes of the underlying arrays made in place
+        aren't detected.
+
+        Different encodings of the same source ids (e.g. a different order of
+        the categories of the source ids) lead to different fingerprints.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = self.__hash_content()
+        digest = hashlib.sha256(self._fingerprint)
+        digest.update(np.dtype(self.precision).str.encode())
+        return digest.hexdigest()
+
+    def __hash_content(self) -> bytes:
+        digest = hashlib.sha256()
+        if self.sources is None:
+            return digest.digest()
+        data = self.sources.data
+        block_rows = SkyModel.FINGERPRINT_BLOCK_ROWS
+        if not isinstance(data, da.Array):  # type: ignore [attr-defined]
+            # `name=False` skips dask's own hashing of the whole array
+            data = da.from_array(  # type: ignore [attr-defined]
+                np.asarray(data), chunks=(block_rows, -1), name=False
+            )
+        blocks = data.rechunk((block_rows, -1)).to_delayed().ravel()
+        block_digests = dask.compute(  # type: ignore [attr-defined]
+            *[
+                dask.delayed(_hash_sources_block)(block)  # type: ignore [attr-defined] # noqa: E501
+                for block in blocks
+            ]
+        )
+        digest.update(f"{data.dtype.str}{data.shape}".encode())
+        for block_digest in block_digests:
+            digest.update(block_digest)
+
+        ids, categories = _source_id_codes(self.sources, self._sources_dim_sources)
+        for values in (ids, categories):
+            if values is None:
+                continue
+            if values.dtype.kind in "biuf":
+                digest.update(_hash_sources_block(values))
+            else:
+                digest.update(repr(values.tolist()).encode())
+        return digest.digest()
+
+    def build_spatial_index(self, nside: int = 64) -> HealpixSkyIndex:
+        """
+        Builds a persistent HEALPix index on the source positions, which is then
+        used by `filter_by_radius`, `filter_by_radius_euclidean_flat_approximation`
+        and `Imager.project_sky_to_image` to only look at sources near the queried
+        region. Worth it if the same sky is queried repeatedly, e.g. for many
+        pointings. The index is dropped as soon as `sources` changes.
+
+        :param nside: HEALPix resolution (power of 2). The pixel size should be
+                      similar to or smaller than the typical query radius
+                      (nside=64 corresponds to ~0.9 deg).
+
+        :return: The created index, also available through `spatial_index`.
+        """
+        if self.sources is None:
+            raise KaraboSkyModelError(
+                "`sources` is None, add sources before calling `build_spatial_index`."
+            )
+        self._spatial_index = HealpixSkyIndex(
+            ra_deg=self[:, 0].to_numpy(),
+            dec_deg=self[:, 1].to_numpy(),
+            nside=nside,
+        )
+        return self._spatial_index
+
+    @property
+    def spatial_index(self) -> Optional[HealpixSkyIndex]:
+        return self._spatial_index
+
+    def build_flux_index(self) -> FluxSkyIndex:
+        """
+        Builds an argsort index on the stokes I flux. Afterwards, flux filters
+        (`filter_by_flux` and `SkyQuery.flux`) are binary searches and
+        `get_brightest_sources` is a slice, instead of a scan over all sources.
+        The index is dropped automatically when `sources` change.
+
+        :return: The created index, also available through `flux_index`.
+        """
+        if self.sources is None:
+            raise KaraboSkyModelError(
+                "`sources` is None, add sources before calling `build_flux_index`."
+            )
+        self._flux_index = FluxSkyIndex(
+            stokes_i=self[:, SkyModel._STOKES_IDX["Stokes I"]].to_numpy()
+        )
+        return self._flux_index
+
+    @property
+    def flux_index(self) -> Optional[FluxSkyIndex]:
+        return self._flux_index
+
+    def get_brightest_sources(self, n: int) -> SkyModel:
+        """
+        Selects the `n` sources with the highest stokes I flux, using the
+        `flux_index` if there is one. Sources with NaN flux are never selected.
+
+        :param n: Number of sources, all sources are selected if there are fewer.
+
+        :return: New sky with the selected sources ordered by descending flux.
+        """
+        if self.sources is None:
+            raise KaraboSkyModelError(
+                "`sources` is None, add sources before calling "
+                + "`get_brightest_sources`."
+            )
+        if n < 0:
+            raise KaraboSkyModelError(f"`n` must not be negative but is {n}.")
+        if self._flux_index is not None:
+            idxs = self._flux_index.brightest(n)
+        else:
+            flux = self[:, SkyModel._STOKES_IDX["Stokes I"]].to_numpy()
+            valid = np.flatnonzero(~np.isnan(flux))
+            if n < valid.shape[0]:
+                valid = valid[np.argpartition(-flux[valid], n)[:n]]
+            idxs = valid[np.argsort(-flux[valid], kind="stable")]
+        return type(self)(
+            sources=self.rechunk_array_based_on_self(self.sources[idxs]),
+            wcs=copy.deepcopy(self.wcs),
+            precision=self.precision,
+        )
+
+    def query(self) -> SkyQuery:
+        """
+        Starts a lazy filter pipeline on this sky, e.g.
+
+            sky.query().radius(0, 5, ra0, dec0).flux(0.1, 10).collect()
+
+        All chained predicates are evaluated together in a single pass over
+        `sources` once `collect` (or `indices`) is called, and only the matching
+        sources are copied. Prefer this over chaining `filter_by_*` for large skies.
+
+        :return: An empty `SkyQuery` on this sky.
+        """
+        return SkyQuery(sky=self)
+
     @overload
     def filter_by_radius(
         self,
@@ -504,28 +963,20 @@ class SkyModel:
         we also return the indices of the filtered sky copy
         :return sky: Filtered copy of the sky
         """
-        copied_sky = copy.deepcopy(self)
-        if copied_sky.sources is None:
+        if self.sources is None:
             raise KaraboSkyModelError(
                 "`sources` is None, add sources before calling `filter_by_radius`."
             )
-        inner_circle = SphericalCircle(
-            (ra0_deg * u.deg, dec0_deg * u.deg),
-            inner_radius_deg * u.deg,  # pyright: ignore
-        )
-        outer_circle = SphericalCircle(
-            (ra0_deg * u.deg, dec0_deg * u.deg),
-            outer_radius_deg * u.deg,  # pyright: ignore
+        copied_sky, filtered_sources_idxs = (
+            self.query()
+            .radius(
+                inner_radius_deg=inner_radius_deg,
+                outer_radius_deg=outer_radius_deg,
+                ra0_deg=ra0_deg,
+                dec0_deg=dec0_deg,
+            )
+            .collect_with_indices()
         )
-        outer_sources = outer_circle.contains_points(copied_sky[:, 0:2])
-        inner_sources = inner_circle.contains_points(copied_sky[:, 0:2])
-        filtered_sources = np.logical_and(outer_sources, np.logical_not(inner_sources))
-        filtered_sources_idxs = np.where(filtered_sources == True)[0]  # noqa
-        copied_sky.sources = copied_sky.sources[filtered_sources_idxs]
-
-        # Rechunk the array to the original chunk size
-        copied_sky.sources = self.rechunk_array_based_on_self(copied_sky.sources)
-
         if indices:
             return copied_sky, filtered_sources_idxs
         else:
@@ -539,42 +990,42 @@ class SkyModel:
         dec0_deg: IntFloat,
         indices: bool = False,
     ) -> Union[SkyModel, Tuple[SkyModel, np.int64]]:
-        # TODO description what is different to non-apporx, when should I use this fun?
-        """_summary_
+        """
+        Filters the sky according to an inner and outer circle from the phase center
+        using a flat euclidean approximation of the distances
+        (`dx = (ra - ra0) * cos(dec0)`, `dy = dec - dec0`). This is faster but
+        only accurate for small fields which don't cross the ra=0 meridian or a pole.
+        Use `filter_by_radius` otherwise.
 
         Args:
-            inner_radius_deg: _description_
-            outer_radius_deg: _description_
-            ra0_deg: _description_
-            dec0_deg: _description_
-            indices: _description_
+            inner_radius_deg: Inner radius in degrees
+            outer_radius_deg: Outer radius in degrees
+            ra0_deg: Phase center right ascension
+            dec0_deg: Phase center declination
+            indices: If True, the indices of the filtered sources are returned as well
 
         Returns:
-            _description_
+            Filtered copy of the sky, and optionally the indices of the
+            filtered sources.
         """
-        copied_sky = copy.deepcopy(self)
-        if copied_sky.sources is None:
+        if self.sources is None:
             raise KaraboSkyModelError(
                 "`sources` is None, add sources before calling `filter_by_radius`."
             )
 
-        # Calculate distances to phase center using flat Euclidean approximation
-        x = (copied_sky[:, 0] - ra0_deg) * np.cos(np.radians(dec0_deg))
-        y = copied_sky[:, 1] - dec0_deg
-        distances_sq = np.add(np.square(x), np.square(y))
-
-        # Filter sources based on inner and outer radius
-        filter_mask = (distances_sq >= np.square(inner_radius_deg)) & (
-            distances_sq <= np.square(outer_radius_deg)
+        copied_sky, filtered_indices = (
+            self.query()
+            .radius(
+                inner_radius_deg=inner_radius_deg,
+                outer_radius_deg=outer_radius_deg,
+                ra0_deg=ra0_deg,
+                dec0_deg=dec0_deg,
+                flat_approximation=True,
+            )
+            .collect_with_indices()
         )
-
-        copied_sky.sources = copied_sky.sources[filter_mask]
-
-        copied_sky.sources = self.rechunk_array_based_on_self(copied_sky.sources)
-
         if indices:
-            filtered_indices = cast(np.int64, np.where(filter_mask)[0])
-            return copied_sky, filtered_indices
+            return copied_sky, cast(np.int64, filtered_indices)
         else:
             return copied_sky
 
@@ -591,23 +1042,16 @@ class SkyModel:
         :param max_flux_jy: Maximum flux in Jy
         :return sky: Filtered copy of the sky
         """
-        copied_sky = copy.deepcopy(self)
-        if copied_sky.sources is None:
+        if self.sources is None:
             raise KaraboSkyModelError(
                 "`sources` None is not allowed. "
                 + "Add sources before calling `filter_by_flux`."
             )
-
-        # Create mask
-        filter_mask = (copied_sky[:, 2] >= min_flux_jy) & (
-            copied_sky[:, 2] <= max_flux_jy
+        return (
+            self.query()
+            .flux(min_flux_jy=min_flux_jy, max_flux_jy=max_flux_jy)
+            .collect()
         )
-        filter_mask = self.rechunk_array_based_on_self(filter_mask)
-
-        # Apply the filter mask and drop the unmatched rows
-        copied_sky.sources = copied_sky.sources.where(filter_mask, drop=True)
-
-        return copied_sky
 
     def filter_by_frequency(
         self,
@@ -621,22 +1065,11 @@ class SkyModel:
         :param max_freq: Maximum frequency in Hz
         :return sky: Filtered copy of the sky
         """
-        copied_sky = copy.deepcopy(self)
-        if copied_sky.sources is None:
+        if self.sources is None:
             raise KaraboSkyModelError(
                 "`sources` is None, add sources before calling `filter_by_frequency`."
             )
-
-        # Create mask
-        filter_mask = (copied_sky.sources[:, 6] >= min_freq) & (
-            copied_sky.sources[:, 6] <= max_freq
-        )
-        filter_mask = self.rechunk_array_based_on_self(filter_mask)
-
-        # Apply the filter mask and drop the unmatched rows
-        copied_sky.sources = copied_sky.sources.where(filter_mask, drop=True)
-
-        return copied_sky
+        return self.query().frequency(min_freq=min_freq, max_freq=max_freq).collect()
 
     def get_wcs(self) -> WCS:
         """
@@ -848,21 +1281,58 @@ class SkyModel:
         file: str,
         channel: int,
         polarisation: Polarisation,
+        nside_out: Optional[int] = None,
+        ra0_deg: Optional[IntFloat] = None,
+        dec0_deg: Optional[IntFloat] = None,
+        radius_deg: Optional[IntFloat] = None,
     ) -> Tuple[xr.DataArray, int]:
         """
         Read a healpix file in hdf5 format.
         The file should have the map keywords:
 
+        Only the map of the requested channel and polarisation is read from the
+        file, not the whole cube.
+
         :param file: hdf5 file path (healpix format)
         :param channel: Channels of observation (between 0 and maximum numbers of
                         channels of observation)
         :param polarisation: 0 = Stokes I, 1 = Stokes Q, 2 = Stokes U, 3 = Stokes  V
-        :return:
+        :param nside_out: Optional HEALPix resolution to degrade the map to
+                          (`healpy.ud_grade`). The pixel values are treated as flux
+                          per pixel, so the total flux of the map is preserved.
+        :param ra0_deg: Right ascension of the centre of the region to keep.
+        :param dec0_deg: Declination of the centre of the region to keep.
+        :param radius_deg: If set, only pixels whose centre is within `radius_deg`
+                           of (ra0_deg, dec0_deg) are returned.
+        :return: sources array (ra, dec, flux) of the pixels and the nside of the map
         """
-        arr = get_healpix_image(file)
-        filtered = arr[channel][polarisation.value]
-        ra, dec, nside = convert_healpix_2_radec(filtered)
-        return xr.DataArray(np.vstack((ra, dec, filtered)).transpose()), nside
+        healpix_map = get_healpix_map_slice(file, channel, polarisation.value)
+        nside = hp.npix2nside(healpix_map.shape[0])
+        if nside_out is not None and nside_out != nside:
+            if nside_out > nside:
+                raise KaraboSkyModelError(
+                    f"`nside_out` {nside_out} must not exceed the nside {nside} "
+                    + "of the map."
+                )
+            healpix_map = hp.ud_grade(healpix_map, nside_out, power=-2)
+            nside = nside_out
+        if radius_deg is None:
+            ra, dec, _ = convert_healpix_2_radec(healpix_map)
+            return xr.DataArray(np.vstack((ra, dec, healpix_map)).transpose()), nside
+        if ra0_deg is None or dec0_deg is None:
+            raise KaraboSkyModelError(
+                "`ra0_deg` and `dec0_deg` are required for `radius_deg`."
+            )
+        pixels = hp.query_disc(
+            nside,
+            hp.ang2vec(ra0_deg, dec0_deg, lonlat=True),
+            np.radians(radius_deg),
+        )
+        ra, dec = hp.pix2ang(nside, pixels, lonlat=True)
+        return (
+            xr.DataArray(np.vstack((ra, dec, healpix_map[pixels])).transpose()),
+            nside,
+        )
 
     @property
     def shape(self) -> Tuple[int, ...]:
@@ -894,6 +1364,7 @@ class SkyModel:
         Args:
             value: sources, `xarray.DataArray` or `np.ndarray`
         """
+        self.__invalidate_caches()
         self._sources = None
         self._sources_dim_sources = XARRAY_DIM_0_DEFAULT
         self._sources_dim_data = XARRAY_DIM_1_DEFAULT
@@ -942,6 +1413,8 @@ class SkyModel:
 
     @property
     def source_ids(self) -> Optional[DataArrayCoordinates[xr.DataArray]]:
+        """Coords of `sources`, the source ids are encoded as `pd.CategoricalIndex`
+        (see `encode_source_ids`) but their values are the ids themselves."""
         if self.sources is not None and len(self.sources.coords) > 0:
             return self.sources.coords
         else:
@@ -956,6 +1429,7 @@ class SkyModel:
             raise KaraboSkyModelError(
                 "Setting source-ids on empty `sources` is not allowed."
             )
+        self._fingerprint = None
         if value is None:
             if self._sources_dim_sources in self._sources.indexes:
                 self._sources = self._sources.reset_index(
@@ -977,6 +1451,9 @@ class SkyModel:
                     f"not match the number of existing sources {self.sources.shape[0]}."
                 )
             self.sources.coords[self._sources_dim_sources] = value
+            self._sources = SkyModel.__encode_source_ids(
+                self._sources, self._sources_dim_sources
+            )
 
     def __getitem__(self, key: Any) -> xr.DataArray:
         """
@@ -1007,34 +1484,24 @@ class SkyModel:
             raise KaraboSkyModelError("Can't acces `sources` because it's None.")
         # access `sources.getter`, not `sources.setter` which is fine
         self.sources[key] = value
+        self.__invalidate_caches()
 
     def save_sky_model_as_csv(self, path: str) -> None:
         """
-        Save source array into a csv.
+        Save source array into a csv. Dask-backed sources are computed and
+        written chunk by chunk (see `karabo.simulation.sky_csv`).
         :param path: path to save the csv file in.
         """
         if self.sources is None:
             raise KaraboSkyModelError("Can't save `sources` because they're None.")
-        df = pd.DataFrame(self.sources)
-        df["source id (object)"] = self.sources[self._sources_dim_sources].values
-        df.to_csv(
-            path,
-            index=False,
-            header=[
-                "right ascension (deg)",
-                "declination (deg)",
-                "stokes I Flux (Jy)",
-                "stokes Q Flux (Jy)",
-                "stokes U Flux (Jy)",
-                "stokes V Flux (Jy)",
-                "reference_frequency (Hz)",
-                "spectral index (N/A)",
-                "rotation measure (rad / m^2)",
-                "major axis FWHM (arcsec)",
-                "minor axis FWHM (arcsec)",
-                "position angle (deg)",
-                "source id (object)",
-            ],
+        source_ids, source_id_categories = _source_id_codes(
+            self.sources, self._sources_dim_sources
+        )
+        write_sky_csv(
+            path=path,
+            sources=self.sources,
+            source_ids=source_ids,
+            source_id_categories=source_id_categories,
         )
 
     def save_sky_model_to_txt(
@@ -1046,32 +1513,190 @@ class SkyModel:
             raise AttributeError("Can't save sky-model because `sources` is None.")
         np.savetxt(path, self.sources[:, cols])
 
-    @staticmethod
-    def __convert_ra_dec_to_cartesian(
-        ra: IntFloat, dec: IntFloat
-    ) -> NDArray[np.float_]:
-        x = math.cos(math.radians(ra)) * math.cos(math.radians(dec))
-        y = math.sin(math.radians(ra)) * math.cos(math.radians(dec))
-        z = math.sin(math.radians(dec))
-        r = np.array([x, y, z])
-        norm = cast(np.float_, np.linalg.norm(r))
-        if norm == 0:
-            return r
-        return r / norm
-
-    def get_cartesian_sky(self) -> NDArray[np.float_]:
+    def compress(
+        self,
+        psf_fwhm_deg: IntFloat,
+        max_position_error: IntFloat = 0.1,
+        max_flux_fraction: IntFloat = 0.01,
+    ) -> Tuple[SkyModel, SkyCompressionReport]:
+        """
+        Reduces the number of sources by merging faint point sources which are
+        close to each other into flux-weighted centroid components, see
+        `karabo.simulation.sky_compression.compress_sources`. Bright and extended
+        sources are kept unchanged. The total flux is preserved.
+
+        The compressed sky can be simulated like any other sky, at a cost
+        proportional to its (lower) number of sources.
+
+        :param psf_fwhm_deg: FWHM of the PSF of the observation in degrees.
+        :param max_position_error: Maximum distance of a merged source to its
+            component, as fraction of `psf_fwhm_deg`.
+        :param max_flux_fraction: Maximum fraction of the total absolute stokes I
+            flux which may be merged. Only the faintest sources are merged.
+
+        :return: Compressed sky, with the unchanged sources first (in their
+            original order) followed by the components, and the report of the
+            compression. Components have the source id "compressed_<n>" if the
+            sky has source ids.
+        """
+        if self.sources is None:
+            raise KaraboSkyModelError(
+                "`sources` is None, add sources before calling `compress`."
+            )
+        sources = np.asarray(self.sources.to_numpy(), dtype=np.float64)
+        kept, components, report = compress_sources(
+            sources,
+            max_position_error_deg=max_position_error * psf_fwhm_deg,
+            max_flux_fraction=max_flux_fraction,
+        )
+        coords = None
+        if self.source_ids is not None:
+            source_ids = self.source_ids[self._sources_dim_sources].to_numpy()
+            component_ids = [f"compressed_{n}" for n in range(components.shape[0])]
+            coords = {
+                XARRAY_DIM_0_DEFAULT: np.concatenate(
+                    (
+                        source_ids[kept].astype(np.object_),
+                        np.array(component_ids, dtype=np.object_),
+                    )
+                )
+            }
+        compressed_sources = xr.DataArray(
+            np.vstack((sources[kept], components)).astype(self.precision),
+            dims=[XARRAY_DIM_0_DEFAULT, XARRAY_DIM_1_DEFAULT],
+            coords=coords,
+        )
+        compressed_sky = type(self)(
+            sources=compressed_sources,
+            wcs=copy.deepcopy(self.wcs),
+            precision=self.precision,
+        )
+        print(
+            f"Compressed sky from {report.num_sources_before} to "
+            + f"{report.num_sources_after} sources: merged "
+            + f"{report.num_merged_sources} faint sources into "
+            + f"{report.num_components} components "
+            + f"({report.num_removed_sources} sources removed, "
+            + f"{100 * report.merged_flux_fraction:.3g}% of the flux merged, "
+            + f"max position error {report.max_position_error_deg:.3g} deg)."
+        )
+        return compressed_sky, report
+
+    def get_cartesian_sky(
+        self,
+        dtype: Type[np.floating[Any]] = np.float64,
+        out: Optional[NDArray[np.floating[Any]]] = None,
+    ) -> NDArray[np.floating[Any]]:
+        """
+        Converts the positions of all sources to unit vectors on the celestial
+        sphere. Dask-backed `sources` are converted chunk by chunk in parallel and
+        each chunk is written straight into the result.
+
+        :param dtype: float dtype of the result, e.g. `np.float32` to halve the
+                      memory footprint. Ignored if `out` is provided.
+        :param out: Optional preallocated (number of sources, 3) array to write
+                    the result into, e.g. to avoid reallocations in loops.
+
+        :return: (number of sources, 3) array of x, y and z.
+        """
         if self.sources is None:
             raise AttributeError("Can't create cartesian-sky when `sources` is None.")
-        cartesian_sky = np.squeeze(
-            np.apply_along_axis(
-                lambda row: [
-                    self.__convert_ra_dec_to_cartesian(float(row[0]), float(row[1]))
-                ],
-                axis=1,
-                arr=self.sources,
+        n_sources = self.num_sources
+        if out is None:
+            out = np.empty((n_sources, 3), dtype=dtype)
+        elif out.shape != (n_sources, 3):
+            raise KaraboSkyModelError(
+                f"`out` must be of shape {(n_sources, 3)} but is {out.shape}."
             )
+        data = self.sources.data
+        if isinstance(data, da.Array):  # type: ignore [attr-defined]
+            out_dtype = out.dtype
+
+            def to_cartesian(block: NDArray[np.float_]) -> NDArray[np.floating[Any]]:
+                block_out = np.empty((block.shape[0], 3), dtype=out_dtype)
+                return ra_dec_to_cartesian(block[:, 0], block[:, 1], out=block_out)
+
+            ra_dec = data[:, :2].rechunk({1: 2}).astype(np.float64)
+            cartesian = ra_dec.map_blocks(
+                to_cartesian, chunks=(ra_dec.chunks[0], (3,)), dtype=out_dtype
+            )
+            da.store(cartesian, out, lock=False)  # type: ignore [attr-defined]
+        else:
+            ra_dec_to_cartesian(
+                np.asarray(data[:, 0], dtype=np.float64),
+                np.asarray(data[:, 1], dtype=np.float64),
+                out=out,
+            )
+        return out
+
+    def flux_at(
+        self,
+        frequencies: Union[IntFloat, IntFloatList, NDArray[np.float_]],
+        dtype: Type[np.floating[Any]] = np.float64,
+    ) -> NDArray[np.floating[Any]]:
+        """
+        Evaluates the stokes parameters of all sources at `frequencies`, taking
+        the spectral index and rotation measure into account like OSKAR does
+        (see `karabo.util.math_util.stokes_at_frequencies`).
+
+        The sources are processed chunk by chunk, so besides the result only
+        temporaries of one chunk are held in memory. The result is cached per
+        channel grid and dtype until `sources` change, so repeated channel-wise
+        operations on the same grid don't evaluate it again.
+
+        :param frequencies: Frequency or frequencies (channel grid) in Hz.
+        :param dtype: Float dtype of the result, e.g. `np.float32` to halve the
+                      memory footprint.
+
+        :return: Read-only (number of sources, number of frequencies, 4) array of
+                 stokes I, Q, U and V.
+        """
+        if self.sources is None:
+            raise KaraboSkyModelError("Can't evaluate fluxes when `sources` is None.")
+        freqs: NDArray[np.float64] = np.atleast_1d(
+            np.asarray(frequencies, dtype=np.float64)
         )
-        return cartesian_sky
+        if freqs.ndim != 1:
+            raise KaraboSkyModelError(
+                f"`frequencies` must be 1-dimensional but is {freqs.ndim}-"
+                + "dimensional."
+            )
+        key = (freqs.tobytes(), np.dtype(dtype).str)
+        cached = self._flux_cache.get(key)
+        if cached is not None:
+            return cached
+
+        n_sources, n_channels = self.num_sources, freqs.shape[0]
+        out = np.empty((n_sources, n_channels, 4), dtype=dtype)
+        data = self.sources.data
+        if isinstance(data, da.Array):  # type: ignore [attr-defined]
+
+            def evaluate(block: NDArray[np.float_]) -> NDArray[np.floating[Any]]:
+                block_out = np.empty((block.shape[0], n_channels, 4), dtype=dtype)
+                return stokes_at_frequencies(block, freqs, out=block_out)
+
+            rows = data[:, : SkyModel.SOURCES_COLS].rechunk({1: -1})
+            fluxes = rows.map_blocks(
+                evaluate,
+                chunks=(rows.chunks[0], (n_channels,), (4,)),
+                new_axis=2,
+                dtype=dtype,
+            )
+            da.store(fluxes, out, lock=False)  # type: ignore [attr-defined]
+        else:
+            # bound the (rows, channels) temporaries of the evaluation
+            block_size = max(SkyModel.FLUX_BLOCK_ELEMENTS // max(n_channels, 1), 1)
+            for start in range(0, n_sources, block_size):
+                stop = min(start + block_size, n_sources)
+                stokes_at_frequencies(
+                    np.asarray(data[start:stop], dtype=np.float64),
+                    freqs,
+                    out=out[start:stop],
+                )
+        # shared between all callers of the same grid, so it mustn't be modified
+        out.flags.writeable = False
+        self._flux_cache[key] = out
+        return out
 
     @staticmethod
     def get_sky_model_from_h5_to_xarray(
@@ -1138,7 +1763,10 @@ class SkyModel:
         return SkyModel(sky, h5_file_connection=f)
 
     @staticmethod
-    def get_GLEAM_Sky(frequencies: Optional[List[GLEAM_freq]] = None) -> SkyModel:
+    def get_GLEAM_Sky(
+        frequencies: Optional[List[GLEAM_freq]] = None,
+        use_cache: bool = True,
+    ) -> SkyModel:
         """
         get_GLEAM_Sky - Returns a SkyModel object containing sources with flux densities
         at the specified frequencies from the GLEAM survey.
@@ -1149,6 +1777,9 @@ class SkyModel:
             [76, 84, 92, 99, 107, 115, 122, 130, 143, 151, 158, 166,
             174, 181, 189, 197, 204, 212, 220, 227]. Default is to return
             all frequencies.
+            use_cache (bool): If True, the converted sources are stored in
+            the `SkyCache` and later calls memory-map them instead of converting
+            the survey again.
 
         Returns:
             SkyModel: A SkyModel object containing sources with flux densities
@@ -1197,13 +1828,72 @@ class SkyModel:
             id="GLEAM",
         )
 
-        return SkyModel.get_sky_model_from_fits(
+        return SkyModel.__get_cached_sky(
             path=path,
-            frequencies=frequencies,  # type: ignore[arg-type]
-            prefix_mapping=prefix_mapping,
-            concat_freq_with_prefix=True,
-            filter_data_by_stokes_i=True,
-            frequency_to_mhz_multiplier=1e6,
+            params={
+                "survey": "GLEAM",
+                "frequencies": tuple(frequencies),
+                "prefix_mapping": prefix_mapping,
+            },
+            create_sky=lambda: SkyModel.get_sky_model_from_fits(
+                path=path,
+                frequencies=frequencies,  # type: ignore[arg-type]
+                prefix_mapping=prefix_mapping,
+                concat_freq_with_prefix=True,
+                filter_data_by_stokes_i=True,
+                frequency_to_mhz_multiplier=1e6,
+            ),
+            use_cache=use_cache,
+        )
+
+    @staticmethod
+    def __get_cached_sky(
+        path: str,
+        params: Dict[str, Any],
+        create_sky: Callable[[], SkyModel],
+        use_cache: bool,
+    ) -> SkyModel:
+        """Returns the sky created by `create_sky` from `path`, through the
+        `SkyCache`. On a cache hit, `sources` is a dask-array on the read-only
+        memory-mapped cache entry."""
+        if not use_cache:
+            return create_sky()
+        key = SkyCache.get_key(path=path, params=params)
+        cached = SkyCache.load(key)
+        if cached is None:
+            sky = create_sky()
+            if sky.sources is None:
+                raise KaraboSkyModelError("`sky.sources` is None but shouldn't be.")
+            source_ids, source_id_categories = _source_id_codes(
+                sky.sources, sky._sources_dim_sources
+            )
+            SkyCache.store(
+                key=key,
+                sources=sky.sources.data,
+                source_ids=source_ids,
+                source_id_categories=source_id_categories,
+            )
+            sky.close()
+            cached = SkyCache.load(key)
+            if cached is None:
+                raise KaraboSkyModelError(f"Storing sky cache entry {key} failed.")
+        sources, source_ids, source_id_categories = cached
+        coords = None
+        if source_ids is not None and source_id_categories is not None:
+            coords = {
+                XARRAY_DIM_0_DEFAULT: source_ids_from_codes(
+                    source_ids, source_id_categories
+                )
+            }
+        elif source_ids is not None:
+            coords = {XARRAY_DIM_0_DEFAULT: source_ids}
+        return SkyModel(
+            xr.DataArray(
+                da.from_array(sources, chunks=("auto", -1)),  # type: ignore [attr-defined] # noqa: E501
+                dims=[XARRAY_DIM_0_DEFAULT, XARRAY_DIM_1_DEFAULT],
+                coords=coords,
+            ),
+            precision=sources.dtype.type,
         )
 
     @staticmethod
@@ -1215,12 +1905,17 @@ class SkyModel:
         filter_data_by_stokes_i: bool = False,
         frequency_to_mhz_multiplier: float = 1e6,
         chunksize: Union[int, Literal["auto"]] = "auto",
-        memmap: bool = False,
+        memmap: bool = True,
     ) -> SkyModel:
         """
         Reads data from a FITS file and creates an xarray Dataset containing
         information about celestial sources at given frequencies.
 
+        The table is streamed in blocks of `chunksize` rows and only the mapped
+        columns are read, so the peak memory is bounded by the chunk size rather
+        than the file size. The returned `sources` are a lazy dask array with one
+        chunk per block and frequency. Only the source ids are loaded eagerly.
+
         Parameters
         ----------
         path : str
@@ -1238,17 +1933,18 @@ class SkyModel:
             If True, concatenates the frequency with the prefix for each column.
             Defaults to False.
         filter_data_by_stokes_i : bool, optional
-            If True, filters the data by Stokes I. Defaults to False.
+            If True, sources without Stokes I (NaN) at the respective frequency
+            are dropped. Defaults to False.
         frequency_to_mhz_multiplier : float, optional
             Factor to convert the frequency units to MHz. Defaults to 1e6.
         chunksize : int or str, optional
-            The size of the chunks to use when creating the Dask arrays. This can
-            be an integer representing the number of rows per chunk, or a string
-            representing the size of each chunk in bytes (e.g. '64MB', '1GB', etc.)
-            or 'auto'.
+            Number of rows of the FITS table which are read at once and end up in
+            one chunk of the resulting dask array. 'auto' derives it from the
+            dask config `array.chunk-size`.
         memmap : bool, optional
-            Whether to use memory mapping when opening the FITS file. Defaults to False.
-            Allows for reading of larger-than-memory files.
+            Whether to use memory mapping when opening the FITS file.
+            Defaults to True, which allows to stream larger-than-memory files.
+            With False, every block read loads the whole table into memory.
 
         Returns
         -------
@@ -1285,36 +1981,27 @@ class SkyModel:
         ...     ),
         ...     concat_freq_with_prefix=True,
         ...     filter_data_by_stokes_i=True,
-        ...     chunks='auto',
-        ...     memmap=False,
+        ...     chunksize='auto',
+        ...     memmap=True,
         ... )
 
         """
         with fits.open(path, memmap=memmap) as hdul:
-            header = hdul[1].header
-            data = hdul[1].data
-
-        column_names = [header[f"TTYPE{i+1}"] for i in range(header["TFIELDS"])]
-        data_dict = {name: data[name] for name in column_names}
+            n_rows = int(hdul[1].header["NAXIS2"])
+            fits_columns = set(hdul[1].columns.names)
 
-        dataset = xr.Dataset(data_dict)
-        data_arrays: List[xr.DataArray] = []
+        if chunksize == "auto":
+            chunk_bytes = parse_bytes(dask.config.get("array.chunk-size"))
+            block_size = max(chunk_bytes // (SkyModel.SOURCES_COLS * 8), 1)
+        else:
+            block_size = chunksize
+        block_starts = list(range(0, n_rows, block_size))
 
+        # per frequency: FITS column name or constant value of each sources-column
+        freq_columns: List[List[Union[str, float]]] = []
         for freq in frequencies:
             freq_str = str(freq).zfill(3)
-
-            if filter_data_by_stokes_i and prefix_mapping.stokes_i is not None:
-                dataset_filtered = dataset.dropna(
-                    dim=f"{prefix_mapping.stokes_i}{freq_str}"
-                )
-            else:
-                dataset_filtered = dataset
-
-            data_list: List[xr.DataArray] = []
-            if prefix_mapping.id is not None:
-                source_ids = dataset_filtered[prefix_mapping.id].values
-            else:
-                source_ids = None
+            columns: List[Union[str, float]] = []
             for field in fields(prefix_mapping):
                 col = field.name
                 pm_col: Optional[str] = getattr(prefix_mapping, field.name)
@@ -1322,48 +2009,103 @@ class SkyModel:
                     continue
                 if pm_col is not None:
                     if concat_freq_with_prefix and col not in ["ra", "dec"]:
-                        col_name = pm_col + freq_str
+                        columns.append(pm_col + freq_str)
                     else:
-                        col_name = pm_col
-
-                    freq_data = xr.DataArray(
-                        dataset_filtered[col_name].values,
-                    )
+                        columns.append(pm_col)
                 elif col == "ref_freq":
-                    freq_data = xr.DataArray(
-                        np.full(
-                            len(dataset_filtered[prefix_mapping.ra]),
-                            freq * frequency_to_mhz_multiplier,
-                        ),
-                    )
+                    columns.append(freq * frequency_to_mhz_multiplier)
                 else:
-                    freq_data = xr.DataArray(
-                        np.zeros(len(dataset_filtered[prefix_mapping.ra])),
-                    )
-                data_list.append(freq_data)
-
-            data_array = xr.concat(data_list, dim=XARRAY_DIM_1_DEFAULT)
-            if source_ids is not None:
-                data_array.coords[XARRAY_DIM_0_DEFAULT] = source_ids
-            data_arrays.append(data_array)
-
-        for freq_dataset in data_arrays:
-            freq_dataset.chunk({XARRAY_DIM_0_DEFAULT: chunksize})  # type: ignore [dict-item] # noqa: E501
+                    columns.append(0.0)
+            freq_columns.append(columns)
+        required_columns = {
+            col for columns in freq_columns for col in columns if isinstance(col, str)
+        }
+        if prefix_mapping.id is not None:
+            required_columns.add(prefix_mapping.id)
+        missing_columns = required_columns - fits_columns
+        if len(missing_columns) > 0:
+            raise KaraboSkyModelError(
+                f"Columns {sorted(missing_columns)} don't exist in {path}."
+            )
+        filter_column_idx = (
+            SkyModel._STOKES_IDX["Stokes I"]
+            if filter_data_by_stokes_i and prefix_mapping.stokes_i is not None
+            else None
+        )
 
-        result_dataset = (
-            xr.concat(data_arrays, dim=XARRAY_DIM_0_DEFAULT)
-            .chunk({XARRAY_DIM_0_DEFAULT: chunksize})  # type: ignore [dict-item]
-            .T
+        # First pass over the blocks only reads the stokes I and id columns, to
+        # know the size of each (filtered) block and to collect the source ids.
+        # The ids are dictionary-encoded once, so that all frequencies share the
+        # same dictionary and only repeat the integer codes.
+        n_sources = np.empty((len(frequencies), len(block_starts)), dtype=np.int_)
+        source_ids: List[List[NDArray[Any]]] = [[] for _ in frequencies]
+        with fits.open(path, memmap=memmap) as hdul:
+            data = hdul[1].data
+            id_codes, id_categories = None, None
+            if prefix_mapping.id is not None:
+                id_codes, id_categories = pd.factorize(
+                    np.asarray(data.field(prefix_mapping.id))
+                )
+                id_codes = id_codes.astype(np.int32)
+            for block_idx, start in enumerate(block_starts):
+                stop = min(start + block_size, n_rows)
+                ids = None
+                if id_codes is not None:
+                    ids = id_codes[start:stop]
+                for freq_idx, columns in enumerate(freq_columns):
+                    keep = _fits_block_mask(
+                        data, columns, filter_column_idx, start, stop
+                    )
+                    n_sources[freq_idx, block_idx] = (
+                        stop - start if keep is None else np.count_nonzero(keep)
+                    )
+                    if ids is not None:
+                        source_ids[freq_idx].append(ids if keep is None else ids[keep])
+
+        blocks = [
+            da.from_delayed(  # type: ignore [attr-defined]
+                dask.delayed(_read_fits_block)(  # type: ignore [attr-defined]
+                    path, columns, filter_column_idx, start, block_size, memmap
+                ),
+                shape=(n_sources[freq_idx, block_idx], SkyModel.SOURCES_COLS),
+                dtype=np.float64,
+            )
+            for freq_idx, columns in enumerate(freq_columns)
+            for block_idx, start in enumerate(block_starts)
+        ]
+        if len(blocks) == 0:
+            sources = da.zeros((0, SkyModel.SOURCES_COLS))  # type: ignore [attr-defined] # noqa: E501
+        else:
+            sources = da.concatenate(blocks, axis=0)  # type: ignore [attr-defined]
+        coords = None
+        if id_categories is not None:
+            coords = {
+                XARRAY_DIM_0_DEFAULT: source_ids_from_codes(
+                    np.concatenate(
+                        [ids for freq_ids in source_ids for ids in freq_ids]
+                        + [np.empty(0, dtype=np.int32)]
+                    ),
+                    id_categories,
+                )
+            }
+        result_dataset = xr.DataArray(
+            sources,
+            dims=[XARRAY_DIM_0_DEFAULT, XARRAY_DIM_1_DEFAULT],
+            coords=coords,
         )
 
         return SkyModel(result_dataset)
 
     @staticmethod
-    def get_BATTYE_sky() -> SkyModel:
+    def get_BATTYE_sky(use_cache: bool = True) -> SkyModel:
         """
         Downloads BATTYE survey data and generates a sky
         model using the downloaded data.
 
+        Args:
+            use_cache: If True, the converted sources are stored in the `SkyCache`
+                and later calls memory-map them instead of converting the survey again.
+
         Source:
         The BATTYE survey data was provided by Jennifer Studer
         (https://github.com/jejestern)
@@ -1395,21 +2137,39 @@ class SkyModel:
         )
         extra_columns = ["Observed Redshift"]
 
-        sky = SkyModel.get_sky_model_from_h5_to_xarray(
-            path=path, prefix_mapping=column_mapping, extra_columns=extra_columns
-        )
-        if sky.sources is None:
-            raise KaraboSkyModelError("`sky.sources` is None but shouldn't be.")
+        def create_sky() -> SkyModel:
+            sky = SkyModel.get_sky_model_from_h5_to_xarray(
+                path=path, prefix_mapping=column_mapping, extra_columns=extra_columns
+            )
+            if sky.sources is None:
+                raise KaraboSkyModelError("`sky.sources` is None but shouldn't be.")
 
-        sky.sources[:, 1] *= -1
+            sky.sources[:, 1] *= -1
 
-        return sky
+            return sky
+
+        return SkyModel.__get_cached_sky(
+            path=path,
+            params={
+                "survey": "BATTYE",
+                "prefix_mapping": column_mapping,
+                "extra_columns": tuple(extra_columns),
+            },
+            create_sky=create_sky,
+            use_cache=use_cache,
+        )
 
     @staticmethod
-    def get_MIGHTEE_Sky() -> SkyModel:
+    def get_MIGHTEE_Sky(use_cache: bool = True) -> SkyModel:
         """
         Downloads the MIGHTEE catalog and creates a SkyModel object.
 
+        Parameters
+        ----------
+        use_cache : bool, optional
+            If True, the converted sources are stored in the `SkyCache` and later
+            calls memory-map them instead of converting the catalog again.
+
         Returns
         -------
         SkyModel
@@ -1439,14 +2199,22 @@ class SkyModel:
             id="NAME",
         )
 
-        return SkyModel.get_sky_model_from_fits(
+        return SkyModel.__get_cached_sky(
             path=path,
-            frequencies=[76],
-            prefix_mapping=prefix_mapping,
-            concat_freq_with_prefix=False,
-            filter_data_by_stokes_i=False,
-            frequency_to_mhz_multiplier=1e6,
-            memmap=False,
+            params={
+                "survey": "MIGHTEE",
+                "frequencies": (76,),
+                "prefix_mapping": prefix_mapping,
+            },
+            create_sky=lambda: SkyModel.get_sky_model_from_fits(
+                path=path,
+                frequencies=[76],
+                prefix_mapping=prefix_mapping,
+                concat_freq_with_prefix=False,
+                filter_data_by_stokes_i=False,
+                frequency_to_mhz_multiplier=1e6,
+            ),
+            use_cache=use_cache,
         )
 
     @staticmethod
@@ -1455,13 +2223,116 @@ class SkyModel:
         max_size: Tuple[IntFloat, IntFloat],
         flux_min: IntFloat,
         flux_max: IntFloat,
-        r: int = 3,
+        r: IntFloat = 3,
+        seed: Optional[int] = None,
     ) -> SkyModel:
+        """
+        Creates a sky of random sources which are at least `r` degrees apart
+        (Poisson disc sampling), with uniformly distributed stokes I flux.
+
+        :param min_size: (ra, dec) of one corner of the sampled area in degrees
+        :param max_size: (ra, dec) of the opposite corner in degrees
+        :param flux_min: Minimum stokes I flux in Jy
+        :param flux_max: Maximum stokes I flux in Jy
+        :param r: Minimum distance between two sources in degrees
+        :param seed: Optional seed, the same seed creates the same sky
+
+        :return: The random sky
+        """
         sky_array = xr.DataArray(
-            get_poisson_disk_sky(min_size, max_size, flux_min, flux_max, r)
+            get_poisson_disk_sky(min_size, max_size, flux_min, flux_max, r, seed)
         )
         return SkyModel(sky_array)
 
+    @staticmethod
+    def get_random_power_law_sky(
+        n_sources: int,
+        min_size: Tuple[IntFloat, IntFloat] = (-1, -35),
+        max_size: Tuple[IntFloat, IntFloat] = (1, -25),
+        flux_min: IntFloat = 1e-3,
+        flux_max: IntFloat = 10,
+        flux_index: IntFloat = -2.5,
+        ref_freq_hz: IntFloat = 100e6,
+        spectral_index: IntFloat = -0.7,
+        chunksize: Union[int, Literal["auto"]] = "auto",
+        seed: Optional[int] = None,
+    ) -> SkyModel:
+        """
+        Creates a lazy (dask-backed) sky of random point sources, e.g. for
+        benchmarks and scale tests which shouldn't depend on survey downloads.
+
+        The sources are uniformly distributed on the sphere within the given
+        ra/dec box. The stokes I flux follows the power law dN/dS ~ S**flux_index
+        within [flux_min, flux_max]; -2.5 is the slope of a static euclidean
+        universe, the differential counts of radio sources below 1 Jy are
+        flatter (about -1.6 to -1.8).
+
+        Each chunk is created independently from (`seed`, chunk index) when it's
+        computed, so arbitrarily large skies (10^8+ sources) never have to fit
+        into memory and the same `seed` and `chunksize` always create the same
+        sky, no matter which or how many chunks are computed.
+
+        :param n_sources: Number of sources
+        :param min_size: (ra, dec) of one corner of the sampled area in degrees
+        :param max_size: (ra, dec) of the opposite corner in degrees
+        :param flux_min: Minimum stokes I flux in Jy
+        :param flux_max: Maximum stokes I flux in Jy
+        :param flux_index: Slope of the differential source counts dN/dS
+        :param ref_freq_hz: Reference frequency of all sources in Hz
+        :param spectral_index: Spectral index of all sources
+        :param chunksize: Number of sources per chunk. 'auto' derives it from
+            the dask config `array.chunk-size`.
+        :param seed: Optional seed, a random one is drawn if not provided
+
+        :return: The random sky
+        """
+        if n_sources < 0:
+            raise KaraboSkyModelError(
+                f"`n_sources` must be non-negative but is {n_sources}."
+            )
+        if not 0 < flux_min <= flux_max:
+            raise KaraboSkyModelError(
+                "Expected 0 < `flux_min` <= `flux_max` but got "
+                + f"{flux_min=} and {flux_max=}."
+            )
+        if chunksize == "auto":
+            chunk_bytes = parse_bytes(dask.config.get("array.chunk-size"))
+            chunksize = max(chunk_bytes // (SkyModel.SOURCES_COLS * 8), 1)
+        elif chunksize < 1:
+            raise KaraboSkyModelError(
+                f"`chunksize` must be positive but is {chunksize}."
+            )
+        if seed is None:
+            # fixed once, so that recomputing a chunk creates the same sources
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+
+        blocks = [
+            da.from_delayed(  # type: ignore [attr-defined]
+                dask.delayed(_random_power_law_block)(  # type: ignore [attr-defined]
+                    min(chunksize, n_sources - start),
+                    seed,
+                    block_idx,
+                    (float(min_size[0]), float(min_size[1])),
+                    (float(max_size[0]), float(max_size[1])),
+                    float(flux_min),
+                    float(flux_max),
+                    float(flux_index),
+                    float(ref_freq_hz),
+                    float(spectral_index),
+                ),
+                shape=(min(chunksize, n_sources - start), SkyModel.SOURCES_COLS),
+                dtype=np.float64,
+            )
+            for block_idx, start in enumerate(range(0, n_sources, chunksize))
+        ]
+        if len(blocks) == 0:
+            sources = da.zeros((0, SkyModel.SOURCES_COLS))  # type: ignore [attr-defined] # noqa: E501
+        else:
+            sources = da.concatenate(blocks, axis=0)  # type: ignore [attr-defined]
+        return SkyModel(
+            xr.DataArray(sources, dims=[XARRAY_DIM_0_DEFAULT, XARRAY_DIM_1_DEFAULT])
+        )
+
     @staticmethod
     def sky_test() -> SkyModel:
         """
@@ -1488,57 +2359,71 @@ class SkyModel:
 
     @staticmethod
     def sky_from_h5_with_redshift(
-        path: str, ra_deg: float, dec_deg: float, outer_rad: float = 5.0
+        path: str,
+        ra_deg: float,
+        dec_deg: float,
+        outer_rad: float = 5.0,
+        block_size: int = 1048576,
     ) -> Tuple[SkyModel, NDArray[np.float_]]:
         """
         A sky model is created from a h5 file containing a catalog with right ascension,
         declination, flux and observed redshift of HI distribution. The sky model only
         takes into account sources around a certain radius of the phase center.
 
+        The catalog is read block by block and the radius cut is applied to each
+        block right away, so the memory footprint is proportional to the selected
+        field (plus one block) and not to the full catalog.
+
         :param path: Path of the h5 file.
         :param ra_deg: Phase center, right ascension.
         :param dec_deg: Phase center, declination.
         :param outer_rad: The radius size of the sky model to be considered.
+        :param block_size: Number of catalog rows to read at once. It's rounded up
+                           to a multiple of the HDF5 chunk size of the catalog.
         :return: The sky model and the corresponding redshifts.
         TODO: Change after branch 400 is merged.
         """
-
-        # Read in the catalog (only works for catalogs which are not very large)
-        catalog = h5py.File(path, "r")
-        print("The catalog keys are:", list(catalog.keys()))
-        print("The unit of the flux given here is:", catalog["Flux"].attrs["Units"])
-        print(
-            "Number of elements in the complete catalog:",
-            len(catalog["Declination"][()]),
-        )
-
-        ra = np.array(catalog["Right Ascension"])
-        # We multiply by -1 to change the catalog to the Southern sky
-        dec = np.array(catalog["Declination"]) * -1
-        flux = np.array(catalog["Flux"])
-        z_obs = np.array(catalog["Observed Redshift"])
-        catalog.close()
-
-        # We construct the sky model from the catalog information with Karabo
-        sky_data = np.zeros((len(ra), 12))
-        sky_data[:, 0] = ra
-        sky_data[:, 1] = dec
-        sky_data[:, 2] = flux
-        sky = SkyModel()
-        sky.add_point_sources(sky_data)
-
-        # We only take into account a certain FOV, we filter the sky for this FOV
-        sky_filter, filter_in = sky.filter_by_radius(
-            ra0_deg=ra_deg,
-            dec0_deg=dec_deg,
-            inner_radius_deg=0.0,
-            outer_radius_deg=outer_rad,
-            indices=True,
-        )
-        z_obs_filter = z_obs[filter_in]
+        with h5py.File(path, "r") as catalog:
+            print("The catalog keys are:", list(catalog.keys()))
+            print("The unit of the flux given here is:", catalog["Flux"].attrs["Units"])
+            ra_dataset = catalog["Right Ascension"]
+            n_rows = ra_dataset.shape[0]
+            print("Number of elements in the complete catalog:", n_rows)
+
+            if ra_dataset.chunks is not None:
+                chunk_rows = ra_dataset.chunks[0]
+                block_size = max(-(-block_size // chunk_rows), 1) * chunk_rows
+
+            ra_blocks: List[NDArray[np.float_]] = []
+            dec_blocks: List[NDArray[np.float_]] = []
+            flux_blocks: List[NDArray[np.float_]] = []
+            z_obs_blocks: List[NDArray[np.float_]] = []
+            for start in range(0, n_rows, block_size):
+                stop = min(start + block_size, n_rows)
+                ra = ra_dataset[start:stop]
+                # We multiply by -1 to change the catalog to the Southern sky
+                dec = catalog["Declination"][start:stop] * -1
+                separation = angular_separation_deg(ra, dec, ra_deg, dec_deg)
+                (in_fov,) = np.nonzero(separation <= outer_rad)
+                if in_fov.shape[0] == 0:
+                    continue
+                ra_blocks.append(ra[in_fov])
+                dec_blocks.append(dec[in_fov])
+                # only the selected rows of the remaining columns are needed
+                flux_blocks.append(catalog["Flux"][start:stop][in_fov])
+                z_obs_blocks.append(catalog["Observed Redshift"][start:stop][in_fov])
+
+        n_sources = sum(block.shape[0] for block in ra_blocks)
+        sky_data = np.zeros((n_sources, 12))
+        if n_sources > 0:
+            sky_data[:, 0] = np.concatenate(ra_blocks)
+            sky_data[:, 1] = np.concatenate(dec_blocks)
+            sky_data[:, 2] = np.concatenate(flux_blocks)
+        z_obs_filter = np.concatenate(z_obs_blocks + [np.empty(0)])
+        sky_filter = SkyModel(sky_data)
         print(
             "Number of elements in diluted catalog in the interesting FOV:",
-            len(sky_filter[:, 0]),
+            n_sources,
         )
 
         return sky_filter, z_obs_filter
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import copy
+import math
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple, cast
+
+import numpy as np
+import xarray as xr
+from numpy.typing import NDArray
+
+from karabo.error import KaraboSkyModelError
+from karabo.util._types import IntFloat
+from karabo.util.math_util import angular_separation_deg
+
+if TYPE_CHECKING:
+    from karabo.simulation.sky_model import SkyModel
+
+# gets a column of the queried rows of `SkyModel.sources`
+_ColumnGetter = Callable[[int], xr.DataArray]
+_MaskFunc = Callable[[_ColumnGetter], xr.DataArray]
+# sorted candidate rows from an index of the sky, None if it has no such index
+_CandidatesFunc = Callable[["SkyModel"], Optional[NDArray[np.int_]]]
+
+
+def flat_approximation_search_radius_deg(
+    outer_radius_deg: IntFloat,
+    dec0_deg: IntFloat,
+) -> float:
+    """
+    Great-circle radius containing every source which the flat euclidean
+    approximation `dx = (ra - ra0) * cos(dec0)`, `dy = dec - dec0` selects.
+    With `D` the flat distance and `c0 = cos(dec0)`, the haversine formula and
+    `cos(dec) <= c0 + |dec - dec0|` give `sin(d / 2) <= D / 2 * sqrt(1 + D / c0)`.
+
+    :param outer_radius_deg: flat outer radius in degrees
+    :param dec0_deg: declination of the centre in degrees
+
+    :return: great-circle radius in degrees, 180 if there's no useful bound
+    """
+    flat_radius = math.radians(outer_radius_deg)
+    cos_dec0 = math.cos(math.radians(dec0_deg))
+    if cos_dec0 <= 0:
+        return 180.0
+    bound = flat_radius / 2 * math.sqrt(1 + flat_radius / cos_dec0)
+    if bound >= 1:
+        return 180.0
+    # small margin against rounding errors
+    return math.degrees(2 * math.asin(bound)) * (1 + 1e-9) + 1e-9
+
+
+class SkyQuery:
+    """
+    Lazy filter pipeline on a `SkyModel`, created through `SkyModel.query`.
+
+    Each filter method only records its predicate and returns the query itself,
+    so filters can be chained:
+
+        sky.query().radius(0, 5, 250, -80).flux(0.1, 10).collect()
+
+    Nothing is evaluated until `indices` or `collect` is called. Then all
+    predicates are fused into one boolean mask, which is computed in a single
+    pass over the (possibly dask-backed) `sources`. If the sky has a
+    `spatial_index`, radius predicates first restrict the rows to the sources
+    of the overlapping HEALPix pixels, and the other predicates are only
+    evaluated on those rows. With a `flux_index`, flux predicates are resolved
+    by binary search and aren't evaluated on the rows at all. In contrast to
+    chaining the `SkyModel.filter_by_*` methods, neither the sky nor
+    intermediate results are copied.
+    """
+
+    def __init__(self, sky: SkyModel) -> None:
+        """
+        :param sky: `SkyModel` to query
+        """
+        self._sky = sky
+        self._masks: List[_MaskFunc] = []
+        self._candidates: List[_CandidatesFunc] = []
+        # exact candidates make the mask of their predicate redundant
+        self._exact_candidates: List[Tuple[_CandidatesFunc, _MaskFunc]] = []
+
+    @property
+    def is_empty(self) -> bool:
+        """True if no predicate has been added yet."""
+        return len(self._masks) == 0 and len(self._exact_candidates) == 0
+
+    def radius(
+        self,
+        inner_radius_deg: IntFloat,
+        outer_radius_deg: IntFloat,
+        ra0_deg: IntFloat,
+        dec0_deg: IntFloat,
+        flat_approximation: bool = False,
+    ) -> SkyQuery:
+        """
+        Keeps the sources within an inner and outer circle around (ra0, dec0).
+
+        :param inner_radius_deg: Inner radius in degrees
+        :param outer_radius_deg: Outer radius in degrees
+        :param ra0_deg: Phase center right ascension
+        :param dec0_deg: Phase center declination
+        :param flat_approximation: If True, the distances are calculated using a flat
+            euclidean approximation, see
+            `SkyModel.filter_by_radius_euclidean_flat_approximation`.
+            Otherwise the exact great-circle distance is used.
+
+        :return: The query itself
+        """
+        if flat_approximation:
+            search_radius_deg = flat_approximation_search_radius_deg(
+                outer_radius_deg=outer_radius_deg, dec0_deg=dec0_deg
+            )
+
+            def mask(col: _ColumnGetter) -> xr.DataArray:
+                x = (col(0) - ra0_deg) * np.cos(np.radians(dec0_deg))
+                y = col(1) - dec0_deg
+                distances_sq = cast(xr.DataArray, np.add(np.square(x), np.square(y)))
+                return (distances_sq >= inner_radius_deg**2) & (
+                    distances_sq <= outer_radius_deg**2
+                )
+
+        else:
+            search_radius_deg = float(outer_radius_deg)
+
+            def mask(col: _ColumnGetter) -> xr.DataArray:
+                # only numpy ufuncs are applied, so the columns stay lazy
+                separation = cast(
+                    xr.DataArray,
+                    angular_separation_deg(
+                        cast(Any, col(0)), cast(Any, col(1)), ra0_deg, dec0_deg
+                    ),
+                )
+                return (separation >= inner_radius_deg) & (
+                    separation <= outer_radius_deg
+                )
+
+        def candidates(sky: SkyModel) -> Optional[NDArray[np.int_]]:
+            index = sky.spatial_index
+            if index is None:
+                return None
+            return index.query_disc_candidates(
+                ra0_deg=ra0_deg,
+                dec0_deg=dec0_deg,
+                radius_deg=search_radius_deg,
+            )
+
+        self._masks.append(mask)
+        self._candidates.append(candidates)
+        return self
+
+    def flux(
+        self,
+        min_flux_jy: IntFloat,
+        max_flux_jy: IntFloat,
+    ) -> SkyQuery:
+        """
+        Keeps the sources with `min_flux_jy <= stokes I <= max_flux_jy`.
+
+        :param min_flux_jy: Minimum flux in Jy
+        :param max_flux_jy: Maximum flux in Jy
+
+        :return: The query itself
+        """
+
+        def candidates(sky: SkyModel) -> Optional[NDArray[np.int_]]:
+            index = sky.flux_index
+            if index is None:
+                return None
+            return index.query_range(min_flux_jy=min_flux_jy, max_flux_jy=max_flux_jy)
+
+        self._exact_candidates.append(
+            (candidates, self.__between_mask(2, min_flux_jy, max_flux_jy))
+        )
+        return self
+
+    def frequency(
+        self,
+        min_freq: IntFloat,
+        max_freq: IntFloat,
+    ) -> SkyQuery:
+        """
+        Keeps the sources with `min_freq <= reference frequency <= max_freq`.
+
+        :param min_freq: Minimum frequency in Hz
+        :param max_freq: Maximum frequency in Hz
+
+        :return: The query itself
+        """
+        return self.__between(col_idx=6, min_value=min_freq, max_value=max_freq)
+
+    def __between(
+        self,
+        col_idx: int,
+        min_value: IntFloat,
+        max_value: IntFloat,
+    ) -> SkyQuery:
+        self._masks.append(self.__between_mask(col_idx, min_value, max_value))
+        return self
+
+    @staticmethod
+    def __between_mask(
+        col_idx: int,
+        min_value: IntFloat,
+        max_value: IntFloat,
+    ) -> _MaskFunc:
+        def mask(col: _ColumnGetter) -> xr.DataArray:
+            values = col(col_idx)
+            return (values >= min_value) & (values <= max_value)
+
+        return mask
+
+    def indices(self) -> NDArray[np.int_]:
+        """
+        Evaluates all predicates at once.
+
+        :return: Sorted indices of the sources fulfilling all predicates.
+        """
+        sky = self._sky
+        if sky.sources is None:
+            raise KaraboSkyModelError(
+                "`sources` is None, add sources before evaluating a `SkyQuery`."
+            )
+        rows: Optional[NDArray[np.int_]] = None
+        masks = list(self._masks)
+        candidates_funcs = [(func, None) for func in self._candidates] + [
+            (func, mask) for func, mask in self._exact_candidates
+        ]
+        for candidates, exact_mask in candidates_funcs:
+            new_rows = candidates(sky)
+            if new_rows is None:
+                if exact_mask is not None:
+                    masks.append(exact_mask)
+                continue
+            rows = (
+                new_rows
+                if rows is None
+                else np.intersect1d(rows, new_rows, assume_unique=True)
+            )
+
+        if len(masks) == 0:
+            return np.arange(sky.num_sources) if rows is None else rows
+        if rows is not None and rows.shape[0] == 0:
+            return rows
+
+        def col(col_idx: int) -> xr.DataArray:
+            if rows is None:
+                return sky[:, col_idx]
+            return sky[rows, col_idx]
+
+        mask = masks[0](col)
+        for mask_func in masks[1:]:
+            mask = mask & mask_func(col)
+        # the only place where the (fused) lazy mask gets computed
+        idxs = np.flatnonzero(np.asarray(mask))
+        if rows is not None:
+            idxs = rows[idxs]
+        return idxs
+
+    def collect(self) -> SkyModel:
+        """
+        Evaluates all predicates at once and selects the matching sources.
+
+        The returned sky holds the selected rows of `sources` (still lazy if
+        `sources` is dask-backed, with the original chunk size) and a copy of the
+        `wcs`. Neither the spatial index nor the HDF5 file connection are passed on.
+
+        :return: New sky containing only the matching sources.
+        """
+        return self.__select(self.indices())
+
+    def collect_with_indices(self) -> Tuple[SkyModel, NDArray[np.int_]]:
+        """
+        Same as `collect`, but also returns the indices of the selected sources.
+
+        :return: New sky and the sorted indices of the selected sources.
+        """
+        idxs = self.indices()
+        return self.__select(idxs), idxs
+
+    def __select(self, idxs: NDArray[np.int_]) -> SkyModel:
+        sky = self._sky
+        if sky.sources is None:
+            raise KaraboSkyModelError(
+                "`sources` is None, add sources before evaluating a `SkyQuery`."
+            )
+        sources = sky.rechunk_array_based_on_self(sky.sources[idxs])
+        return type(sky)(
+            sources=sources,
+            wcs=copy.deepcopy(sky.wcs),
+            precision=sky.precision,
+        )
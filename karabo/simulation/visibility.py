@@ -3,16 +3,286 @@ from __future__ import annotations
 import os
 import os.path
 import shutil
-from typing import List, Optional
+from dataclasses import dataclass, replace
+from typing import Iterable, List, Literal, Optional, Sequence, Tuple
 
 import numpy as np
 import oskar
 from numpy.typing import NDArray
 
+from karabo.error import KaraboError
 from karabo.karabo_resource import KaraboResource
 from karabo.util.file_handle import FileHandle
 
 
+@dataclass
+class VisibilityData:
+    """
+    Cross-correlations of all blocks of an OSKAR .vis file, e.g. to combine the
+    visibilities of several simulations before writing them as one measurement
+    set.
+
+    :ivar vis: (times, channels, baselines, polarisations) cross-correlations
+    :ivar uu_metres: (times, baselines) baseline u-coordinates in metres
+    :ivar vv_metres: (times, baselines) baseline v-coordinates in metres
+    :ivar ww_metres: (times, baselines) baseline w-coordinates in metres
+    :ivar time_stamps_mjd_sec: (times,) centre of each time step, MJD (UTC) in
+        seconds as expected by measurement sets
+    :ivar num_stations: number of stations
+    :ivar freq_start_hz: frequency of the first channel in Hz
+    :ivar freq_inc_hz: frequency increment between channels in Hz
+    :ivar phase_centre_ra_deg: right ascension of the phase centre in degrees
+    :ivar phase_centre_dec_deg: declination of the phase centre in degrees
+    :ivar time_inc_sec: time increment between time steps in seconds
+    :ivar time_average_sec: integration time of each time step in seconds
+    """
+
+    vis: NDArray[np.complex_]
+    uu_metres: NDArray[np.float_]
+    vv_metres: NDArray[np.float_]
+    ww_metres: NDArray[np.float_]
+    time_stamps_mjd_sec: NDArray[np.float_]
+    num_stations: int
+    freq_start_hz: float
+    freq_inc_hz: float
+    phase_centre_ra_deg: float
+    phase_centre_dec_deg: float
+    time_inc_sec: float
+    time_average_sec: float
+
+    @property
+    def num_times(self) -> int:
+        return int(self.vis.shape[0])
+
+    @property
+    def num_channels(self) -> int:
+        return int(self.vis.shape[1])
+
+    @property
+    def num_baselines(self) -> int:
+        return int(self.vis.shape[2])
+
+    @property
+    def num_pols(self) -> int:
+        return int(self.vis.shape[3])
+
+    @staticmethod
+    def read(path: str) -> VisibilityData:
+        """
+        Reads all blocks of the OSKAR .vis file at `path`.
+
+        :param path: path of the .vis file
+        :return: the visibilities of all times and channels
+        """
+        (header, handle) = oskar.VisHeader.read(path)
+        block = oskar.VisBlock.create_from_header(header)
+        num_times = header.num_times_total
+        num_channels = header.num_channels_total
+        vis: Optional[NDArray[np.complex_]] = None
+        uvw: List[NDArray[np.float_]] = []
+        for k in range(header.num_blocks):
+            block.read(header, handle, k)
+            t0, n_t = block.start_time_index, block.num_times
+            c0, n_c = block.start_channel_index, block.num_channels
+            cross_correlations = block.cross_correlations()
+            if vis is None:
+                vis = np.zeros(
+                    (num_times, num_channels, block.num_baselines, block.num_pols),
+                    dtype=cross_correlations.dtype,
+                )
+                uvw = [np.zeros((num_times, block.num_baselines)) for _ in range(3)]
+            vis[t0 : t0 + n_t, c0 : c0 + n_c] = cross_correlations[:n_t, :n_c]
+            for coords, block_coords in zip(
+                uvw,
+                (
+                    block.baseline_uu_metres(),
+                    block.baseline_vv_metres(),
+                    block.baseline_ww_metres(),
+                ),
+            ):
+                coords[t0 : t0 + n_t] = block_coords[:n_t]
+        if vis is None:
+            raise KaraboError(f"{path} doesn't contain any visibility block.")
+        time_inc_sec = float(header.time_inc_sec)
+        return VisibilityData(
+            vis=vis,
+            uu_metres=uvw[0],
+            vv_metres=uvw[1],
+            ww_metres=uvw[2],
+            time_stamps_mjd_sec=header.time_start_mjd_utc * 86400.0
+            + (np.arange(num_times) + 0.5) * time_inc_sec,
+            num_stations=int(block.num_stations),
+            freq_start_hz=float(header.freq_start_hz),
+            freq_inc_hz=float(header.freq_inc_hz),
+            phase_centre_ra_deg=float(header.phase_centre_ra_deg),
+            phase_centre_dec_deg=float(header.phase_centre_dec_deg),
+            time_inc_sec=time_inc_sec,
+            time_average_sec=float(header.get_time_average_sec()),
+        )
+
+    @staticmethod
+    def sum(visibilities: Sequence[VisibilityData]) -> VisibilityData:
+        """
+        Sums visibilities of the same observation, e.g. of simulations of
+        disjoint parts of a sky, because visibilities are linear in the sky.
+
+        :param visibilities: visibilities with the same times, channels,
+            baselines and phase centre
+        :return: the summed visibilities
+        """
+        if len(visibilities) == 0:
+            raise KaraboError("At least one visibility is required.")
+        first = visibilities[0]
+        vis = first.vis.copy()
+        for other in visibilities[1:]:
+            if (
+                other.vis.shape != first.vis.shape
+                or other.freq_start_hz != first.freq_start_hz
+                or other.freq_inc_hz != first.freq_inc_hz
+                or other.phase_centre_ra_deg != first.phase_centre_ra_deg
+                or other.phase_centre_dec_deg != first.phase_centre_dec_deg
+                or not np.allclose(other.time_stamps_mjd_sec, first.time_stamps_mjd_sec)
+            ):
+                raise KaraboError(
+                    "Only visibilities of the same observation can be summed."
+                )
+            vis += other.vis
+        return replace(first, vis=vis)
+
+    @staticmethod
+    def concatenate(
+        visibilities: Sequence[VisibilityData],
+        axis: Literal["time", "channel"] = "time",
+    ) -> VisibilityData:
+        """
+        Concatenates visibilities of the same telescope and phase centre, e.g.
+        of observations split by time or by channels.
+
+        :param visibilities: visibilities to concatenate, in order
+        :param axis: "time" to append the time steps, which keep their time
+            stamps, or "channel" to append contiguous channels
+        :return: the concatenated visibilities
+        """
+        if len(visibilities) == 0:
+            raise KaraboError("At least one visibility is required.")
+        first = visibilities[0]
+        if axis == "time":
+            return replace(
+                first,
+                vis=np.concatenate([v.vis for v in visibilities], axis=0),
+                uu_metres=np.concatenate([v.uu_metres for v in visibilities]),
+                vv_metres=np.concatenate([v.vv_metres for v in visibilities]),
+                ww_metres=np.concatenate([v.ww_metres for v in visibilities]),
+                time_stamps_mjd_sec=np.concatenate(
+                    [v.time_stamps_mjd_sec for v in visibilities]
+                ),
+            )
+        freq_start_hz = first.freq_start_hz
+        for vis in visibilities:
+            if not np.isclose(vis.freq_start_hz, freq_start_hz) or not np.isclose(
+                vis.freq_inc_hz, first.freq_inc_hz
+            ):
+                raise KaraboError("Only contiguous channels can be concatenated.")
+            freq_start_hz += vis.num_channels * vis.freq_inc_hz
+        return replace(first, vis=np.concatenate([v.vis for v in visibilities], axis=1))
+
+    def write_ms(self, path: str) -> None:
+        """
+        Writes the visibilities as measurement set.
+
+        :param path: path of the measurement set, an existing one is replaced
+        """
+        self.write_rows(self.create_ms(path))
+
+    def create_ms(self, path: str) -> oskar.MeasurementSet:
+        """
+        Creates an empty measurement set for the telescope, channels and phase
+        centre of these visibilities, see `write_rows`.
+
+        :param path: path of the measurement set, an existing one is replaced
+        :return: the opened measurement set
+        """
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        ms = oskar.MeasurementSet.create(
+            path,
+            self.num_stations,
+            self.num_channels,
+            self.num_pols,
+            self.freq_start_hz,
+            self.freq_inc_hz,
+        )
+        deg2rad = np.pi / 180
+        ms.set_phase_centre(
+            self.phase_centre_ra_deg * deg2rad, self.phase_centre_dec_deg * deg2rad
+        )
+        return ms
+
+    def write_rows(self, ms: oskar.MeasurementSet, start_row: int = 0) -> None:
+        """
+        Writes the visibilities into `ms`, one row per time step and baseline.
+
+        :param ms: measurement set created by `create_ms` of compatible
+            visibilities
+        :param start_row: row of the first time step and baseline
+        """
+        for t in range(self.num_times):
+            row = start_row + t * self.num_baselines
+            ms.write_coords(
+                row,
+                self.num_baselines,
+                self.uu_metres[t],
+                self.vv_metres[t],
+                self.ww_metres[t],
+                self.time_average_sec,
+                self.time_inc_sec,
+                self.time_stamps_mjd_sec[t],
+            )
+            ms.write_vis(
+                row,
+                0,
+                self.num_channels,
+                self.num_baselines,
+                self.vis[t],
+            )
+
+    @staticmethod
+    def write_ms_stream(
+        path: str,
+        visibilities: Iterable[Tuple[int, VisibilityData]],
+        first_time_steps: Optional[Sequence[int]] = None,
+    ) -> None:
+        """
+        Writes visibilities of several observations (e.g. of several days or
+        time windows) as one measurement set, as soon as they arrive. The
+        observation with index i is written after the rows of observations 0 to
+        i-1, so they may arrive in any order and only one of them is held in
+        memory at a time.
+
+        :param path: path of the measurement set, an existing one is replaced
+        :param visibilities: (index, visibilities) of each observation
+        :param first_time_steps: time step of the measurement set at which each
+            observation starts. If None, the observations must be equally long.
+        """
+        ms: Optional[oskar.MeasurementSet] = None
+        num_times = 0
+        for idx, vis in visibilities:
+            if ms is None:
+                ms = vis.create_ms(path)
+                num_times = vis.num_times
+            elif first_time_steps is None and vis.num_times != num_times:
+                raise KaraboError(
+                    "Only visibilities of equally long observations can be "
+                    + "written as stream without `first_time_steps`."
+                )
+            first_time_step = (
+                idx * num_times if first_time_steps is None else first_time_steps[idx]
+            )
+            vis.write_rows(ms, start_row=first_time_step * vis.num_baselines)
+        if ms is None:
+            raise KaraboError("At least one visibility is required.")
+
+
 class Visibility(KaraboResource):
     def __init__(
         self,
@@ -41,15 +311,31 @@ class Visibility(KaraboResource):
         self.ms_file = FileHandle(path=ms_file_path, file_name=None, suffix=".MS")
 
     def write_to_file(self, path: str) -> None:
+        """
+        Copies the visibilities to `path`, the measurement set if `path` is one
+        (see `is_measurement_set`) and the .vis file otherwise.
+
+        :param path: file or directory to copy to
+        """
+        source = (
+            self.ms_file.path if Visibility.is_measurement_set(path) else self.file.path
+        )
+        if not os.path.exists(source):
+            # e.g. visibilities combined from several simulations only exist
+            # as measurement set
+            raise KaraboError(
+                f"Can't write visibilities to {path}, {source} doesn't exist. "
+                + f"The measurement set is {self.ms_file.path}."
+            )
         # Create the directory if it does not exist
         if os.path.isfile(path):
             os.makedirs(os.path.dirname(path), exist_ok=True)
         else:
             os.makedirs(path, exist_ok=True)
-        if os.path.isfile(self.file.path):
-            shutil.copy(self.file.path, path)
+        if os.path.isfile(source):
+            shutil.copy(source, path)
         else:
-            shutil.copytree(self.file.path, path, dirs_exist_ok=True)
+            shutil.copytree(source, path, dirs_exist_ok=True)
 
     @staticmethod
     def read_from_file(path: str) -> Visibility:
@@ -164,11 +450,35 @@ class Visibility(KaraboResource):
         group_by: str = "day",
         return_path: bool = False,
     ) -> Optional[str]:
+        """
+        Combines the visibilities of several observations (e.g. of several days
+        of an `ObservationLong`) as one measurement set.
+
+        :param visiblity_files: .vis files of the observations
+        :param combined_ms_filepath: path of the measurement set to write, a
+            temporary one is created if None
+        :param group_by: "day" appends the time steps of all observations, which
+            keep their time stamps. They're read and written one file at a time.
+            Otherwise all time steps are written consecutively from the start of
+            the first observation, with the mean baseline coordinates.
+        :param return_path: whether to return the path of the measurement set
+        """
         print(f"Combining {len(visiblity_files)} visibilities...")
         if combined_ms_filepath is None:
             fh = FileHandle(suffix=".MS")
             combined_ms_filepath = fh.path
 
+        if group_by == "day":
+            print("### Writing combined visibilities in ", combined_ms_filepath)
+            VisibilityData.write_ms_stream(
+                combined_ms_filepath,
+                (
+                    (idx, VisibilityData.read(vis_file))
+                    for idx, vis_file in enumerate(visiblity_files)
+                ),
+            )
+            return combined_ms_filepath if return_path else None
+
         # Initialize lists to store data
         out_vis, uui, vvi, wwi, time_start, time_inc, time_ave = ([] for _ in range(7))
 
@@ -204,63 +514,38 @@ class Visibility(KaraboResource):
         print("### Writing combined visibilities in ", combined_ms_filepath)
 
         num_files = len(visiblity_files)
-        if group_by == "day":
-            for j in range(num_files):
-                num_times = out_vis[j].shape[0]
-                for t in range(num_times):
-                    time_stamp = time_inc[j] * time_start[j]
-                    exposure_sec = time_ave[0]
-                    start_row = t * block.num_baselines
-                    ms.write_coords(
-                        start_row,
-                        block.num_baselines,
-                        uui[j][t],
-                        vvi[j][t],
-                        wwi[j][t],
-                        exposure_sec,
-                        time_ave[j],
-                        time_stamp,
-                    )
-                    ms.write_vis(
-                        start_row,
-                        0,
-                        block.num_channels,
-                        block.num_baselines,
-                        out_vis[j][t],
-                    )
-        else:
-            num_times = out_vis[0].shape[0] * num_files
-            ushape = np.array(uui).shape
-            outshape = np.array(out_vis).shape
-            uuf = np.array(uui).reshape(ushape[0] * ushape[1], ushape[2])
-            vvf = np.array(vvi).reshape(ushape[0] * ushape[1], ushape[2])
-            wwf = np.array(wwi).reshape(ushape[0] * ushape[1], ushape[2])
-            out_vis_reshaped = np.array(out_vis).reshape(
-                outshape[0] * outshape[1], outshape[2], outshape[3], outshape[4]
+        num_times = out_vis[0].shape[0] * num_files
+        ushape = np.array(uui).shape
+        outshape = np.array(out_vis).shape
+        uuf = np.array(uui).reshape(ushape[0] * ushape[1], ushape[2])
+        vvf = np.array(vvi).reshape(ushape[0] * ushape[1], ushape[2])
+        wwf = np.array(wwi).reshape(ushape[0] * ushape[1], ushape[2])
+        out_vis_reshaped = np.array(out_vis).reshape(
+            outshape[0] * outshape[1], outshape[2], outshape[3], outshape[4]
+        )
+        for t in range(num_times):
+            time_stamp = time_start[0] + t * time_inc[0] / 86400.0
+            exposure_sec = time_ave[0]
+            interval_sec = time_ave[0]
+            start_row = t * block.num_baselines
+
+            ms.write_coords(
+                start_row,
+                block.num_baselines,
+                np.mean(uuf, axis=0),
+                np.mean(vvf, axis=0),
+                np.mean(wwf, axis=0),
+                exposure_sec,
+                interval_sec,
+                time_stamp,
+            )
+            ms.write_vis(
+                start_row,
+                0,
+                block.num_channels,
+                block.num_baselines,
+                out_vis_reshaped[t],
             )
-            for t in range(num_times):
-                time_stamp = time_start[0] + t * time_inc[0] / 86400.0
-                exposure_sec = time_ave[0]
-                interval_sec = time_ave[0]
-                start_row = t * block.num_baselines
-
-                ms.write_coords(
-                    start_row,
-                    block.num_baselines,
-                    np.mean(uuf, axis=0),
-                    np.mean(vvf, axis=0),
-                    np.mean(wwf, axis=0),
-                    exposure_sec,
-                    interval_sec,
-                    time_stamp,
-                )
-                ms.write_vis(
-                    start_row,
-                    0,
-                    block.num_channels,
-                    block.num_baselines,
-                    out_vis_reshaped[t],
-                )
         if return_path:
             return combined_ms_filepath
         else:
@@ -272,79 +557,26 @@ class Visibility(KaraboResource):
         combined_ms_filepath: Optional[str] = None,
         return_path: bool = False,
     ) -> Optional[str]:
+        """
+        Sums the visibilities of simulations of different parts (chunks) of the
+        same sky and observation, and writes them as one measurement set.
+
+        :param visibility_files: .vis files of the sky chunks
+        :param combined_ms_filepath: path of the measurement set to write, a
+            temporary one is created if None
+        :param return_path: whether to return the path of the measurement set
+        """
         print(f"Combining {len(visibility_files)} visibilities...")
         if combined_ms_filepath is None:
             fh = FileHandle(suffix=".MS")
             combined_ms_filepath = fh.path
 
-        # Initialize lists to store data
-        out_vis, uui, vvi, wwi, time_start, time_inc, time_ave = ([] for _ in range(7))
-
-        # Loop over visibility files and read data
-        for vis_file in visibility_files:
-            (header, handle) = oskar.VisHeader.read(vis_file)
-            block = oskar.VisBlock.create_from_header(header)
-            for k in range(header.num_blocks):
-                block.read(header, handle, k)
-            out_vis.append(block.cross_correlations())
-            uui.append(block.baseline_uu_metres())
-            vvi.append(block.baseline_vv_metres())
-            wwi.append(block.baseline_ww_metres())
-            time_inc.append(header.time_inc_sec)
-            time_start.append(header.time_start_mjd_utc)
-            time_ave.append(header.get_time_average_sec())
-
-        # Combine visibility data
-        combined_vis = np.sum(out_vis, axis=0)
-        combined_uu = np.mean(uui, axis=0)
-        combined_vv = np.mean(vvi, axis=0)
-        combined_ww = np.mean(wwi, axis=0)
-        combined_time_start = np.min(time_start)
-        combined_time_inc = np.min(time_inc)
-        combined_time_ave = np.mean(time_ave)
-
-        print(f"Num channels: {block.num_channels}")
-        # Create a new measurement set
-        ms = oskar.MeasurementSet.create(
-            combined_ms_filepath,
-            block.num_stations,
-            block.num_channels,
-            block.num_pols,
-            header.freq_start_hz,
-            header.freq_inc_hz,
-        )
-        deg2rad = np.pi / 180
-        ms.set_phase_centre(
-            header.phase_centre_ra_deg * deg2rad, header.phase_centre_dec_deg * deg2rad
-        )
+        combined = VisibilityData.read(visibility_files[0])
+        for vis_file in visibility_files[1:]:
+            combined = VisibilityData.sum([combined, VisibilityData.read(vis_file)])
 
-        # Write combined visibility data
         print("### Writing combined visibilities in ", combined_ms_filepath)
-
-        num_files = len(visibility_files)
-        for j in range(num_files):
-            num_times = out_vis[j].shape[0]
-            for t in range(num_times):
-                time_stamp = combined_time_inc * combined_time_start
-                exposure_sec = combined_time_ave
-                start_row = t * block.num_baselines
-                ms.write_coords(
-                    start_row,
-                    block.num_baselines,
-                    combined_uu[t],
-                    combined_vv[t],
-                    combined_ww[t],
-                    exposure_sec,
-                    combined_time_ave,
-                    time_stamp,
-                )
-                ms.write_vis(
-                    start_row,
-                    0,
-                    block.num_channels,
-                    block.num_baselines,
-                    combined_vis[t],
-                )
+        combined.write_ms(combined_ms_filepath)
 
         if return_path:
             return combined_ms_filepath
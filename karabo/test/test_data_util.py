@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 
 import numpy as np
@@ -7,6 +9,7 @@ from karabo.data.external_data import GLEAMSurveyDownloadObject
 from karabo.util.data_util import (
     calculate_chunk_size_from_max_chunk_size_in_memory,
     parse_size,
+    read_CSV_to_ndarray,
 )
 
 
@@ -100,3 +103,19 @@ class TestCalculateChunkSize(unittest.TestCase):
             max_chunk_memory_size, data_array
         )
         self.assertEqual(expected_chunk_size, calculated_chunk_size)
+
+
+class TestReadCSV(unittest.TestCase):
+    def test_read_CSV_to_ndarray(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "catalog.csv")
+            with open(path, "w") as f:
+                f.write("# Gaussian list\n# Gaus_id, S_Code, RA\n\n")
+                f.write("0, S, 1.5, nan\n1, M, 0.1, 2e3\n")
+            sources = read_CSV_to_ndarray(path)
+            # the text column is skipped
+            np.testing.assert_array_equal(sources, [[0, 1.5, np.nan], [1, 0.1, 2e3]])
+
+            with open(path, "w") as f:
+                f.write("1,a,2\n3,,4\n")
+            np.testing.assert_array_equal(read_CSV_to_ndarray(path), [[1, 2], [3, 4]])
@@ -6,7 +6,10 @@ import numpy as np
 
 from karabo.imaging.imager import Imager
 from karabo.simulation.beam import BeamPattern
-from karabo.simulation.interferometer import InterferometerSimulation
+from karabo.simulation.interferometer import (
+    InterferometerSimulation,
+    _lst_buckets_of_days,
+)
 from karabo.simulation.observation import ObservationLong
 from karabo.simulation.sky_model import SkyModel
 from karabo.simulation.telescope import Telescope
@@ -121,6 +124,7 @@ class TestOskarLongObservation(unittest.TestCase):
             sky=sky,
             observation=observation_long,
         )
+        assert os.path.exists(combined_ms_filepath)
 
         # visibility.write_to_file("/home/rohit/karabo/karabo-pipeline/karabo/test/result/beam/beam_vis.ms")
         # ---------- Combine the Visibilties --------------
@@ -135,3 +139,35 @@ class TestOskarLongObservation(unittest.TestCase):
         imager.get_dirty_image()
         # dirty.write_to_file("./test/result/beam/beam_vis.fits",overwrite=True)
         # dirty.plot(colobar_label="Flux Density (Jy)", filename="combine_vis.png")
+
+    def test_long_observations_reusing_days(self):
+        # one day drifts by about 236s in LST, so all days share one simulation
+        assert list(_lst_buckets_of_days(3, 3600)) == [0, 0, 0]
+        assert list(_lst_buckets_of_days(3, 236)) == [0, 1, 2]
+
+        telescope = Telescope.get_MEERKAT_Telescope()
+        sky = SkyModel(np.array([[20.0, -30.0, 1, 0, 0, 0, 1.0e9, -0.7, 0, 0, 0, 0]]))
+        observation_long = ObservationLong(
+            phase_centre_ra_deg=20.0,
+            phase_centre_dec_deg=-30.0,
+            start_date_and_time=datetime(2000, 1, 1, 11, 00, 00),
+            length=timedelta(hours=1),
+            number_of_time_steps=4,
+            start_frequency_hz=1.0e9,
+            frequency_increment_hz=1e6,
+            number_of_channels=2,
+            number_of_days=3,
+        )
+        vis_path = "./karabo/test/data"
+        simulation = InterferometerSimulation(
+            ms_file_path=os.path.join("result", "reused_days_vis.ms"),
+            noise_enable=True,
+            noise_seed=1,
+            noise_rms_start=0.1,
+            noise_rms_end=1,
+            beam_polX=BeamPattern(os.path.join(vis_path, "cst_like_beam_port_1.txt")),
+            beam_polY=BeamPattern(os.path.join(vis_path, "cst_like_beam_port_2.txt")),
+            reuse_days_lst_tolerance_sec=3600,
+        )
+        visibility = simulation.run_simulation(telescope, sky, observation_long)
+        assert os.path.exists(visibility.ms_file.path)
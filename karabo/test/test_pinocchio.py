@@ -2,6 +2,8 @@ import datetime
 import os
 import unittest
 
+import numpy as np
+
 from karabo.imaging.imager import Imager
 from karabo.simulation.interferometer import InterferometerSimulation
 from karabo.simulation.observation import Observation
@@ -56,3 +58,45 @@ class TestPinocchio(unittest.TestCase):
         dirty = imager.get_dirty_image()
         dirty.write_to_file(f"{TestPinocchio.RESULT_FOLDER}/dirty.fits", overwrite=True)
         dirty.plot("pinocchio sim dirty plot")
+
+    def testSkyModelFromLightCone(self) -> None:
+        halos = np.zeros((4, Pinocchio.PLC_COLS))
+        halos[:, Pinocchio.PLC_ID_IDX] = np.arange(4)
+        halos[:, Pinocchio.PLC_TRUE_REDSHIFT_IDX] = [0.01, 0.02, 0.03, 0.04]
+        # radial distances 5, 20, 50 and 200 Mpc/h
+        halos[:, Pinocchio.PLC_X_IDX : Pinocchio.PLC_Z_IDX + 1] = [
+            [5, 0, 0],
+            [0, -20, 0],
+            [0, 0, 50],
+            [200, 0, 0],
+        ]
+        halos[:, Pinocchio.PLC_MASS_IDX] = [1e13, 2e13, 3e13, 4e13]
+        halos[:, Pinocchio.PLC_OBS_REDSHIFT_IDX] = [0.011, 0.021, 0.031, 0.041]
+        textPath = os.path.join(TestPinocchio.RESULT_FOLDER, "test.plc.out")
+        np.savetxt(textPath, halos, header="1) group ID")
+        records = np.zeros(4, dtype=Pinocchio.PLC_BINARY_DTYPE)
+        records["recordStart"] = Pinocchio.PLC_BINARY_DTYPE.itemsize - 8
+        records["recordEnd"] = Pinocchio.PLC_BINARY_DTYPE.itemsize - 8
+        records["id"] = halos[:, Pinocchio.PLC_ID_IDX]
+        records["truez"] = halos[:, Pinocchio.PLC_TRUE_REDSHIFT_IDX]
+        records["pos"] = halos[:, Pinocchio.PLC_X_IDX : Pinocchio.PLC_Z_IDX + 1]
+        records["mass"] = halos[:, Pinocchio.PLC_MASS_IDX]
+        records["obsz"] = halos[:, Pinocchio.PLC_OBS_REDSHIFT_IDX]
+        binaryPath = os.path.join(TestPinocchio.RESULT_FOLDER, "test.plc.bin")
+        records.tofile(binaryPath)
+
+        for path in (textPath, binaryPath):
+            sky = Pinocchio.getSkyModelFromFiles(path, near=10, far=100, chunksize=1)
+            assert sky.sources.data.numblocks[0] == 2
+            assert sky.sources.shape[1] == Pinocchio.PIN_COLS
+            np.testing.assert_allclose(sky[:, 0], [270, 0])
+            np.testing.assert_allclose(sky[:, 1], [0, 90])
+            np.testing.assert_allclose(
+                sky[:, Pinocchio.PIN_TRUE_REDSHIFT_IDX], [0.02, 0.03]
+            )
+            np.testing.assert_allclose(
+                sky[:, Pinocchio.PIN_OBS_REDSHIFT_IDX], [0.021, 0.031]
+            )
+            np.testing.assert_allclose(sky[:, Pinocchio.PIN_MASS_IDX], [2e13, 3e13])
+            sky = Pinocchio.getSkyModelFromFiles(path, near=0, far=1000)
+            assert sky.num_sources == 4
@@ -1,12 +1,16 @@
 import os
 import unittest
+from datetime import datetime, timedelta
 
 import numpy as np
 
+from karabo.error import KaraboError
 from karabo.simulation.interferometer import InterferometerSimulation
 from karabo.simulation.observation import Observation
 from karabo.simulation.sky_model import SkyModel
 from karabo.simulation.telescope import Telescope
+from karabo.simulation.visibility import VisibilityData
+from karabo.util.dask import DaskHandler
 
 
 class TestSimulation(unittest.TestCase):
@@ -47,6 +51,77 @@ class TestSimulation(unittest.TestCase):
 
         simulation.run_simulation(telescope, sky, observation)
 
+    def test_prune_sky_by_beam(self):
+        sky = SkyModel(
+            np.array(
+                [
+                    [240.0, -70.0, 1e-3, 0, 0, 0, 100e6, 0, 0, 0, 0, 0],
+                    [240.0, -72.0, 1.0, 0, 0, 0, 100e6, 0, 0, 0, 0, 0],
+                    [240.0, -80.0, 1.0, 0, 0, 0, 100e6, 0, 0, 0, 0, 0],
+                    [240.0, -80.0, 1e6, 0, 0, 0, 100e6, 0, 0, 0, 0, 0],
+                ]
+            )
+        )
+        simulation = InterferometerSimulation(
+            use_gpus=False,
+            use_dask=False,
+            station_type="Gaussian beam",
+            gauss_beam_fwhm_deg=5,
+            gauss_ref_freq_hz=100e6,
+        )
+        observation = Observation(
+            start_frequency_hz=100e6,
+            phase_centre_ra_deg=240,
+            phase_centre_dec_deg=-70,
+            frequency_increment_hz=20e6,
+            number_of_channels=4,
+        )
+        pruned = simulation.prune_sky_by_beam(sky, observation, threshold_jy=1e-4)
+        # the source at 10 deg offset is attenuated by ~2^-32 unless it's bright
+        assert np.array_equal(pruned.to_np_array(), sky.to_np_array()[[0, 1, 3]])
+
+        simulation.station_type = "Isotropic beam"
+        unpruned = simulation.prune_sky_by_beam(sky, observation, threshold_jy=1e-4)
+        assert unpruned.num_sources == sky.num_sources
+
+    def test_simulation_of_sky_chunks(self):
+        sky = SkyModel.get_random_poisson_disk_sky(
+            (15, -35), (25, -25), 1, 2, 1, seed=1
+        )
+        telescope = Telescope.get_OSKAR_Example_Telescope()
+        observation = Observation(
+            start_frequency_hz=100e6,
+            phase_centre_ra_deg=20,
+            phase_centre_dec_deg=-30,
+            number_of_time_steps=4,
+            frequency_increment_hz=1e6,
+            number_of_channels=2,
+        )
+        full_vis = InterferometerSimulation(
+            channel_bandwidth_hz=1e6, use_dask=False
+        ).run_simulation(telescope, sky, observation)
+        expected = VisibilityData.read(full_vis.file.path)
+
+        # visibilities are linear in the sky
+        n_half = sky.num_sources // 2
+        chunk_vis = [
+            VisibilityData.read(
+                InterferometerSimulation(channel_bandwidth_hz=1e6, use_dask=False)
+                .run_simulation(telescope, SkyModel(sources), observation)
+                .file.path
+            )
+            for sources in (sky.sources[:n_half], sky.sources[n_half:])
+        ]
+        summed = VisibilityData.sum(chunk_vis)
+        assert np.allclose(summed.vis, expected.vis, atol=1e-5)
+
+        chunked_sky = SkyModel(sky.sources.chunk({"dim_0": n_half // 2 + 1}))
+        simulation = InterferometerSimulation(
+            channel_bandwidth_hz=1e6, client=DaskHandler.get_dask_client()
+        )
+        vis = simulation.run_simulation(telescope, chunked_sky, observation)
+        assert os.path.exists(vis.ms_file.path)
+
     def test_create_observations_oskar_settings_tree(self):
         CHANNEL_BANDWIDTH_HZ = 1e6
         NUM_SPLITS = 5
@@ -54,6 +129,7 @@ class TestSimulation(unittest.TestCase):
         observation = Observation(
             start_frequency_hz=100e6,
             number_of_channels=NUM_CHANNELS,
+            frequency_increment_hz=CHANNEL_BANDWIDTH_HZ,
         )
         observations = Observation.extract_multiple_observations_from_settings(
             observation.get_OSKAR_settings_tree(),
@@ -65,12 +141,100 @@ class TestSimulation(unittest.TestCase):
             observation = observation["observation"]
             assert (
                 float(observation["start_frequency_hz"])
-                == 100e6 + i * CHANNEL_BANDWIDTH_HZ * NUM_CHANNELS / NUM_SPLITS + i * 1
+                == 100e6 + i * CHANNEL_BANDWIDTH_HZ * NUM_CHANNELS / NUM_SPLITS
             )
             assert float(observation["num_channels"]) == 2
 
         assert len(observations) == NUM_SPLITS
 
+        # uneven splits are balanced and contiguous
+        settings = Observation(
+            start_frequency_hz=100e6,
+            number_of_channels=NUM_CHANNELS,
+            frequency_increment_hz=CHANNEL_BANDWIDTH_HZ,
+        ).get_OSKAR_settings_tree()
+        observations = Observation.extract_multiple_observations_from_settings(
+            settings, 4, CHANNEL_BANDWIDTH_HZ
+        )
+        num_channels = [int(obs["observation"]["num_channels"]) for obs in observations]
+        start_frequencies = [
+            float(obs["observation"]["start_frequency_hz"]) for obs in observations
+        ]
+        assert num_channels == [3, 3, 2, 2]
+        assert start_frequencies == [100e6, 103e6, 106e6, 108e6]
+
+        # there are never more splits than channels
+        observations = Observation.extract_multiple_observations_from_settings(
+            settings, 2 * NUM_CHANNELS, CHANNEL_BANDWIDTH_HZ
+        )
+        assert len(observations) == NUM_CHANNELS
+        assert all(int(obs["observation"]["num_channels"]) == 1 for obs in observations)
+
+        with self.assertRaises(KaraboError):
+            Observation.extract_multiple_observations_from_settings(
+                settings, 0, CHANNEL_BANDWIDTH_HZ
+            )
+
+    def test_split_observation_by_time(self):
+        start = datetime(2000, 1, 1, 11, 0, 0)
+        observation = Observation(
+            start_frequency_hz=100e6,
+            start_date_and_time=start,
+            length=timedelta(hours=1),
+            number_of_time_steps=10,
+        )
+        windows = observation.split_by_time(4)
+        assert [w.number_of_time_steps for w in windows] == [3, 3, 2, 2]
+        assert [w.start_date_and_time - start for w in windows] == [
+            timedelta(minutes=m) for m in (0, 18, 36, 48)
+        ]
+        assert sum((w.length for w in windows), timedelta()) == observation.length
+        assert observation.number_of_time_steps == 10
+
+        assert len(observation.split_by_time(20)) == 10
+        with self.assertRaises(KaraboError):
+            observation.split_by_time(0)
+
+    def test_parallelization_by_time(self):
+        sky = SkyModel.get_random_poisson_disk_sky(
+            (15, -35), (25, -25), 1, 2, 1, seed=1
+        )
+        telescope = Telescope.get_OSKAR_Example_Telescope()
+        observation = Observation(
+            start_frequency_hz=100e6,
+            phase_centre_ra_deg=20,
+            phase_centre_dec_deg=-30,
+            number_of_time_steps=5,
+            frequency_increment_hz=1e6,
+            number_of_channels=2,
+        )
+        simulation = InterferometerSimulation(
+            channel_bandwidth_hz=1e6,
+            client=DaskHandler.get_dask_client(),
+            split_observation_by_time=True,
+            n_split_time_windows=2,
+        )
+        vis = simulation.run_simulation(telescope, sky, observation)
+        assert os.path.exists(vis.ms_file.path)
+
     def test_parallelization_by_channel(self):
-        # TODO: Do this test
-        pass
+        sky = SkyModel.get_random_poisson_disk_sky(
+            (15, -35), (25, -25), 1, 2, 1, seed=1
+        )
+        telescope = Telescope.get_OSKAR_Example_Telescope()
+        observation = Observation(
+            start_frequency_hz=100e6,
+            phase_centre_ra_deg=20,
+            phase_centre_dec_deg=-30,
+            number_of_time_steps=4,
+            frequency_increment_hz=1e6,
+            number_of_channels=5,
+        )
+        simulation = InterferometerSimulation(
+            channel_bandwidth_hz=1e6,
+            client=DaskHandler.get_dask_client(),
+            split_observation_by_channels=True,
+            n_split_channels=2,
+        )
+        vis = simulation.run_simulation(telescope, sky, observation)
+        assert os.path.exists(vis.ms_file.path)
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from karabo.data.external_data import KaraboCache
+from karabo.data.sky_cache import SkyCache
+
+
+class TestSkyCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.base_path = KaraboCache.base_path
+        KaraboCache.base_path = self.tmp_dir.name
+        os.makedirs(KaraboCache.get_cache_directory())
+
+    def tearDown(self) -> None:
+        KaraboCache.base_path = self.base_path
+        self.tmp_dir.cleanup()
+
+    def test_store_and_load(self):
+        survey_path = os.path.join(self.tmp_dir.name, "survey.txt")
+        with open(survey_path, "w") as f:
+            f.write("survey v1")
+        key = SkyCache.get_key(survey_path, {"frequencies": (76, 84)})
+        assert key == SkyCache.get_key(survey_path, {"frequencies": (76, 84)})
+        assert key != SkyCache.get_key(survey_path, {"frequencies": (76,)})
+        assert SkyCache.load(key) is None
+
+        sources = np.random.rand(100, 12)
+        source_ids = np.arange(100) % 10
+        categories = np.array([f"source{i}" for i in range(10)], dtype=object)
+        SkyCache.store(key, sources, source_ids, categories)
+        cached = SkyCache.load(key)
+        assert cached is not None
+        cached_sources, cached_ids, cached_categories = cached
+        assert isinstance(cached_sources, np.memmap)
+        assert not cached_sources.flags.writeable
+        assert np.array_equal(cached_sources, sources)
+        assert np.array_equal(cached_ids, source_ids)
+        assert np.array_equal(cached_categories, categories.astype(str))
+
+        # a modified survey file must not hit the old entry
+        with open(survey_path, "w") as f:
+            f.write("survey v2, modified")
+        assert SkyCache.get_key(survey_path, {"frequencies": (76, 84)}) != key
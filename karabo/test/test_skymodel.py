@@ -1,10 +1,14 @@
 import os
 import unittest
 
+import h5py
 import numpy as np
+import pandas as pd
 import xarray as xr
+from astropy.table import Table
 from dask.array import from_array
 from dask.array.core import Array
+from scipy.spatial import cKDTree
 
 from karabo.data.external_data import (
     BATTYESurveyDownloadObject,
@@ -12,8 +16,12 @@ from karabo.data.external_data import (
     GLEAMSurveyDownloadObject,
     MIGHTEESurveyDownloadObject,
 )
-from karabo.simulation.sky_model import Polarisation, SkyModel
+from karabo.error import KaraboSkyModelError
+from karabo.simulation.sky_builder import SkyModelBuilder
+from karabo.simulation.sky_cube import SkyCube
+from karabo.simulation.sky_model import Polarisation, SkyModel, SkyPrefixMapping
 from karabo.test import data_path
+from karabo.util.math_util import poisson_disc_samples
 
 
 class TestSkyModel(unittest.TestCase):
@@ -99,10 +107,92 @@ class TestSkyModel(unittest.TestCase):
         sky = SkyModel(source_array)
         sky.explore_sky([250, -80])
 
+    def test_read_healpix_map_slice(self):
+        nside = 32
+        healpix_cube = np.random.rand(2, 4, 12 * nside**2)
+        path = os.path.join("result", "healpix_cube.h5")
+        with h5py.File(path, "w") as f:
+            f.create_dataset("map", data=healpix_cube)
+        source_array, nside_read = SkyModel.read_healpix_file_to_sky_model_array(
+            path, 1, Polarisation.STOKES_U
+        )
+        assert nside_read == nside
+        assert np.array_equal(source_array[:, 2], healpix_cube[1, 2])
+        source_array, nside_read = SkyModel.read_healpix_file_to_sky_model_array(
+            path,
+            0,
+            Polarisation.STOKES_I,
+            nside_out=8,
+            ra0_deg=20,
+            dec0_deg=-30,
+            radius_deg=20,
+        )
+        assert nside_read == 8
+        assert 0 < source_array.shape[0] < 12 * 8**2
+        full_array, _ = SkyModel.read_healpix_file_to_sky_model_array(
+            path, 0, Polarisation.STOKES_I, nside_out=8
+        )
+        assert np.isclose(full_array[:, 2].sum(), healpix_cube[0, 0].sum())
+
     def test_get_poisson_sky(self):
         sky = SkyModel.get_random_poisson_disk_sky((220, -60), (260, -80), 0.1, 0.8, 2)
         sky.explore_sky([240, -70])
 
+    def test_poisson_disc_samples(self):
+        samples = poisson_disc_samples(50, 30, 1.5, seed=42)
+        assert np.all((samples >= 0) & (samples < [50, 30]))
+        assert len(cKDTree(samples).query_pairs(1.5)) == 0
+        # a maximal sampling leaves no gaps of twice the radius
+        distances, _ = cKDTree(samples).query(np.random.rand(1000, 2) * [50, 30])
+        assert np.all(distances < 3)
+        assert np.array_equal(samples, poisson_disc_samples(50, 30, 1.5, seed=42))
+        manhattan = poisson_disc_samples(50, 30, 1.5, ord=1, seed=1)
+        assert len(cKDTree(manhattan).query_pairs(1.5, p=1)) == 0
+
+        sky = SkyModel.get_random_poisson_disk_sky(
+            (220, -60), (260, -80), 0.1, 0.8, 2, seed=3
+        )
+        same_sky = SkyModel.get_random_poisson_disk_sky(
+            (220, -60), (260, -80), 0.1, 0.8, 2, seed=3
+        )
+        assert np.array_equal(sky.to_np_array(), same_sky.to_np_array())
+
+    def test_random_power_law_sky(self):
+        sky = SkyModel.get_random_power_law_sky(
+            100_000,
+            (-5, -40),
+            (5, -20),
+            flux_min=0.01,
+            flux_max=10,
+            flux_index=-1.7,
+            chunksize=30_000,
+            seed=7,
+        )
+        assert isinstance(sky.sources.data, Array)
+        assert sky.sources.data.numblocks[0] == 4
+        assert sky.num_sources == 100_000
+        sources = sky.to_np_array()
+        assert np.all((sources[:, 0] >= -5) & (sources[:, 0] <= 5))
+        assert np.all((sources[:, 1] >= -40) & (sources[:, 1] <= -20))
+        assert np.all((sources[:, 2] >= 0.01) & (sources[:, 2] <= 10))
+        assert np.all(sources[:, 6] == 100e6)
+        # median of dN/dS ~ S**-1.7 in [0.01, 10]
+        median = (0.5 * (0.01**-0.7 + 10**-0.7)) ** (1 / -0.7)
+        assert np.isclose(np.median(sources[:, 2]), median, rtol=0.02)
+
+        same_sky = SkyModel.get_random_power_law_sky(
+            100_000, (-5, -40), (5, -20), 0.01, 10, -1.7, chunksize=30_000, seed=7
+        )
+        assert np.array_equal(sources, same_sky.to_np_array())
+        # each chunk only depends on the seed and its index
+        assert np.array_equal(sources[90_000:], same_sky.sources[90_000:].to_numpy())
+        other_sky = SkyModel.get_random_power_law_sky(
+            100_000, (-5, -40), (5, -20), 0.01, 10, -1.7, chunksize=30_000, seed=8
+        )
+        assert not np.array_equal(sources, other_sky.to_np_array())
+        with self.assertRaises(KaraboSkyModelError):
+            SkyModel.get_random_power_law_sky(10, flux_min=0)
+
     def test_cscs_resource_availability(self):
         gleam = GLEAMSurveyDownloadObject()
         assert gleam.is_available()
@@ -157,3 +247,412 @@ class TestSkyModel(unittest.TestCase):
         assert isinstance(sky.sources.data, np.ndarray)
         assert sky.sources.data.shape == (5, 13)
         assert np.all(sky.sources.data == sources)
+
+    def test_spatial_index(self):
+        rng = np.random.default_rng(42)
+        sky_data = np.zeros((10000, 12))
+        sky_data[:, 0] = rng.uniform(0, 360, 10000)
+        sky_data[:, 1] = np.degrees(np.arcsin(rng.uniform(-1, 1, 10000)))
+        sky_data[:, 2] = 1
+        sky = SkyModel(sky_data)
+        _, idxs = sky.filter_by_radius(2, 15, 359, -60, indices=True)
+        _, idxs_flat = sky.filter_by_radius_euclidean_flat_approximation(
+            2, 15, 10, -60, indices=True
+        )
+        sky.build_spatial_index(nside=16)
+        assert sky.spatial_index is not None
+        filtered_sky, idxs_index = sky.filter_by_radius(2, 15, 359, -60, indices=True)
+        _, idxs_flat_index = sky.filter_by_radius_euclidean_flat_approximation(
+            2, 15, 10, -60, indices=True
+        )
+        assert len(idxs) > 0
+        assert np.array_equal(idxs, idxs_index)
+        assert np.array_equal(idxs_flat, idxs_flat_index)
+        assert filtered_sky.num_sources == len(idxs)
+        assert filtered_sky.spatial_index is None
+        # modifying the sources drops the index
+        sky[0, 0] = 1.0
+        assert sky.spatial_index is None
+
+    def test_query(self):
+        rng = np.random.default_rng(7)
+        sky_data = np.zeros((5000, 12))
+        sky_data[:, 0] = rng.uniform(0, 360, 5000)
+        sky_data[:, 1] = np.degrees(np.arcsin(rng.uniform(-1, 1, 5000)))
+        sky_data[:, 2] = rng.uniform(0, 2, 5000)
+        sky_data[:, 6] = rng.choice([100e6, 150e6, 200e6], 5000)
+        sky = SkyModel(xr.DataArray(sky_data).chunk({"dim_0": 1000}))
+        chained = (
+            sky.filter_by_radius(0, 40, 20, -30)
+            .filter_by_flux(0.5, 1.5)
+            .filter_by_frequency(120e6, 220e6)
+        )
+        query = sky.query().radius(0, 40, 20, -30).flux(0.5, 1.5)
+        query = query.frequency(120e6, 220e6)
+        queried = query.collect()
+        assert queried.num_sources > 0
+        assert isinstance(queried.sources.data, Array)
+        assert queried.sources.chunks[0] == (queried.num_sources,)
+        assert np.array_equal(queried.to_np_array(), chained.to_np_array())
+        # the masks stay lazy, only `indices` computes the fused mask
+        flat_query = sky.query().radius(0, 40, 20, -30, flat_approximation=True)
+        for mask_func in query._masks + flat_query._masks:
+            assert isinstance(mask_func(lambda col_idx: sky[:, col_idx]).data, Array)
+        idxs = query.indices()
+        sky.build_spatial_index(nside=16)
+        assert np.array_equal(idxs, query.indices())
+        assert sky.query().indices().shape[0] == sky.num_sources
+
+    def test_fingerprint(self):
+        n_sources = 150_000  # more than `SkyModel.FINGERPRINT_BLOCK_ROWS`
+        sky = SkyModel.get_random_power_law_sky(n_sources, chunksize=40_000, seed=1)
+        fingerprint = sky.fingerprint
+        assert sky.fingerprint == fingerprint
+        sources = sky.to_np_array()
+        # independent of the backing array and its chunks
+        assert SkyModel(sources).fingerprint == fingerprint
+        rechunked = SkyModel(sky.sources.chunk({"dim_0": 77_777}))
+        assert rechunked.fingerprint == fingerprint
+
+        sky.compute()
+        sky[0, 2] = 5.0
+        assert sky.fingerprint != fingerprint
+        sky.sources = sources
+        assert sky.fingerprint == fingerprint
+        sky.source_ids = [f"source{i}" for i in range(n_sources)]
+        with_ids = sky.fingerprint
+        assert with_ids != fingerprint
+        sky.source_ids = [f"other{i}" for i in range(n_sources)]
+        assert sky.fingerprint not in (fingerprint, with_ids)
+        assert SkyModel(sources, precision=np.float32).fingerprint != fingerprint
+
+    def test_write_read_sky_csv(self):
+        sky = SkyModel.get_random_power_law_sky(1000, chunksize=300, seed=1)
+        path = os.path.join("result", "random_sky.csv")
+        sky.write_to_file(path)
+        read_sky = SkyModel.read_from_file(path)
+        assert read_sky.sources.dtype == np.float64
+        np.testing.assert_allclose(read_sky.to_np_array(), sky.to_np_array())
+        assert np.array_equal(
+            read_sky.source_ids["dim_0"].to_numpy(), np.arange(1000).astype(str)
+        )
+
+        sky_data = np.zeros((4, 13), dtype=object)
+        sky_data[:, :3] = 1.0
+        sky_data[:, 12] = ["a", "b", "a", "c"]
+        SkyModel(sky_data).save_sky_model_as_csv(path)
+        read_sky = SkyModel.read_from_file(path)
+        assert list(read_sky.source_ids["dim_0"].to_numpy()) == ["a", "b", "a", "c"]
+
+        with open(path, "w") as f:
+            f.write("ra,dec,i\n1,2,3\n")
+        read_sky = SkyModel.read_from_file(path)
+        assert read_sky.source_ids is None
+        assert np.array_equal(read_sky.to_np_array(), [[1, 2, 3] + [0] * 9])
+
+    def test_write_read_sky_catalog(self):
+        rng = np.random.default_rng(3)
+        sky_data = np.zeros((20000, 13), dtype=object)
+        sky_data[:, 0] = rng.uniform(0, 360, 20000)
+        sky_data[:, 1] = np.degrees(np.arcsin(rng.uniform(-1, 1, 20000)))
+        sky_data[:, 2] = rng.uniform(0, 2, 20000)
+        sky_data[:, 6] = 100e6
+        sky_data[:, 12] = [f"source{i}" for i in range(20000)]
+        sky = SkyModel(sky_data)
+        path = os.path.join("result", "sky_catalog.h5")
+        sky.write_to_file(path, row_group_size=500)
+        full_sky = SkyModel.read_from_file(path)
+        assert full_sky.num_sources == sky.num_sources
+        assert set(full_sky.to_np_array(with_obj_ids=True)[:, 12]) == set(
+            sky_data[:, 12]
+        )
+        filtered = SkyModel.read_from_file(
+            path, ra0_deg=1, dec0_deg=-30, outer_radius_deg=5, min_flux_jy=0.5
+        )
+        expected = sky.filter_by_radius(0, 5, 1, -30).filter_by_flux(0.5, np.inf)
+        assert filtered.num_sources > 0
+        assert np.array_equal(
+            np.sort(filtered.to_np_array(with_obj_ids=True)[:, 12]),
+            np.sort(expected.to_np_array(with_obj_ids=True)[:, 12]),
+        )
+        assert (
+            SkyModel.read_from_file(path, min_freq=110e6, max_freq=120e6).num_sources
+            == 0
+        )
+
+    def test_get_cartesian_sky(self):
+        sky_data = np.array([[0.0, 0.0, 1], [90.0, 0.0, 1], [45.0, 90.0, 1]])
+        expected = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+        cartesian_sky = SkyModel(sky_data).get_cartesian_sky()
+        assert np.allclose(cartesian_sky, expected)
+        sky = SkyModel(xr.DataArray(sky_data).chunk({"dim_0": 2}))
+        out = np.empty((3, 3), dtype=np.float32)
+        cartesian_sky = sky.get_cartesian_sky(out=out)
+        assert cartesian_sky is out
+        assert np.allclose(out, expected, atol=1e-7)
+
+    def test_flux_index(self):
+        rng = np.random.default_rng(1)
+        sources = np.zeros((1000, 12))
+        sources[:, 2] = rng.lognormal(size=1000)
+        sources[::100, 2] = np.nan
+        sky = SkyModel(sources)
+        expected = sky.filter_by_flux(0.5, 2).to_np_array()
+        expected_brightest = sky.get_brightest_sources(10).to_np_array()
+        flux = sources[:, 2][~np.isnan(sources[:, 2])]
+        assert np.array_equal(expected_brightest[:, 2], np.sort(flux)[::-1][:10])
+
+        sky.build_flux_index()
+        assert sky.flux_index is not None
+        assert np.array_equal(sky.filter_by_flux(0.5, 2).to_np_array(), expected)
+        assert np.array_equal(
+            sky.get_brightest_sources(10).to_np_array(), expected_brightest
+        )
+        assert sky.get_brightest_sources(2000).num_sources == 990
+        assert sky.get_brightest_sources(0).num_sources == 0
+        _, idxs = sky.query().flux(0.5, 2).radius(0, 180, 0, 0).collect_with_indices()
+        assert np.array_equal(idxs, sky.query().flux(0.5, 2).indices())
+        sky[0, 2] = 100.0
+        assert sky.flux_index is None
+
+    def test_compress(self):
+        rng = np.random.default_rng(2)
+        n_faint = 2000
+        sources = np.zeros((n_faint + 3, 12))
+        sources[:n_faint, 0] = rng.uniform(20, 20.5, n_faint)
+        sources[:n_faint, 1] = rng.uniform(-30.5, -30, n_faint)
+        sources[:n_faint, 2] = rng.uniform(0, 1e-4, n_faint)
+        sources[n_faint:, :3] = [[20.1, -30.1, 10], [20.2, -30.2, 5], [20.3, -30.3, 1]]
+        sources[n_faint - 1, 9:11] = 1  # extended sources are never merged
+        sources[:, 6] = 100e6
+        sky = SkyModel(sources)
+        sky.source_ids = [f"source{i}" for i in range(sky.num_sources)]
+        psf_fwhm_deg = 0.2
+        compressed, report = sky.compress(psf_fwhm_deg=psf_fwhm_deg)
+        assert report.num_sources_before == sky.num_sources
+        assert report.num_sources_after == compressed.num_sources
+        assert 0 < report.num_removed_sources < n_faint
+        assert report.max_position_error_deg <= 0.1 * psf_fwhm_deg
+        assert report.merged_flux_fraction <= 0.01
+        assert np.isclose(compressed[:, 2].sum(), sources[:, 2].sum())
+        compressed_ids = compressed.source_ids["dim_0"].to_numpy()
+        for idx in range(n_faint - 1, n_faint + 3):
+            assert f"source{idx}" in compressed_ids
+        assert compressed_ids[-1] == f"compressed_{report.num_components - 1}"
+
+        uncompressed, report = sky.compress(psf_fwhm_deg, max_flux_fraction=0)
+        assert report.num_removed_sources == 0
+        assert np.array_equal(uncompressed.to_np_array(), sky.to_np_array())
+
+    def test_flux_at(self):
+        sources = np.zeros((3, 12))
+        sources[:, 2:6] = [[1, 0.5, 0, 0.1], [2, 0, 0.4, 0], [3, 1, 1, 1]]
+        sources[:, 6] = [100e6, 100e6, 0]
+        sources[:, 7] = [-0.7, 0, -0.7]
+        sources[:, 8] = [0, 10, 10]
+        sky = SkyModel(sources)
+        frequencies = np.array([100e6, 150e6, 200e6])
+        fluxes = sky.flux_at(frequencies)
+        assert fluxes.shape == (3, 3, 4)
+        assert np.allclose(fluxes[0, :, 0], (frequencies / 100e6) ** -0.7)
+        assert np.allclose(fluxes[0, :, 1], 0.5 * (frequencies / 100e6) ** -0.7)
+        # rotation measure only rotates Q/U and keeps the polarised intensity
+        wavelengths = 299792458.0 / np.append(frequencies, 100e6)
+        angle = 2 * 10 * (wavelengths[:-1] ** 2 - wavelengths[-1] ** 2)
+        assert np.allclose(fluxes[1, :, 0], 2)
+        assert np.allclose(np.hypot(fluxes[1, :, 1], fluxes[1, :, 2]), 0.4)
+        assert np.allclose(fluxes[1, :, 1], -0.4 * np.sin(angle))
+        # no reference frequency, no scaling
+        assert np.allclose(fluxes[2], [[3, 1, 1, 1]] * 3)
+        assert sky.flux_at(frequencies) is fluxes
+        assert not fluxes.flags.writeable
+
+        sky_dask = SkyModel(xr.DataArray(from_array(sources, chunks=(2, 12))))
+        fluxes_32 = sky_dask.flux_at(frequencies, dtype=np.float32)
+        assert fluxes_32.dtype == np.float32
+        assert np.allclose(fluxes_32, fluxes)
+        sky[0, 2] = 2
+        assert np.allclose(sky.flux_at(frequencies)[0, :, 0], 2 * fluxes[0, :, 0])
+
+    def test_sky_model_builder(self):
+        builder = SkyModelBuilder(initial_capacity=2)
+        batches = [np.random.rand(5, 3) for _ in range(20)]
+        for batch in batches:
+            builder.add_point_sources(batch)
+        assert builder.num_sources == 100
+        assert builder.capacity >= 100
+        sky = builder.build()
+        assert sky.shape == (100, 12)
+        assert np.array_equal(sky[:, :3].to_numpy(), np.vstack(batches))
+        assert np.all(sky[:, 3:].to_numpy() == 0)
+
+        builder = SkyModelBuilder()
+        builder.add_point_sources(
+            xr.DataArray([[20.0, -30.0, 1]], coords={"dim_0": ["source1"]})
+        )
+        builder.add_point_sources(
+            np.array([[20.0, -30.5, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, "source2"]])
+        )
+        sky = builder.build()
+        assert list(sky.source_ids["dim_0"].to_numpy()) == ["source1", "source2"]
+        with self.assertRaises(KaraboSkyModelError):
+            builder.add_point_sources(np.array([[20.0, -30.0, 1]]))
+
+    def test_source_id_encoding(self):
+        sky = SkyModel(
+            np.array(
+                [
+                    [20.0, -30.0, 1, 0, 0, 0, 76e6, 0, 0, 0, 0, 0, "source1"],
+                    [20.0, -30.5, 3, 0, 0, 0, 76e6, 0, 0, 0, 0, 0, "source2"],
+                ]
+            )
+        )
+        sky.add_point_sources(
+            np.array(
+                [
+                    [20.0, -30.5, 2, 0, 0, 0, 84e6, 0, 0, 0, 0, 0, "source2"],
+                    [20.5, -30.5, 2, 0, 0, 0, 84e6, 0, 0, 0, 0, 0, "source3"],
+                ]
+            )
+        )
+        expected_ids = ["source1", "source2", "source2", "source3"]
+        index = sky.sources.indexes["dim_0"]
+        assert isinstance(index, pd.CategoricalIndex)
+        assert list(index.codes) == [0, 1, 1, 2]
+        assert list(index.categories) == ["source1", "source2", "source3"]
+        assert list(sky.source_ids["dim_0"].to_numpy()) == expected_ids
+        assert list(sky.to_np_array(with_obj_ids=True)[:, 12]) == expected_ids
+
+        filtered = sky.filter_by_frequency(80e6, 90e6)
+        assert list(filtered.source_ids["dim_0"].to_numpy()) == expected_ids[2:]
+
+        path = os.path.join("result", "encoded_ids.csv")
+        sky.save_sky_model_as_csv(path)
+        with open(path) as f:
+            assert [line.rsplit(",", 1)[-1].strip() for line in f][1:] == expected_ids
+
+        sky.source_ids = ["a", "b", "a", "c"]
+        assert list(sky.sources.indexes["dim_0"].codes) == [0, 1, 0, 2]
+        assert list(sky.source_ids["dim_0"].to_numpy()) == ["a", "b", "a", "c"]
+
+        # the ids survive ordinary xarray operations on `sources`
+        a = SkyModel(sky.sources[:3].copy())
+        a.source_ids = ["a0", "a1", "a2"]
+        b = SkyModel(sky.sources[:3].copy())
+        b.source_ids = ["b0", "b1", "b2"]
+        concatenated = SkyModel(xr.concat([a.sources, b.sources], dim="dim_0"))
+        assert list(concatenated.source_ids["dim_0"].to_numpy()) == [
+            "a0",
+            "a1",
+            "a2",
+            "b0",
+            "b1",
+            "b2",
+        ]
+        doubled = SkyModel(a.sources * 2)
+        assert list(doubled.source_ids["dim_0"].to_numpy()) == ["a0", "a1", "a2"]
+        assert a.sources.sel(dim_0="a1")[2] == sky.sources[1, 2]
+
+    def test_get_sky_model_from_fits(self):
+        n_sources = 1000
+        flux_084 = np.ones(n_sources)
+        flux_084[::3] = np.nan
+        table = Table(
+            {
+                "RA": np.linspace(0, 10, n_sources),
+                "DEC": np.linspace(-10, 0, n_sources),
+                "Fp076": np.full(n_sources, 2.0),
+                "Fp084": flux_084,
+                "unused": np.zeros(n_sources),
+                "NAME": [f"source{i}" for i in range(n_sources)],
+            }
+        )
+        path = os.path.join("result", "catalog.fits")
+        table.write(path, overwrite=True)
+        sky = SkyModel.get_sky_model_from_fits(
+            path=path,
+            frequencies=[76, 84],
+            prefix_mapping=SkyPrefixMapping(
+                ra="RA", dec="DEC", stokes_i="Fp", id="NAME"
+            ),
+            concat_freq_with_prefix=True,
+            filter_data_by_stokes_i=True,
+            chunksize=128,
+        )
+        keep_084 = ~np.isnan(flux_084)
+        assert isinstance(sky.sources.data, Array)
+        assert max(sky.sources.chunks[0]) <= 128
+        assert sky.num_sources == n_sources + np.count_nonzero(keep_084)
+        sources = sky.to_np_array()
+        assert np.array_equal(
+            sources[:, 0], np.concatenate((table["RA"], table["RA"][keep_084]))
+        )
+        assert np.all(sources[:n_sources, 2] == 2.0)
+        assert np.all(sources[n_sources:, 2] == 1.0)
+        assert np.all(sources[:n_sources, 6] == 76e6)
+        assert np.all(sources[n_sources:, 6] == 84e6)
+        source_ids = sky.source_ids["dim_0"].to_numpy()
+        assert list(source_ids[n_sources : n_sources + 2]) == ["source1", "source2"]
+
+    def test_sky_cube(self):
+        n_sources = 1000
+        flux_084 = np.ones(n_sources)
+        flux_084[::3] = np.nan
+        table = Table(
+            {
+                "RA": np.linspace(0, 10, n_sources),
+                "DEC": np.linspace(-10, 0, n_sources),
+                "Fp076": np.full(n_sources, 2.0),
+                "Fp084": flux_084,
+                "a076": np.full(n_sources, 30.0),
+                "a084": np.full(n_sources, 20.0),
+                "NAME": [f"source{i}" for i in range(n_sources)],
+            }
+        )
+        path = os.path.join("result", "catalog_cube.fits")
+        table.write(path, overwrite=True)
+        kwargs = dict(
+            path=path,
+            frequencies=[76, 84],
+            prefix_mapping=SkyPrefixMapping(
+                ra="RA", dec="DEC", stokes_i="Fp", minor="a", id="NAME"
+            ),
+            concat_freq_with_prefix=True,
+            filter_data_by_stokes_i=True,
+        )
+        cube = SkyCube.from_fits(**kwargs)
+        assert cube.static.shape == (n_sources, 2)
+        assert cube.spectral.shape == (n_sources, 2, 2)
+        assert cube.num_flat_sources == n_sources + np.count_nonzero(
+            ~np.isnan(flux_084)
+        )
+        sky = cube.to_sky_model(chunksize=128)
+        assert isinstance(sky.sources.data, Array)
+        expected = SkyModel.get_sky_model_from_fits(**kwargs)
+        assert sky.num_sources == cube.num_flat_sources
+        assert np.array_equal(sky.to_np_array(), expected.to_np_array())
+        assert np.array_equal(
+            sky.source_ids["dim_0"].to_numpy(), expected.source_ids["dim_0"].to_numpy()
+        )
+
+    def test_sky_from_h5_with_redshift(self):
+        n_sources = 10000
+        ra = np.random.uniform(0, 360, n_sources)
+        dec = np.degrees(np.arcsin(np.random.uniform(-1, 1, n_sources)))
+        z_obs = np.random.uniform(0, 1, n_sources)
+        path = os.path.join("result", "redshift_catalog.h5")
+        with h5py.File(path, "w") as f:
+            f.create_dataset("Right Ascension", data=ra, chunks=(1000,))
+            f.create_dataset("Declination", data=dec, chunks=(1000,))
+            f.create_dataset("Flux", data=np.ones(n_sources))
+            f["Flux"].attrs["Units"] = "Jy"
+            f.create_dataset("Observed Redshift", data=z_obs)
+        sky, z = SkyModel.sky_from_h5_with_redshift(
+            path, ra_deg=20, dec_deg=-30, outer_rad=10, block_size=1500
+        )
+        expected_sky, idxs = SkyModel(np.vstack((ra, -dec, z_obs)).T).filter_by_radius(
+            0, 10, 20, -30, indices=True
+        )
+        assert sky.num_sources > 0
+        assert np.array_equal(sky[:, :2].to_numpy(), expected_sky[:, :2].to_numpy())
+        assert np.array_equal(z, z_obs[idxs])
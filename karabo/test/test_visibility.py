@@ -0,0 +1,153 @@
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+import oskar
+
+from karabo.error import KaraboError
+from karabo.simulation.visibility import Visibility, VisibilityData
+
+
+def visibility_data(value, n_times=3, freq_start_hz=100e6, start=0):
+    """(n_times, 2 channels, 6 baselines, 4 polarisations) visibilities of
+    `value`, whose time steps start at `start` seconds."""
+    return VisibilityData(
+        vis=np.full((n_times, 2, 6, 4), value, dtype=np.complex64),
+        uu_metres=np.ones((n_times, 6)),
+        vv_metres=np.ones((n_times, 6)),
+        ww_metres=np.ones((n_times, 6)),
+        time_stamps_mjd_sec=start + np.arange(n_times) + 0.5,
+        num_stations=4,
+        freq_start_hz=freq_start_hz,
+        freq_inc_hz=1e6,
+        phase_centre_ra_deg=20,
+        phase_centre_dec_deg=-30,
+        time_inc_sec=1,
+        time_average_sec=1,
+    )
+
+
+class RecordingMeasurementSet:
+    """Fake `oskar.MeasurementSet` recording the rows that are written."""
+
+    def __init__(self):
+        self.coords_rows = []
+        self.vis_rows = []
+        self.time_stamps = {}
+
+    def set_phase_centre(self, ra_rad, dec_rad):
+        pass
+
+    def write_coords(self, start_row, num_baselines, *args):
+        self.coords_rows.append(start_row)
+        self.time_stamps[start_row] = args[-1]
+
+    def write_vis(self, start_row, start_channel, num_channels, *args):
+        self.vis_rows.append(start_row)
+
+
+class TestVisibility(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # make dir for result files
+        if not os.path.exists("result/sim"):
+            os.makedirs("result/sim")
+
+    def test_visibility_data_sum_and_concatenate(self):
+        summed = VisibilityData.sum([visibility_data(1), visibility_data(2j)])
+        assert np.all(summed.vis == 1 + 2j)
+        with self.assertRaises(KaraboError):
+            VisibilityData.sum([visibility_data(1), visibility_data(1, n_times=2)])
+
+        by_time = VisibilityData.concatenate(
+            [visibility_data(1), visibility_data(2, start=3)], axis="time"
+        )
+        assert by_time.num_times == 6
+        assert np.array_equal(by_time.time_stamps_mjd_sec, np.arange(6) + 0.5)
+        by_channel = VisibilityData.concatenate(
+            [visibility_data(1), visibility_data(2, freq_start_hz=102e6)],
+            axis="channel",
+        )
+        assert by_channel.num_channels == 4
+        assert np.all(by_channel.vis[:, 2:] == 2)
+        with self.assertRaises(KaraboError):
+            VisibilityData.concatenate(
+                [visibility_data(1), visibility_data(2, freq_start_hz=103e6)],
+                axis="channel",
+            )
+
+    def test_write_ms_stream(self):
+        path = os.path.join("result", "sim", "stream.MS")
+        # days are written at `day * num_rows`, in whichever order they arrive
+        ms = RecordingMeasurementSet()
+        with mock.patch.object(oskar, "MeasurementSet") as measurement_set:
+            measurement_set.create.return_value = ms
+            VisibilityData.write_ms_stream(
+                path,
+                [(day, visibility_data(day, start=day * 86400)) for day in (2, 0, 1)],
+            )
+        num_rows = 3 * 6
+        expected_rows = [day * num_rows + t * 6 for day in (2, 0, 1) for t in range(3)]
+        assert ms.coords_rows == expected_rows
+        assert ms.vis_rows == expected_rows
+        for day in range(3):
+            assert ms.time_stamps[day * num_rows] == day * 86400 + 0.5
+
+        with mock.patch.object(oskar, "MeasurementSet") as measurement_set:
+            measurement_set.create.return_value = RecordingMeasurementSet()
+            with self.assertRaises(KaraboError):
+                VisibilityData.write_ms_stream(
+                    path,
+                    [(0, visibility_data(1)), (1, visibility_data(1, n_times=2))],
+                )
+            with self.assertRaises(KaraboError):
+                VisibilityData.write_ms_stream(path, [])
+
+        # time windows of different lengths start at their first time step
+        ms = RecordingMeasurementSet()
+        with mock.patch.object(oskar, "MeasurementSet") as measurement_set:
+            measurement_set.create.return_value = ms
+            VisibilityData.write_ms_stream(
+                path,
+                [(1, visibility_data(1, n_times=2, start=3)), (0, visibility_data(0))],
+                first_time_steps=[0, 3],
+            )
+        assert ms.coords_rows == [18, 24, 0, 6, 12]
+        assert [ms.time_stamps[row] for row in sorted(ms.coords_rows)] == [
+            t + 0.5 for t in range(5)
+        ]
+
+        # `combine_vis` appends the days in the order of the files
+        days = {"day0.vis": 0, "day1.vis": 1}
+        ms = RecordingMeasurementSet()
+        with mock.patch.object(oskar, "MeasurementSet") as measurement_set:
+            measurement_set.create.return_value = ms
+            with mock.patch.object(
+                VisibilityData,
+                "read",
+                side_effect=lambda vis_file: visibility_data(
+                    days[vis_file], start=days[vis_file] * 86400
+                ),
+            ):
+                combined = Visibility.combine_vis(
+                    list(days), path, group_by="day", return_path=True
+                )
+        assert combined == path
+        assert ms.coords_rows == [t * 6 for t in range(6)]
+        assert [ms.time_stamps[row] for row in ms.coords_rows] == [
+            day * 86400 + t + 0.5 for day in range(2) for t in range(3)
+        ]
+
+    def test_write_to_file(self):
+        ms_path = os.path.join("result", "sim", "only.MS")
+        os.makedirs(ms_path, exist_ok=True)
+        with open(os.path.join(ms_path, "table.dat"), "w") as f:
+            f.write("rows")
+        visibility = Visibility(ms_file_path=ms_path)
+        copy_path = os.path.join("result", "sim", "copy.MS")
+        visibility.write_to_file(copy_path)
+        assert os.path.exists(os.path.join(copy_path, "table.dat"))
+        # there's no .vis file of visibilities which only exist as MS
+        with self.assertRaises(KaraboError):
+            visibility.write_to_file(os.path.join("result", "sim", "copy.vis"))
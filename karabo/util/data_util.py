@@ -1,9 +1,12 @@
+import csv
+import io
 import os
 import re
 from types import ModuleType
 from typing import Any, Dict, List, Tuple, Union, cast
 
 import numpy as np
+import pandas as pd
 import xarray as xr
 from numpy.typing import NDArray
 from scipy.special import wofz
@@ -75,26 +78,67 @@ def calculate_chunk_size_from_max_chunk_size_in_memory(
     return chunk_size
 
 
+_NAN_STRINGS = ["nan", "NaN", "NAN", "-nan", "+nan", "-NaN", "+NaN"]
+
+
 def read_CSV_to_ndarray(file: str) -> NDArray[np.float64]:
-    import csv
+    """
+    Reads the numeric cells of a CSV file (e.g. a PyBDSF catalog) as float array.
+    Empty lines and lines starting with '#' are skipped, as are cells which
+    can't be converted to float (e.g. text columns).
 
-    sources = []
+    :param file: path of the CSV file
+
+    :return: 2-dimensional float array
+    """
     with open(file, newline="") as sourcefile:
-        spamreader = csv.reader(sourcefile, delimiter=",", quotechar="|")
-        for row in spamreader:
-            if len(row) == 0:
-                continue
-            if row[0].startswith("#"):
-                continue
-            else:
-                n_row = []
-                for cell in row:
-                    try:
-                        value = float(cell)
-                        n_row.append(value)
-                    except ValueError:
-                        pass
-                sources.append(n_row)
+        lines = [line for line in sourcefile if not line.startswith("#")]
+    if len(lines) == 0:
+        return np.array([], dtype=float)
+    try:
+        cells = pd.read_csv(
+            io.StringIO("".join(lines)),
+            header=None,
+            quotechar="|",
+            skipinitialspace=True,
+            skip_blank_lines=True,
+            # parse exactly like `float`, which only knows 'nan' as NaN
+            keep_default_na=False,
+            na_values=_NAN_STRINGS,
+            float_precision="round_trip",
+        )
+    except pd.errors.ParserError:
+        # rows of different length
+        return _read_CSV_rows_to_ndarray(lines)
+    columns: List[NDArray[np.float64]] = []
+    for _, col in cells.items():
+        try:
+            columns.append(col.to_numpy(dtype=np.float64))
+        except (TypeError, ValueError):
+            # e.g. a text column, only the distinct values have to be checked
+            if any(_is_float(cell) for cell in pd.unique(col)):
+                # only some cells of the column are numeric
+                return _read_CSV_rows_to_ndarray(lines)
+    if len(columns) == 0:
+        return np.empty((cells.shape[0], 0), dtype=float)
+    return np.column_stack(columns)
+
+
+def _is_float(cell: str) -> bool:
+    try:
+        float(cell)
+    except ValueError:
+        return False
+    return True
+
+
+def _read_CSV_rows_to_ndarray(lines: List[str]) -> NDArray[np.float64]:
+    """Row by row fallback of `read_CSV_to_ndarray`."""
+    sources = []
+    for row in csv.reader(lines, delimiter=",", quotechar="|"):
+        if len(row) == 0:
+            continue
+        sources.append([float(cell) for cell in row if _is_float(cell)])
     return np.array(sources, dtype=float)
 
 
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Generator, Tuple, Union
+from typing import Any, Dict, Generator, Tuple, Union, cast
 
 import h5py as h5
 import healpy as hp
@@ -40,8 +40,6 @@ def get_healpix_image(hdffile: Any) -> Any:
     Get index maps, maps and frequency from HDF5 file
     """
     with h5.File(hdffile, "r") as f:
-        for path, dset in h5_diter(f):
-            pass
         print(f.keys())
         mapp = f["map"][:]
         # imapp = f['index_map'][:]
@@ -49,13 +47,30 @@ def get_healpix_image(hdffile: Any) -> Any:
     return mapp
 
 
+def get_healpix_map_slice(
+    hdffile: Any,
+    channel: int,
+    polarisation: int,
+) -> NDArray[Any]:
+    """
+    Reads the HEALPix map of a single channel and polarisation from the `map`
+    dataset (channels x polarisations x pixels) of a HDF5 file. Only this slice
+    is read from disk, not the whole cube.
+
+    :param hdffile: HDF5 file path
+    :param channel: channel index
+    :param polarisation: polarisation index
+    :return: HEALPix map of the slice
+    """
+    with h5.File(hdffile, "r") as f:
+        return cast(NDArray[Any], f["map"][channel, polarisation, :])
+
+
 def get_vis_from_hdf5(hdffile: Any) -> Any:
     """
     Get index maps, maps and frequency from HDF5 file
     """
     with h5.File(hdffile, "r") as f:
-        for path, dset in h5_diter(f):
-            pass
         print(f.keys())
         vis = f["vis"][:]
     return vis
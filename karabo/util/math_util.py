@@ -1,70 +1,143 @@
 import math
-from math import ceil, cos, floor, pi, sin, sqrt
-from typing import List, Literal, Tuple, Union, cast
+from math import ceil, cos, pi, sin
+from typing import Literal, Optional, Tuple, Union, cast
 
 import numpy as np
 from numpy.typing import NDArray
+from scipy.spatial import cKDTree
 
-from karabo.util._types import FloatLike, NPFloatLike
+from karabo.util._types import (
+    FloatLike,
+    NPFloatInpBroadType,
+    NPFloatLike,
+    NPFloatOutBroadType,
+)
 
 
 def poisson_disc_samples(
     width: FloatLike,
     height: FloatLike,
-    r: int,
+    r: FloatLike,
     k: int = 5,
     ord: Union[None, float, Literal["fro", "nuc"]] = None,
-) -> List[Tuple[float, float]]:
-    tau = 2 * pi
-    cellsize = r / sqrt(2)
-    random = np.random.rand
-    grid_width = int(ceil(width / cellsize))
-    grid_height = int(ceil(height / cellsize))
-    grid = [(np.inf, np.inf)] * (grid_width * grid_height)
-
-    def grid_coords(p: Tuple[float, float]) -> Tuple[int, int]:
-        return int(floor(p[0] / cellsize)), int(floor(p[1] / cellsize))
-
-    def fits(
-        p: Tuple[float, float],
-        gx: int,
-        gy: int,
-    ) -> bool:
-        yrange = list(range(max(gy - 2, 0), min(gy + 3, grid_height)))
-        for x in range(max(gx - 2, 0), min(gx + 3, grid_width)):
-            for y in yrange:
-                g = grid[x + y * grid_width]
-                if g == (np.inf, np.inf):
-                    continue
-                if np.linalg.norm(np.array(p) - np.array(g), ord=ord) <= r:
-                    return False
-        return True
-
-    p = width * random(), height * random()
-    queue = [p]
-    grid_x, grid_y = grid_coords(p)
-    grid[grid_x + grid_y * grid_width] = p
-
-    while queue:
-        qi = int(random() * len(queue))
-        qx, qy = queue[qi]
-        queue[qi] = queue[-1]
-        queue.pop()
-        for _ in range(k):
-            alpha = tau * random()
-            d = r * sqrt(3 * random() + 1)
-            px = qx + d * cos(alpha)
-            py = qy + d * sin(alpha)
-            if not (0 <= px < width and 0 <= py < height):
-                continue
-            p = (px, py)
-            grid_x, grid_y = grid_coords(p)
-            if not fits(p, grid_x, grid_y):
-                continue
-            queue.append(p)
-            grid[grid_x + grid_y * grid_width] = p
-    grid = [p for p in grid if p != (np.inf, np.inf)]
-    return grid
+    seed: Optional[int] = None,
+    batch_size: int = 65536,
+) -> NDArray[np.float_]:
+    """
+    Poisson disc sampling of the rectangle [0, width) x [0, height), i.e. random
+    points which are more than `r` apart from each other (Bridson's algorithm).
+
+    The samples are tracked in a numpy grid of sample indices, and all active
+    samples (up to `batch_size` at once) draw their `k` candidates in one batch.
+    Candidates are checked against the grid vectorised, and conflicts between
+    candidates of the same batch are resolved by keeping the candidates with
+    the lowest random priority among their conflicting neighbours. Processing
+    the active front in batches bounds the memory per round, so large areas are
+    sampled tile-free with a grid of 4 bytes per cell as the only area-sized
+    structure.
+
+    :param width: width of the rectangle
+    :param height: height of the rectangle
+    :param r: minimum distance between two samples
+    :param k: number of candidates per active sample and round, before the
+              sample is retired if none of them is accepted
+    :param ord: order of the Minkowski norm used as distance, see
+                `np.linalg.norm`. Only vector norms (None or >= 1) are supported.
+    :param seed: seed of the random number generator, for reproducible samples
+    :param batch_size: maximum number of active samples per round
+
+    :return: (number of samples, 2) array of x and y
+    """
+    if ord is None:
+        p = 2.0
+    elif isinstance(ord, str) or ord < 1:
+        raise ValueError(f"`ord` must be None or a float >= 1 but is {ord}.")
+    else:
+        p = float(ord)
+    rng = np.random.default_rng(seed)
+    width, height, r = float(width), float(height), float(r)
+    # a cell must not hold two samples, i.e. its diagonal must be <= r in p-norm
+    cellsize = r / 2 ** (1 / p)
+    # samples within distance r are at most `reach` cells apart (p-norm >= max-norm)
+    reach = int(ceil(r / cellsize))
+    grid_width = max(int(ceil(width / cellsize)), 1)
+    grid_height = max(int(ceil(height / cellsize)), 1)
+    # padded by `reach` empty cells, so neighbour lookups need no bound checks
+    grid = np.full(
+        (grid_height + 2 * reach, grid_width + 2 * reach), -1, dtype=np.int32
+    )
+    offsets = np.arange(-reach, reach + 1)
+    offsets_y, offsets_x = (o.ravel() for o in np.meshgrid(offsets, offsets))
+
+    samples = np.empty((1024, 2))
+    samples[0] = width * rng.random(), height * rng.random()
+    n_samples = 1
+    grid[
+        int(samples[0, 1] // cellsize) + reach, int(samples[0, 0] // cellsize) + reach
+    ] = 0
+    active = np.array([0], dtype=np.int_)
+
+    while active.shape[0] > 0:
+        batch, active = active[:batch_size], active[batch_size:]
+        parents = np.repeat(batch, k)
+        alpha = 2 * pi * rng.random(parents.shape[0])
+        # uniformly distributed in the annulus [r, 2r)
+        d = r * np.sqrt(3 * rng.random(parents.shape[0]) + 1)
+        candidates = samples[parents] + d[:, np.newaxis] * np.column_stack(
+            (np.cos(alpha), np.sin(alpha))
+        )
+        inside = (
+            (candidates[:, 0] >= 0)
+            & (candidates[:, 0] < width)
+            & (candidates[:, 1] >= 0)
+            & (candidates[:, 1] < height)
+        )
+        candidates, parents = candidates[inside], parents[inside]
+        cells = (candidates // cellsize).astype(np.int_) + reach
+
+        # conflicts with the existing samples
+        neighbours = grid[
+            cells[:, 1, np.newaxis] + offsets_y, cells[:, 0, np.newaxis] + offsets_x
+        ]
+        # empty cells (-1) are masked below, index 0 just keeps the lookup valid
+        distances = np.linalg.norm(
+            samples[np.maximum(neighbours, 0)] - candidates[:, np.newaxis, :],
+            ord=p,
+            axis=2,
+        )
+        is_free = np.all((neighbours < 0) | (distances > r), axis=1)
+        candidates, parents, cells = (
+            candidates[is_free],
+            parents[is_free],
+            cells[is_free],
+        )
+
+        # conflicts between the candidates, keep the local priority minima
+        priority = rng.random(candidates.shape[0])
+        accepted = np.ones(candidates.shape[0], dtype=np.bool_)
+        if candidates.shape[0] > 1:
+            pairs = cKDTree(candidates).query_pairs(r, p=p, output_type="ndarray")
+            first_wins = priority[pairs[:, 0]] < priority[pairs[:, 1]]
+            accepted[pairs[first_wins, 1]] = False
+            accepted[pairs[~first_wins, 0]] = False
+        candidates, parents, cells = (
+            candidates[accepted],
+            parents[accepted],
+            cells[accepted],
+        )
+
+        n_new = candidates.shape[0]
+        if n_samples + n_new > samples.shape[0]:
+            grown = np.empty((max(2 * samples.shape[0], n_samples + n_new), 2))
+            grown[:n_samples] = samples[:n_samples]
+            samples = grown
+        new_idxs = np.arange(n_samples, n_samples + n_new)
+        samples[new_idxs] = candidates
+        grid[cells[:, 1], cells[:, 0]] = new_idxs
+        n_samples += n_new
+        # samples stay active as long as one of their candidates is accepted
+        active = np.concatenate((active, np.unique(parents), new_idxs))
+    return samples[:n_samples].copy()
 
 
 def get_poisson_disk_sky(
@@ -72,7 +145,8 @@ def get_poisson_disk_sky(
     max_size: Tuple[FloatLike, FloatLike],
     flux_min: FloatLike,
     flux_max: FloatLike,
-    r: int = 10,
+    r: FloatLike = 10,
+    seed: Optional[int] = None,
 ) -> NDArray[np.float_]:
     assert flux_max >= flux_min
     x = min_size[0]
@@ -83,18 +157,130 @@ def get_poisson_disk_sky(
     height = cast(FloatLike, abs(Y - y))
     center_x = x + (X - x) * 0.5
     center_y = y + (Y - y) * 0.5
-    samples = poisson_disc_samples(width, height, r)
-    np_samples = np.array(samples)
+    rng = np.random.default_rng(seed)
+    np_samples = poisson_disc_samples(
+        width, height, r, seed=int(rng.integers(np.iinfo(np.int64).max))
+    )
     ra = np_samples[:, 0] - (width * 0.5)
     dec = np_samples[:, 1] - (height * 0.5)
     ra = ra + center_x
     dec = dec + center_y
     np_samples = np.vstack((ra, dec)).transpose()
-    flux = np.random.random((len(samples), 1)) * (flux_max - flux_min) + flux_min
+    flux = rng.random((np_samples.shape[0], 1)) * (flux_max - flux_min) + flux_min
     sky_array = np.hstack((np_samples, flux))
     return sky_array
 
 
+def angular_separation_deg(
+    ra_deg: NPFloatInpBroadType,
+    dec_deg: NPFloatInpBroadType,
+    ra0_deg: NPFloatInpBroadType,
+    dec0_deg: NPFloatInpBroadType,
+) -> NPFloatOutBroadType:
+    """
+    Great-circle distance between (ra, dec) and (ra0, dec0) using the Vincenty
+    formula, which is numerically stable for small and antipodal separations.
+    Only numpy ufuncs are used, so `xarray.DataArray` and `dask.array.Array`
+    inputs stay lazy.
+
+    :param ra_deg: right ascension(s) in degrees
+    :param dec_deg: declination(s) in degrees
+    :param ra0_deg: reference right ascension(s) in degrees
+    :param dec0_deg: reference declination(s) in degrees
+
+    :return: separation(s) in degrees
+    """
+    d_ra = np.radians(ra_deg - ra0_deg)
+    dec, dec0 = np.radians(dec_deg), np.radians(dec0_deg)
+    sin_dec, cos_dec = np.sin(dec), np.cos(dec)
+    sin_dec0, cos_dec0 = np.sin(dec0), np.cos(dec0)
+    cos_d_ra = np.cos(d_ra)
+    num1 = cos_dec * np.sin(d_ra)
+    num2 = cos_dec0 * sin_dec - sin_dec0 * cos_dec * cos_d_ra
+    denominator = sin_dec0 * sin_dec + cos_dec0 * cos_dec * cos_d_ra
+    separation = np.degrees(np.arctan2(np.hypot(num1, num2), denominator))
+    return cast(NPFloatOutBroadType, separation)
+
+
+def ra_dec_to_cartesian(
+    ra_deg: NDArray[np.float_],
+    dec_deg: NDArray[np.float_],
+    out: NDArray[np.float_],
+) -> NDArray[np.float_]:
+    """
+    Converts ra/dec to unit vectors on the celestial sphere, writing the result
+    in place into `out` to avoid temporary (N,3) arrays.
+
+    :param ra_deg: right ascension of each source in degrees, shape (N,)
+    :param dec_deg: declination of each source in degrees, shape (N,)
+    :param out: (N,3) array to store x, y and z in, its dtype defines the precision
+
+    :return: `out`
+    """
+    ra = np.radians(ra_deg, dtype=out.dtype)
+    dec = np.radians(dec_deg, dtype=out.dtype)
+    np.cos(dec, out=out[:, 2])  # holds cos(dec) until z is written
+    np.multiply(out[:, 2], np.cos(ra), out=out[:, 0])
+    np.multiply(out[:, 2], np.sin(ra), out=out[:, 1])
+    np.sin(dec, out=out[:, 2])
+    return out
+
+
+def stokes_at_frequencies(
+    sources: NDArray[np.float_],
+    frequencies: NDArray[np.float_],
+    out: NDArray[np.float_],
+) -> NDArray[np.float_]:
+    """
+    Evaluates the stokes parameters of `SkyModel.sources` rows at `frequencies`
+    the way OSKAR does: all stokes parameters are scaled by
+    `(frequency / reference frequency) ** spectral index`, and Q/U are rotated
+    by the rotation measure with the angle `RM * (lambda^2 - lambda_ref^2)`.
+    Sources with a reference frequency of 0 aren't scaled or rotated.
+
+    :param sources: (N,12) `SkyModel.sources` rows
+    :param frequencies: (nchan,) frequencies in Hz
+    :param out: (N,nchan,4) array to store the stokes I, Q, U and V in,
+        its dtype defines the precision of the result
+
+    :return: `out`
+    """
+    ref_freq = np.asarray(sources[:, 6], dtype=np.float64)
+    spectral_index = np.asarray(sources[:, 7], dtype=np.float64)
+    rm = np.asarray(sources[:, 8], dtype=np.float64)
+    is_scaled = ref_freq > 0
+    safe_ref_freq = np.where(is_scaled, ref_freq, 1.0)[:, np.newaxis]
+    scale = np.where(
+        is_scaled[:, np.newaxis],
+        (frequencies[np.newaxis, :] / safe_ref_freq) ** spectral_index[:, np.newaxis],
+        1.0,
+    )
+    for stokes_idx in range(4):
+        np.multiply(
+            np.asarray(sources[:, 2 + stokes_idx], dtype=np.float64)[:, np.newaxis],
+            scale,
+            out=out[:, :, stokes_idx],
+            casting="unsafe",
+        )
+    is_rotated = is_scaled & (rm != 0)
+    if np.any(is_rotated):
+        speed_of_light = 299792458.0
+        wavelength_sq = (speed_of_light / frequencies[np.newaxis, :]) ** 2
+        ref_wavelength_sq = (speed_of_light / safe_ref_freq) ** 2
+        # the polarisation angle is rotated by RM * dlambda^2, so Q + iU by twice it
+        angle = np.where(
+            is_rotated[:, np.newaxis],
+            2 * rm[:, np.newaxis] * (wavelength_sq - ref_wavelength_sq),
+            0.0,
+        )
+        cos_angle, sin_angle = np.cos(angle), np.sin(angle)
+        q = out[:, :, 1].astype(np.float64)
+        u = out[:, :, 2].astype(np.float64)
+        out[:, :, 1] = q * cos_angle - u * sin_angle
+        out[:, :, 2] = q * sin_angle + u * cos_angle
+    return out
+
+
 #
 def long_lat_to_cartesian(lat: NPFloatLike, lon: NPFloatLike) -> NDArray[np.float_]:
     lat_, lon_ = np.deg2rad(lat), np.deg2rad(lon)